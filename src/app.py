@@ -8,7 +8,13 @@ warnings.filterwarnings('ignore')
 # 导入自定义模块
 from src.core.data_fetcher import StockDataFetcher
 from src.core.technical_analysis import TechnicalAnalyzer
+from src.core.timeframes import analyze_timeframes
+from src.core.events import EVENT_LABELS, detect_events
+from src.core.monte_carlo import simulate_position_risk
 from src.core.visualization import StockVisualizer
+from src.core.frame_cache import get_frame_cache
+from src.core.indicator_cache import get_indicator_cache, frame_fingerprint
+from src.core.config import CACHE_CONFIG, TECHNICAL_CONFIG
 
 # 配置页面
 st.set_page_config(
@@ -62,48 +68,65 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=300)  # 缓存5分钟，只缓存基础数据
 def load_basic_stock_data(symbol, period=100):
-    """加载股票基础数据（带缓存）"""
-    fetcher = StockDataFetcher()
-    data = fetcher.get_stock_data(symbol, period)
-    stock_info = fetcher.get_stock_info(symbol)
-    fund_flow = fetcher.get_fund_flow(symbol)
+    """加载股票基础数据（带缓存，按内存占用限额淘汰）"""
+    def fetch():
+        fetcher = StockDataFetcher()
+        data = fetcher.get_stock_data(symbol, period)
+        data = fetcher.attach_fund_flow_history(data, symbol)
+        stock_info = fetcher.get_stock_info(symbol)
+        fund_flow = fetcher.get_fund_flow(symbol)
+        return data, stock_info, fund_flow
     
-    return data, stock_info, fund_flow
+    return get_frame_cache().get_or_compute(('basic', symbol, period), fetch, ttl=CACHE_CONFIG['data_ttl'])
+
+@st.cache_data(ttl=300)  # 基准指数所有股票共用一份
+def load_benchmark_indices():
+    """加载基准指数（带缓存）"""
+    return StockDataFetcher().get_benchmark_indices()
 
-@st.cache_data(ttl=60)  # 分析结果缓存1分钟，基于股票和持仓信息
 def analyze_stock_cached(symbol, period, has_position, current_position, cost_price, data_hash):
     """带缓存的股票分析（基于持仓信息）"""
-    # 重新获取基础数据（使用缓存）
-    data, stock_info, fund_flow = load_basic_stock_data(symbol, period)
-    
-    if data is None or data.empty:
-        return None
+    def analyze():
+        # 重新获取基础数据（使用缓存）
+        data, stock_info, fund_flow = load_basic_stock_data(symbol, period)
+        
+        if data is None or data.empty:
+            return None
+        
+        return analyze_stock_core(data, fund_flow, has_position, current_position, cost_price,
+                                  benchmarks=load_benchmark_indices())
     
-    return analyze_stock_core(data, fund_flow, has_position, current_position, cost_price)
+    cache_key = ('analysis', symbol, period, has_position, current_position, cost_price, data_hash)
+    return get_frame_cache().get_or_compute(cache_key, analyze, ttl=CACHE_CONFIG['analysis_ttl'])
 
-def analyze_stock_core(data, fund_flow, has_position=False, current_position=0, cost_price=0):
+def analyze_stock_core(data, fund_flow, has_position=False, current_position=0, cost_price=0, benchmarks=None):
     """核心分析逻辑（不缓存）"""
-    analyzer = TechnicalAnalyzer()
+    analyzer = TechnicalAnalyzer(benchmarks, cache=get_indicator_cache())
     
-    # 计算技术指标
-    data_with_indicators = analyzer.calculate_indicators(data)
+    # 计算技术指标（分析与图表用到的列）
+    data_with_indicators = analyzer.calculate_indicators(data, 'analysis+chart+events')
+    
+    # 最新K线特征只提取一次，各分析步骤共用
+    latest = analyzer.latest_bar(data_with_indicators)
     
     # 识别波段类型
-    band_info = analyzer.identify_band_type(data_with_indicators)
+    band_info = analyzer.identify_band_type(data_with_indicators, latest)
+    band_info['history'] = analyzer.band_history(data_with_indicators)
     
     # 六维信号验证
-    signal_result = analyzer.six_dimension_signal_check(data_with_indicators, fund_flow)
+    signal_result = analyzer.six_dimension_signal_check(data_with_indicators, fund_flow, latest)
+    signal_result['history'] = analyzer.six_dimension_signal_series(data_with_indicators, fund_flow)
+    signal_result['events'] = detect_events(data_with_indicators)
     
     # 获取当前价格
-    latest_price = data_with_indicators.iloc[-1]['close']
+    latest_price = latest.close
     
     # 持仓分析
     position_analysis = None
     position_info = None
     if has_position and current_position > 0 and cost_price > 0:
-        position_analysis = analyzer.analyze_position(latest_price, cost_price, current_position, signal_result, data_with_indicators)
+        position_analysis = analyzer.analyze_position(latest_price, cost_price, current_position, signal_result, data_with_indicators, latest)
         position_info = {
             'profit_loss_pct': position_analysis['profit_loss_pct'],
             'total_cost': position_analysis['total_cost'],
@@ -112,7 +135,7 @@ def analyze_stock_core(data, fund_flow, has_position=False, current_position=0,
         }
     
     # 生成交易决策（考虑持仓情况）
-    decision = analyzer.generate_trading_decision(signal_result, data_with_indicators, position_info)
+    decision = analyzer.generate_trading_decision(signal_result, data_with_indicators, position_info, latest)
     
     # 计算仓位管理
     position_mgmt = analyzer.calculate_position_management(decision, latest_price)
@@ -123,6 +146,12 @@ def analyze_stock_core(data, fund_flow, has_position=False, current_position=0,
         atr = latest_price * 0.02
     stop_strategy = analyzer.calculate_stop_profit_loss(latest_price, atr)
     
+    # 蒙特卡洛持仓风险模拟（套用上面的止损规则）
+    if position_analysis is not None:
+        position_analysis['risk_simulation'] = simulate_position_risk(
+            data_with_indicators, stop_strategy, cost_price, current_position
+        )
+    
     return data_with_indicators, band_info, signal_result, decision, position_mgmt, stop_strategy, position_analysis
 
 def main():
@@ -192,8 +221,17 @@ def main():
         # 清除缓存按钮
         if st.button("🔄 清除缓存", help="强制刷新所有数据，解决缓存问题"):
             st.cache_data.clear()
+            get_frame_cache().clear()
             st.success("✅ 缓存已清除，下次分析将获取最新数据")
         
+        # 缓存占用
+        cache_stats = get_frame_cache().stats()
+        st.caption(
+            f"🗄️ 缓存占用：{cache_stats['current_bytes'] / 1024 / 1024:.1f}MB / "
+            f"{cache_stats['max_bytes'] / 1024 / 1024:.0f}MB（{cache_stats['entries']}条，"
+            f"命中率{cache_stats['hit_rate']:.0f}%）"
+        )
+        
         st.markdown("---")
         
         # 系统信息
@@ -224,9 +262,8 @@ def main():
                     st.error("❌ 获取股票数据失败，请检查股票代码是否正确")
                     return
                 
-                # 生成数据hash用于缓存控制
-                import hashlib
-                data_hash = hashlib.md5(f"{stock_symbol}_{period}_{len(data)}".encode()).hexdigest()
+                # 按数据内容（K线、资金流向）生成指纹用于缓存控制
+                data_hash = frame_fingerprint(data, extra=fund_flow)
                 
                 # 分析数据（智能缓存：考虑持仓信息变化）
                 with st.spinner("正在分析技术指标..."):
@@ -459,6 +496,35 @@ def main():
 - 建议操作：{decision['decision']}
                     """)
                 
+                # 蒙特卡洛持仓风险
+                risk_simulation = position_analysis.get('risk_simulation') if has_position and position_analysis else None
+                if risk_simulation:
+                    st.markdown("### 🎲 持仓风险模拟")
+                    st.caption(f"按最近{risk_simulation['samples']}根K线块自助重采样{risk_simulation['paths']}条路径，"
+                               f"模拟未来{risk_simulation['horizon']}个交易日，套用移动止损、紧急止损与时间止损")
+                    tail_risk = risk_simulation['tail_risk']
+                    risk_cols = st.columns(len(tail_risk) + 1)
+                    for risk_col, (confidence, tail) in zip(risk_cols, tail_risk.items()):
+                        risk_col.metric(
+                            f"{confidence*100:.0f}% VaR / ES",
+                            f"{tail['var']*100:.2f}% / {tail['es']*100:.2f}%",
+                            f"￥{tail['var_amount']:,.0f} / ￥{tail['es_amount']:,.0f}", delta_color="off"
+                        )
+                    risk_cols[-1].metric(
+                        f"回撤≥{risk_simulation['drawdown_limit']*100:.0f}%概率",
+                        f"{risk_simulation['drawdown_probability']*100:.1f}%",
+                        f"不止损{risk_simulation['unmanaged_drawdown_probability']*100:.1f}%", delta_color="off"
+                    )
+                    exit_probability = risk_simulation['exit_probability']
+                    unmanaged_var = '，'.join(f"{confidence*100:.0f}% VaR {tail['unmanaged_var']*100:.2f}%"
+                                             for confidence, tail in tail_risk.items())
+                    st.markdown(f"""
+- 期望收益：{risk_simulation['expected_return']*100:+.2f}%，平均持有{risk_simulation['average_holding_days']:.1f}日
+- 退出方式：移动止损{exit_probability['trailing']*100:.1f}%，紧急止损{exit_probability['emergency']*100:.1f}%，时间止损{exit_probability['time']*100:.1f}%
+- 不设止损时：{unmanaged_var}
+- 卖出价低于成本价的概率：{risk_simulation.get('loss_probability', 0)*100:.1f}%
+                    """)
+                
                 # 第三行：技术指标和支撑压力位
                 st.markdown("## 📊 技术指标与关键位置")
                 col6, col7, col8 = st.columns([1, 1, 1])
@@ -610,9 +676,74 @@ MACD {'金叉' if latest['MACD'] > 0 else '死叉'}
                     hide_index=True
                 )
                 
+                # 六维信号历史
+                with st.expander("📈 查看六维信号历史"):
+                    history = signal_result['history']
+                    st.line_chart(history['signal_count'].rename('信号数量'))
+                    recent_history = history.tail(20).iloc[::-1].rename(columns=signal_names)
+                    recent_history.index = recent_history.index.astype(str)
+                    st.dataframe(recent_history, use_container_width=True)
+                
+                # 历史交叉、突破事件
+                with st.expander("⚡ 查看历史事件"):
+                    events = signal_result['events']
+                    if events.empty:
+                        st.info("分析区间内暂无交叉或突破事件")
+                    else:
+                        recent_events = events.tail(20).iloc[::-1].reset_index()
+                        recent_events = pd.DataFrame({
+                            '日期': recent_events['date'].dt.strftime('%Y-%m-%d'),
+                            '事件': recent_events['event'].astype(str).map(EVENT_LABELS),
+                            '收盘价': recent_events['close'].round(2)
+                        })
+                        st.dataframe(recent_events, use_container_width=True, hide_index=True)
+                
+                # 波段位置与类型历史
+                with st.expander("📉 查看波段位置历史"):
+                    band_history = band_info['history']
+                    st.line_chart(band_history['position_percent'].rename('波段位置(%)'))
+                    recent_bands = band_history[['position_percent', 'position', 'band_type', 'guidance']].tail(20).iloc[::-1]
+                    recent_bands = recent_bands.rename(columns={'position_percent': '位置(%)', 'position': '波段位置',
+                                                                'band_type': '波段类型', 'guidance': '指导建议'})
+                    recent_bands.index = recent_bands.index.astype(str)
+                    st.dataframe(recent_bands.round(1), use_container_width=True)
+                
+                # 多周期分析：由本地日线重采样为周线、月线，与日线结论并列
+                st.markdown("### 🗓️ 多周期分析")
+                timeframe_rows = [{
+                    '周期': '日线',
+                    '日期': data_with_indicators.index[-1].strftime('%Y-%m-%d'),
+                    '波段类型': band_info['type'],
+                    '波段位置': band_info['position'],
+                    '信号数量': f"{signal_result['signal_count']}/{signal_result['total_signals']}",
+                    '信号建议': signal_result['recommendation']
+                }]
+                try:
+                    timeframe_results = analyze_timeframes(stock_symbol, TechnicalAnalyzer(load_benchmark_indices()))
+                except Exception as e:
+                    print(f"多周期分析失败: {e}")
+                    timeframe_results = {}
+                for result in timeframe_results.values():
+                    analysis = result['analysis']
+                    label = result['label'] if result['closed'] else f"{result['label']}（未收盘）"
+                    if analysis is None:
+                        timeframe_rows.append({'周期': label, '日期': '-', '波段类型': 'K线不足',
+                                               '波段位置': '-', '信号数量': '-', '信号建议': '-'})
+                        continue
+                    timeframe_rows.append({
+                        '周期': label,
+                        '日期': result['data'].index[-1].strftime('%Y-%m-%d'),
+                        '波段类型': analysis['band']['type'],
+                        '波段位置': analysis['band']['position'],
+                        '信号数量': f"{analysis['signals']['signal_count']}/{analysis['signals']['total_signals']}",
+                        '信号建议': analysis['signals']['recommendation']
+                    })
+                st.dataframe(pd.DataFrame(timeframe_rows), use_container_width=True, hide_index=True)
+                
                 # 技术指标数据表
                 with st.expander("📊 查看详细技术指标数据"):
-                    display_columns = ['close', 'MA5', 'MA10', 'MA20', 'MA60', 'RSI', 'MACD', 'Volume_Ratio']
+                    display_columns = (['close'] + [f'MA{period}' for period in TECHNICAL_CONFIG['ma_periods']] +
+                                       ['RSI', 'MACD', 'Volume_Ratio'])
                     available_columns = [col for col in display_columns if col in data_with_indicators.columns]
                     
                     # 处理数据，确保没有导致Arrow转换问题的值
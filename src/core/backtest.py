@@ -0,0 +1,257 @@
+"""
+决策矩阵回测 - 按历史六维信号重放交易决策规则
+
+信号K线收盘后产生信号，次日开盘买入（T+1，买入当日不可卖出）；持有期内按固定止损、
+移动止损、目标价和时间止损逐日检查，同一根K线同时触发止损与目标价时按止损处理。
+档位（最少信号数、仓位比例、目标倍数）与generate_trading_decision共用DECISION_CONFIG的
+决策矩阵，止损参数取自RISK_CONFIG与BACKTEST_CONFIG。
+
+由于时间止损限定了最长持有天数，所有候选买点的退出位置可在(买点×持有天数)的窗口矩阵上
+一次算出；之后按"上一笔卖出后的首个信号"串联互不重叠的交易，只按交易笔数循环。
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+from .config import BACKTEST_CONFIG, RISK_CONFIG
+from .technical_analysis import TechnicalAnalyzer, decision_tiers
+
+# 退出原因编码
+EXIT_REASONS = ('stop', 'trailing', 'target', 'time', 'end')
+EXIT_STOP, EXIT_TRAILING, EXIT_TARGET, EXIT_TIME, EXIT_END = range(len(EXIT_REASONS))
+
+METRIC_FIELDS = ('total_return', 'annual_return', 'max_drawdown', 'sharpe', 'trades', 'hit_rate',
+                 'avg_trade_return', 'avg_holding_days', 'exposure', 'turnover')
+
+TRADE_FIELDS = ('signal_bar', 'entry_bar', 'exit_bar', 'entry_price', 'exit_price',
+                'position_ratio', 'trade_return', 'exit_reason')
+
+
+def backtest_params(overrides: Dict = None) -> Dict:
+    """从配置生成回测参数，overrides可覆盖任意一项（如min_signals、trailing_stop_pct）"""
+    tiers = [(tier['min_signals'], tier['position_ratio'], tier['target_multiplier'])
+             for tier in decision_tiers() if tier['position_ratio'] > 0]
+    stop_loss = RISK_CONFIG['stop_loss']
+    params = {
+        'tiers': tiers,
+        'min_signals': min(tier[0] for tier in tiers),
+        'stop_loss_pct': BACKTEST_CONFIG['stop_loss_pct'],
+        'trailing_stop_pct': stop_loss['trailing_stop_pct'],
+        'time_stop_days': stop_loss['time_stop_days'],
+        'fee_rate': BACKTEST_CONFIG['fee_rate'],
+        'stamp_tax': BACKTEST_CONFIG['stamp_tax'],
+        'trading_days': BACKTEST_CONFIG['trading_days'],
+    }
+    params.update(overrides or {})
+    return params
+
+
+def _tier_arrays(signal_count: np.ndarray, tiers) -> tuple:
+    """按信号数量逐根K线选出档位的仓位比例与目标倍数"""
+    conditions = [signal_count >= tier[0] for tier in tiers]
+    ratio = np.select(conditions, [tier[1] for tier in tiers], 0.0)
+    target = np.select(conditions, [tier[2] for tier in tiers], 1.0)
+    return ratio, target
+
+
+def _empty_trades() -> Dict[str, np.ndarray]:
+    trades = {field: np.empty(0) for field in TRADE_FIELDS}
+    for field in ('signal_bar', 'entry_bar', 'exit_bar', 'exit_reason'):
+        trades[field] = np.empty(0, dtype=int)
+    return trades
+
+
+def simulate_trades(prices: Dict[str, np.ndarray], signal_count: np.ndarray, params: Dict) -> Dict[str, np.ndarray]:
+    """
+    按信号数量生成互不重叠的交易
+
+    prices为open/high/low/close一维数组的映射，signal_count为每根K线的信号数量；
+    返回TRADE_FIELDS各字段的数组（每笔交易一个元素）
+    """
+    open_, high, low, close = (np.asarray(prices[field], dtype=float) for field in ('open', 'high', 'low', 'close'))
+    n = len(close)
+    count = np.nan_to_num(np.asarray(signal_count, dtype=float))
+    ratio, target = _tier_arrays(count, params['tiers'])
+
+    entry_ok = (count >= params['min_signals']) & (ratio > 0)
+    entry_ok[-1:] = False
+    entry_ok[:-1] &= ~np.isnan(open_[1:])
+    signal_bars = np.flatnonzero(entry_ok)
+    if len(signal_bars) == 0:
+        return _empty_trades()
+
+    # (买点×持有天数)窗口矩阵，第0列为买入当日，超出序列部分为NaN
+    horizon = max(int(params['time_stop_days']), 1)
+    entry_bars = signal_bars + 1
+    idx = entry_bars[:, None] + np.arange(horizon + 1)
+    padding = np.full(horizon, np.nan)
+    window_open, window_high, window_low, window_close = (
+        np.concatenate([values, padding])[idx] for values in (open_, high, low, close)
+    )
+    entry_price = window_open[:, 0]
+    target_price = entry_price * target[signal_bars]
+
+    # 止损线在当日开盘前已确定：max(固定止损, 此前最高价回撤)
+    peak = np.fmax.accumulate(np.column_stack([entry_price, window_high[:, :-1]]), axis=1)
+    fixed_level = entry_price * (1 - params['stop_loss_pct'])
+    trailing_level = peak * (1 - params['trailing_stop_pct'])
+    level = np.maximum(fixed_level[:, None], trailing_level)
+
+    hit_stop = window_low <= level
+    hit_target = window_high >= target_price[:, None]
+    hit = hit_stop | hit_target
+    hit[:, 0] = False
+
+    rows = np.arange(len(signal_bars))
+    any_hit = hit.any(axis=1)
+    last_k = np.minimum(horizon, n - 1 - entry_bars)
+    exit_k = np.where(any_hit, hit.argmax(axis=1), last_k)
+    stopped = any_hit & hit_stop[rows, exit_k]
+    exit_level = level[rows, exit_k]
+    exit_open = window_open[rows, exit_k]
+
+    # 跳空时按开盘价成交
+    exit_price = np.where(stopped, np.fmin(exit_open, exit_level),
+                          np.where(any_hit, np.fmax(exit_open, target_price), window_close[rows, exit_k]))
+    exit_reason = np.select(
+        [stopped & (trailing_level[rows, exit_k] > fixed_level), stopped, any_hit, last_k == horizon],
+        [EXIT_TRAILING, EXIT_STOP, EXIT_TARGET, EXIT_TIME], EXIT_END
+    )
+    exit_bars = entry_bars + exit_k
+
+    # 串联互不重叠的交易：下一笔取卖出当日及之后的首个信号
+    chosen = []
+    j = 0
+    while j < len(signal_bars):
+        chosen.append(j)
+        j = np.searchsorted(signal_bars, exit_bars[j])
+    chosen = np.asarray(chosen)
+
+    costs = 2 * params['fee_rate'] + params['stamp_tax']
+    return {
+        'signal_bar': signal_bars[chosen],
+        'entry_bar': entry_bars[chosen],
+        'exit_bar': exit_bars[chosen],
+        'entry_price': entry_price[chosen],
+        'exit_price': exit_price[chosen],
+        'position_ratio': ratio[signal_bars[chosen]],
+        'trade_return': exit_price[chosen] / entry_price[chosen] - 1 - costs,
+        'exit_reason': exit_reason[chosen],
+    }
+
+
+def bar_returns(close: np.ndarray, trades: Dict[str, np.ndarray], params: Dict) -> tuple:
+    """把交易展开为逐根K线的仓位与账户收益率（买入日按成交价起算，卖出日按成交价结算）"""
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    entry, exit_ = trades['entry_bar'], trades['exit_bar']
+    ratio = trades['position_ratio']
+
+    # 用整数计数判断持仓区间，避免浮点累加在空仓日留下残差
+    delta = np.zeros(n + 1)
+    held = np.zeros(n + 1, dtype=int)
+    np.add.at(delta, entry, ratio)
+    np.add.at(delta, exit_ + 1, -ratio)
+    np.add.at(held, entry, 1)
+    np.add.at(held, exit_ + 1, -1)
+    weights = np.where(np.cumsum(held[:n]) > 0, np.cumsum(delta[:n]), 0.0)
+
+    ref_from = np.concatenate([[np.nan], close[:-1]])
+    ref_from[entry] = trades['entry_price']
+    ref_to = close.copy()
+    ref_to[exit_] = trades['exit_price']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.nan_to_num(weights * (ref_to / ref_from - 1))
+    returns[weights == 0] = 0.0
+    returns[entry] -= ratio * params['fee_rate']
+    returns[exit_] -= ratio * (params['fee_rate'] + params['stamp_tax'])
+    return weights, returns
+
+
+def summarize(returns: np.ndarray, weights: np.ndarray, trades: Dict[str, np.ndarray], params: Dict) -> Dict:
+    """汇总回测指标：收益、回撤、胜率、换手率（年化双边）"""
+    n = len(returns)
+    if n == 0:
+        return {}
+    equity = np.cumprod(1 + returns)
+    years = n / params['trading_days']
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    volatility = returns.std()
+    trade_returns = trades['trade_return']
+    trade_count = len(trade_returns)
+
+    metrics = {
+        'total_return': equity[-1] - 1,
+        'annual_return': equity[-1] ** (1 / years) - 1 if equity[-1] > 0 else -1.0,
+        'max_drawdown': -drawdown.min(),
+        'sharpe': returns.mean() / volatility * np.sqrt(params['trading_days']) if volatility > 0 else 0.0,
+        'trades': trade_count,
+        'hit_rate': (trade_returns > 0).mean() if trade_count else 0.0,
+        'avg_trade_return': trade_returns.mean() if trade_count else 0.0,
+        'avg_holding_days': (trades['exit_bar'] - trades['entry_bar'] + 1).mean() if trade_count else 0.0,
+        'exposure': (weights > 0).mean(),
+        'turnover': np.abs(np.diff(weights, prepend=0.0)).sum() / years,
+    }
+    return {key: int(value) if key == 'trades' else float(value) for key, value in metrics.items()}
+
+
+def run_backtest(prices: Dict[str, np.ndarray], signal_count: np.ndarray, params: Dict = None) -> Dict:
+    """数组层回测入口：返回交易、逐根K线仓位与收益以及汇总指标"""
+    params = params if params is not None and 'tiers' in params else backtest_params(params)
+    trades = simulate_trades(prices, signal_count, params)
+    weights, returns = bar_returns(prices['close'], trades, params)
+    return {
+        'trades': trades,
+        'weights': weights,
+        'returns': returns,
+        'metrics': summarize(returns, weights, trades, params)
+    }
+
+
+class DecisionBacktester:
+    """决策矩阵回测器 - 计算指标与六维信号历史后重放交易规则"""
+
+    def __init__(self, analyzer: TechnicalAnalyzer = None, params: Dict = None, fetcher=None):
+        if fetcher is None:
+            from .data_fetcher import StockDataFetcher
+            fetcher = StockDataFetcher()
+        self.fetcher = fetcher
+        # 默认使用本地仓库中的基准指数，市场环境维度与实时分析一致
+        self.analyzer = analyzer or TechnicalAnalyzer(fetcher.stored_benchmark_indices())
+        self.params = backtest_params(params)
+
+    def run(self, data: pd.DataFrame, symbol: str = None) -> Dict:
+        """
+        回测单只股票，返回指标汇总、交易明细、净值曲线与信号历史
+
+        给出symbol时先附加本地仓库中的资金流向历史（不联网），资金验证维度与实时分析一致
+        """
+        if symbol is not None:
+            data = self.fetcher.attach_fund_flow_history(data, symbol, sync=False)
+        data_with_indicators = self.analyzer.calculate_indicators(data, 'signals')
+        signals = self.analyzer.six_dimension_signal_series(data_with_indicators)
+        prices = {field: data_with_indicators[field].to_numpy(dtype=float) for field in ('open', 'high', 'low', 'close')}
+        result = run_backtest(prices, signals['signal_count'].to_numpy(), self.params)
+
+        index = data_with_indicators.index
+        trades = result['trades']
+        trade_table = pd.DataFrame({
+            'signal_date': index[trades['signal_bar']],
+            'entry_date': index[trades['entry_bar']],
+            'exit_date': index[trades['exit_bar']],
+            'entry_price': trades['entry_price'],
+            'exit_price': trades['exit_price'],
+            'position_ratio': trades['position_ratio'],
+            'return': trades['trade_return'],
+            'holding_days': trades['exit_bar'] - trades['entry_bar'] + 1,
+            'exit_reason': [EXIT_REASONS[code] for code in trades['exit_reason']],
+        })
+        return {
+            'metrics': result['metrics'],
+            'trades': trade_table,
+            'equity': pd.Series(np.cumprod(1 + result['returns']), index=index, name='equity'),
+            'position': pd.Series(result['weights'], index=index, name='position'),
+            'signals': signals
+        }
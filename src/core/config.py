@@ -21,8 +21,47 @@ DATA_CONFIG = {
     'timeout': 30,          # 超时时间（秒）
 }
 
+# 本地数据仓库配置
+STORE_CONFIG = {
+    'root_dir': 'data/store',   # 本地数据仓库根目录
+    'industry_refresh_days': 7, # 行业成分表刷新间隔（天）
+    'publish_hour': 16,         # 交易日该时刻之后才视为当日资金流向已发布
+    'sync_interval': 3600,      # 同一股票资金流向两次联网同步的最短间隔（秒，停牌或数据源延迟时）
+    'snapshot_path': 'data/snapshot.bmsnap',  # 离线快照包，存在时启动即挂载
+}
+
+# 进程内缓存配置
+CACHE_CONFIG = {
+    'max_bytes': 512 * 1024 * 1024,  # 价格与指标数据缓存上限（字节）
+    'data_ttl': 300,                  # 基础数据缓存时间（秒）
+    'analysis_ttl': 60,               # 分析结果缓存时间（秒）
+    'indicator_disk': True,           # 指标结果是否同时缓存到磁盘（跨会话、批处理共享）
+    'indicator_dir': 'data/cache/indicators',  # 指标结果磁盘缓存目录
+    'indicator_disk_max_bytes': 1024 * 1024 * 1024,  # 磁盘缓存上限（字节），超出时删除最久未用的结果
+    'indicator_disk_max_age_days': 7,  # 磁盘缓存保留天数（新K线会改变指纹，旧结果不再命中）
+}
+
+# 基准指数配置
+BENCHMARK_CONFIG = {
+    'indices': {
+        'sh000001': '上证指数',
+        'sh000300': '沪深300',
+        'sz399006': '创业板指',
+    },
+    'primary': 'sh000300',          # 市场环境判断基准
+    'refresh_interval': 300,        # 刷新间隔（秒）
+    'rs_period': 20,                # 相对强弱计算周期
+    'regime_ma_period': 60,         # 市场状态均线周期
+    'regime_slope_period': 5,       # 均线方向判断周期
+}
+
 # 技术分析参数
 TECHNICAL_CONFIG = {
+    # 指标计算后端：'auto'（优先TA-Lib，未安装时用NumPy）/ 'talib' / 'numpy'
+    'backend': 'auto',
+    # NumPy后端的递推类指标（EMA、Wilder平滑、ADX、SAR等）是否使用Numba编译内核（需安装numba）
+    'numba_jit': True,
+    
     # 移动平均线参数
     'ma_periods': [5, 10, 20, 60],
     'ema_periods': [20, 60],
@@ -56,9 +95,23 @@ TECHNICAL_CONFIG = {
     'kdj_m1': 3,
     'kdj_m2': 3,
     
-    # 成交量参数
+    # 成交量参数（均量列名固定为Volume_MA5）
     'volume_ma_period': 5,
     'volume_amplify_threshold': 1.2,  # 成交量放大阈值
+    
+    # 其他摆动/动量指标参数
+    'willr_period': 14,
+    'cci_period': 14,
+    'stochf_fastk': 5,
+    'stochf_fastd': 3,
+    'mom_period': 10,
+    'roc_period': 10,
+    'adosc_fast': 3,
+    'adosc_slow': 10,
+    'sar_acceleration': 0.02,
+    'sar_maximum': 0.2,
+    'trix_period': 30,
+    'ultosc_periods': [7, 14, 28],
 }
 
 # 波段识别配置
@@ -106,7 +159,7 @@ SIGNAL_CONFIG = {
 
 # 交易决策配置
 DECISION_CONFIG = {
-    # 决策矩阵
+    # 决策矩阵（generate_trading_decision与决策矩阵回测共用的档位表）
     'decision_matrix': {
         'heavy_buy': {
             'min_signals': 5,
@@ -117,25 +170,33 @@ DECISION_CONFIG = {
             'stop_loss_atr': 2.0
         },
         'standard_buy': {
+            'min_signals': 4,
+            'position_ratio': 0.6,
+            'holding_period': '3-7天',
+            'confidence': '中高',
+            'target_multiplier': 1.10,
+            'stop_loss_atr': 1.5
+        },
+        'cautious_buy': {
             'min_signals': 3,
             'position_ratio': 0.45,
-            'holding_period': '3-7天',
+            'holding_period': '1-3天',
             'confidence': '中',
-            'target_multiplier': 1.08,
-            'stop_loss_atr': 1.5
+            'target_multiplier': 1.06,
+            'stop_loss_atr': 1.2
         },
         'light_buy': {
             'min_signals': 2,
             'position_ratio': 0.15,
-            'holding_period': '1-3天',
+            'holding_period': '1-2天',
             'confidence': '低',
-            'target_multiplier': 1.05,
+            'target_multiplier': 1.03,
             'stop_loss_atr': 1.0
         },
         'hold': {
             'min_signals': 0,
             'position_ratio': 0.0,
-            'holding_period': '-',
+            'holding_period': '观望',
             'confidence': '观望',
             'target_multiplier': 1.0,
             'stop_loss_atr': 0
@@ -161,7 +222,7 @@ POSITION_CONFIG = {
     'blacklist_rules': {
         'st_stocks': True,          # 排除ST股票
         'low_volatility': 0.03,     # 排除5日振幅<3%的股票
-        'min_volume': 1000000       # 最小成交量要求
+        'min_volume': 1000000       # 最近5日日均成交量下限（股，即1万手）
     }
 }
 
@@ -188,6 +249,81 @@ RISK_CONFIG = {
     }
 }
 
+# 蒙特卡洛持仓风险模拟配置（止损取自calculate_stop_profit_loss，回撤上限取自RISK_CONFIG）
+MONTE_CARLO_CONFIG = {
+    'paths': 10000,              # 模拟路径数
+    'lookback': 250,             # 用于重采样的最近K线数量
+    'block_size': 5,             # 块自助法的块长度（保留短期波动聚集）
+    'horizon': None,             # 模拟天数，None为时间止损天数
+    'confidence': (0.95, 0.99),  # VaR/ES置信水平
+    'min_bars': 30,              # K线不足时不做模拟
+    'seed': 42,                  # 固定随机种子，同一数据结果可复现（便于缓存）
+}
+
+# 回测配置
+BACKTEST_CONFIG = {
+    'stop_loss_pct': 0.05,       # 固定止损（与交易决策的5%止损一致）
+    'fee_rate': 0.0003,          # 单边佣金
+    'stamp_tax': 0.0005,         # 卖出印花税
+    'trading_days': 252,         # 年化天数
+}
+
+# 参数扫描配置（网格键可取TECHNICAL_CONFIG指标参数、SIGNAL_CONFIG信号阈值或回测参数）
+SWEEP_CONFIG = {
+    'output_dir': 'data/sweeps',  # 扫描结果目录（每个任务一个分片文件，中断后可续跑）
+    'workers': None,              # 进程数，None为CPU核数
+    'symbols_per_task': 20,       # 每个任务的股票数（任务=指标参数组合×股票分批）
+    'grid': {
+        'rsi_period': [10, 14, 20],
+        'rsi_range': [(40, 70), (45, 75), (50, 80)],
+        'adx_trend_threshold': [20, 25, 30],
+        'adx_market_threshold': [20, 25, 30],
+        'volume_threshold': [1.0, 1.2, 1.5],
+    },
+}
+
+# 滚动样本外验证配置（参数网格沿用SWEEP_CONFIG['grid']）
+WALK_FORWARD_CONFIG = {
+    'train_bars': 500,        # 样本内窗口（交易日）
+    'test_bars': 120,         # 样本外窗口，同时为窗口滚动步长
+    'objective': 'sharpe',    # 样本内择优指标（各股票均值）
+    'min_trades': 3,          # 样本内平均交易笔数下限，不足的组合不参与择优
+    'workers': None,          # 进程数，None为CPU核数
+}
+
+# 事件检测配置
+EVENT_CONFIG = {
+    'volume_breakout_ratio': 1.5,   # 量比上穿该值视为放量突破（与形态确认的放量条件一致）
+}
+
+# 组合相关性与行业暴露配置（仓位限额沿用POSITION_CONFIG）
+EXPOSURE_CONFIG = {
+    'window': 60,                # 滚动相关窗口（日收益率根数）
+    'min_periods': 20,           # 两只股票共同有效收益不足时相关系数为NaN
+    'high_correlation': 0.8,     # 相关系数高于该值的股票视为同一相关组，合计仓位按sector_limit检查
+    'rebuild_interval': 250,     # 增量更新累计误差，每隔该根数由窗口数据重算一次
+}
+
+# 多周期分析配置（由本地日线重采样，rule为pandas周期别名）
+TIMEFRAME_CONFIG = {
+    'timeframes': {
+        'weekly': {'rule': 'W-FRI', 'label': '周线'},
+        'monthly': {'rule': 'M', 'label': '月线'},
+    },
+    'indicators': 'analysis',   # 各周期计算的指标预设
+    'min_bars': 30,             # 周期K线不足时不做波段与信号分析
+}
+
+# 全市场筛选配置
+SCREENER_CONFIG = {
+    'lookback_bars': 250,        # 每只股票参与计算的最近K线数量
+    'min_bars': 60,              # K线不足的股票跳过
+    'chunk_size': 100,           # 每个进程任务处理的股票数量
+    'workers': None,             # 进程数，None为CPU核数
+    'apply_blacklist': True,     # 计算指标前按POSITION_CONFIG['blacklist_rules']排除黑名单股票
+    'output_dir': 'data/screener',  # 筛选结果目录
+}
+
 # 可视化配置
 VISUAL_CONFIG = {
     # 颜色主题
@@ -2,14 +2,36 @@ import akshare as ak
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+from .config import BENCHMARK_CONFIG, STORE_CONFIG
+from .data_store import LocalDataStore, align_to_index
+
+# 资金流向历史列映射（东方财富个股资金流）
+FUND_FLOW_HISTORY_COLUMNS = {
+    '主力净流入-净额': 'main_net_inflow',
+    '超大单净流入-净额': 'super_large_net_inflow',
+    '大单净流入-净额': 'large_net_inflow',
+    '中单净流入-净额': 'medium_net_inflow',
+    '小单净流入-净额': 'small_net_inflow',
+    '主力净流入-净占比': 'main_net_inflow_pct',
+}
+
+# 前复权价格列：重叠日期上差异超过ADJUSTMENT_TOLERANCE视为复权基准已变
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+ADJUSTMENT_TOLERANCE = 1e-6
+
+# 进程内共享的基准指数副本，所有股票共用
+_BENCHMARK_CACHE = {'frames': None, 'refreshed_at': 0.0}
+
 class StockDataFetcher:
     """股票数据获取器"""
     
-    def __init__(self):
+    def __init__(self, store: LocalDataStore = None):
         self.ak = ak
+        self.store = store or LocalDataStore()
     
     def get_stock_data(self, symbol, period=100):
         """
@@ -24,64 +46,115 @@ class StockDataFetcher:
         """
         try:
             # 获取股票历史数据
-            stock_data = ak.stock_zh_a_hist(
-                symbol=symbol, 
-                period="daily", 
-                start_date=(datetime.now() - timedelta(days=period*2)).strftime("%Y%m%d"),
-                end_date=datetime.now().strftime("%Y%m%d"),
-                adjust="qfq"
-            )
-            
-            if stock_data.empty:
-                return None
-                
-            # 动态处理列名
-            print(f"获取到的列数: {len(stock_data.columns)}")
-            print(f"列名: {list(stock_data.columns)}")
-            
-            # 根据实际列数处理 - 现在我们知道有12列
-            # 列名: ['日期', '股票代码', '开盘', '收盘', '最高', '最低', '成交量', '成交额', '振幅', '涨跌幅', '涨跌额', '换手率']
-            if len(stock_data.columns) >= 7:
-                # 选择需要的列：日期、开盘、收盘、最高、最低、成交量
-                # 跳过股票代码列，选择第0,2,3,4,5,6列
-                selected_data = stock_data.iloc[:, [0, 2, 3, 4, 5, 6]].copy()
-                selected_data.columns = ['date', 'open', 'close', 'high', 'low', 'volume']
-                stock_data = selected_data
-            elif len(stock_data.columns) >= 6:
-                # 如果是6列，按原来的逻辑处理
-                stock_data = stock_data.iloc[:, :6]
-                stock_data.columns = ['date', 'open', 'close', 'high', 'low', 'volume']
-            else:
-                # 如果列数不够，使用原始列名
-                stock_data.columns = [f'col_{i}' for i in range(len(stock_data.columns))]
-                
-            stock_data['date'] = pd.to_datetime(stock_data.iloc[:, 0])
-            stock_data.set_index('date', inplace=True)
+            stock_data = self._fetch_price_history(symbol, datetime.now() - timedelta(days=period*2))
+            if stock_data is None or stock_data.empty:
+                return self._get_stored_stock_data(symbol, period)
             
-            # 重新排列列顺序并确保数据类型
+            # 写入本地仓库，供离线启动和全市场分析使用
             try:
-                columns_needed = ['open', 'high', 'low', 'close', 'volume']
-                if 'high' not in stock_data.columns and 'close' in stock_data.columns:
-                    # 如果列名不匹配，尝试重新映射
-                    available_cols = [col for col in stock_data.columns if col != 'date']
-                    if len(available_cols) >= 5:
-                        stock_data.columns = ['open', 'close', 'high', 'low', 'volume'][:len(available_cols)]
-                        # 调整为正确顺序
-                        stock_data = stock_data[['open', 'high', 'low', 'close', 'volume'][:len(available_cols)]]
-                
-                stock_data = stock_data[columns_needed].astype(float)
+                self._store_price_history(symbol, stock_data)
             except Exception as e:
-                print(f"列处理错误: {e}")
-                # 如果还是有问题，使用最基本的处理
-                numeric_cols = stock_data.select_dtypes(include=[np.number]).columns[:5]
-                stock_data = stock_data[numeric_cols]
-                stock_data.columns = ['open', 'high', 'low', 'close', 'volume'][:len(numeric_cols)]
+                print(f"保存本地行情失败: {e}")
             
             return stock_data.tail(period)
             
         except Exception as e:
             print(f"获取股票数据失败: {e}")
+            return self._get_stored_stock_data(symbol, period)
+    
+    def _fetch_price_history(self, symbol, start_date, end_date=None):
+        """从接口获取[start_date, end_date]的前复权日线，返回OHLCV（无数据时返回None）"""
+        stock_data = ak.stock_zh_a_hist(
+            symbol=symbol, 
+            period="daily", 
+            start_date=pd.Timestamp(start_date).strftime("%Y%m%d"),
+            end_date=pd.Timestamp(end_date or datetime.now()).strftime("%Y%m%d"),
+            adjust="qfq"
+        )
+        
+        if stock_data.empty:
+            return None
+        
+        # 动态处理列名
+        print(f"获取到的列数: {len(stock_data.columns)}")
+        print(f"列名: {list(stock_data.columns)}")
+        
+        # 根据实际列数处理 - 现在我们知道有12列
+        # 列名: ['日期', '股票代码', '开盘', '收盘', '最高', '最低', '成交量', '成交额', '振幅', '涨跌幅', '涨跌额', '换手率']
+        if len(stock_data.columns) >= 7:
+            # 选择需要的列：日期、开盘、收盘、最高、最低、成交量
+            # 跳过股票代码列，选择第0,2,3,4,5,6列
+            selected_data = stock_data.iloc[:, [0, 2, 3, 4, 5, 6]].copy()
+            selected_data.columns = ['date', 'open', 'close', 'high', 'low', 'volume']
+            stock_data = selected_data
+        elif len(stock_data.columns) >= 6:
+            # 如果是6列，按原来的逻辑处理
+            stock_data = stock_data.iloc[:, :6]
+            stock_data.columns = ['date', 'open', 'close', 'high', 'low', 'volume']
+        else:
+            # 如果列数不够，使用原始列名
+            stock_data.columns = [f'col_{i}' for i in range(len(stock_data.columns))]
+            
+        stock_data['date'] = pd.to_datetime(stock_data.iloc[:, 0])
+        stock_data.set_index('date', inplace=True)
+        
+        # 重新排列列顺序并确保数据类型
+        try:
+            columns_needed = ['open', 'high', 'low', 'close', 'volume']
+            if 'high' not in stock_data.columns and 'close' in stock_data.columns:
+                # 如果列名不匹配，尝试重新映射
+                available_cols = [col for col in stock_data.columns if col != 'date']
+                if len(available_cols) >= 5:
+                    stock_data.columns = ['open', 'close', 'high', 'low', 'volume'][:len(available_cols)]
+                    # 调整为正确顺序
+                    stock_data = stock_data[['open', 'high', 'low', 'close', 'volume'][:len(available_cols)]]
+            
+            stock_data = stock_data[columns_needed].astype(float)
+        except Exception as e:
+            print(f"列处理错误: {e}")
+            # 如果还是有问题，使用最基本的处理
+            numeric_cols = stock_data.select_dtypes(include=[np.number]).columns[:5]
+            stock_data = stock_data[numeric_cols]
+            stock_data.columns = ['open', 'high', 'low', 'close', 'volume'][:len(numeric_cols)]
+        
+        return stock_data
+    
+    def _store_price_history(self, symbol, stock_data):
+        """
+        前复权日线写入本地仓库
+        
+        前复权价格在每次除权除息后整段改变：新数据与已存数据在重叠日期上的价格不一致说明复权
+        基准已变（两段之间有缺口时无法判断），此时从已存的第一个交易日起重新获取整段历史并整体
+        替换，避免新旧基准拼接出虚假跳空；重新获取失败时保留原数据，下次获取时再试
+        """
+        existing = self.store.load('price', symbol)
+        if existing is None or existing.empty:
+            self.store.save('price', symbol, stock_data.sort_index())
+            return
+        
+        overlap = existing.index.intersection(stock_data.index)
+        prices = [col for col in PRICE_COLUMNS if col in existing.columns and col in stock_data.columns]
+        if len(overlap) and np.allclose(existing.loc[overlap, prices].to_numpy(dtype=float),
+                                        stock_data.loc[overlap, prices].to_numpy(dtype=float),
+                                        rtol=0, atol=ADJUSTMENT_TOLERANCE, equal_nan=True):
+            self.store.append('price', symbol, stock_data)
+            return
+        
+        reason = "复权基准变化" if len(overlap) else "与本地数据之间有缺口"
+        print(f"{symbol} {reason}，重新获取完整前复权历史")
+        history = self._fetch_price_history(symbol, existing.index[0])
+        if history is None or history.empty:
+            print(f"重新获取{symbol}完整历史失败，保留本地数据")
+            return
+        self.store.save('price', symbol, history.sort_index())
+    
+    def _get_stored_stock_data(self, symbol, period):
+        """网络不可用时使用本地仓库中的行情"""
+        stored = self.store.load('price', symbol)
+        if stored is None or stored.empty:
             return None
+        print(f"使用本地行情数据: {symbol}")
+        return stored.tail(period)
     
     def get_stock_info(self, symbol):
         """获取股票基本信息"""
@@ -96,7 +169,7 @@ class StockDataFetcher:
                 stock_info = ak.stock_individual_info_em(symbol=symbol)
                 
                 if stock_info.empty:
-                    return self._get_default_stock_info(symbol)
+                    return self._get_stored_stock_info(symbol)
                 
                 # 提取信息
                 info_dict = self._get_default_stock_info(symbol)
@@ -125,6 +198,7 @@ class StockDataFetcher:
                         except:
                             pass
                 
+                self._save_stock_info(symbol, info_dict)
                 return info_dict
                 
             finally:
@@ -132,7 +206,25 @@ class StockDataFetcher:
             
         except Exception as e:
             print(f"获取股票信息失败: {e}")
-            return self._get_default_stock_info(symbol)
+            return self._get_stored_stock_info(symbol)
+    
+    def _save_stock_info(self, symbol, info_dict):
+        """将股票基本信息写入本地仓库的公司概况表"""
+        try:
+            profiles = self.store.load('meta', 'profiles')
+            row = pd.DataFrame([info_dict], index=pd.Index([symbol], name='symbol'))
+            if profiles is not None and not profiles.empty:
+                row = pd.concat([profiles.drop(index=symbol, errors='ignore'), row])
+            self.store.save('meta', 'profiles', row)
+        except Exception as e:
+            print(f"保存股票信息失败: {e}")
+    
+    def _get_stored_stock_info(self, symbol):
+        """网络不可用时使用本地仓库中的股票信息"""
+        profiles = self.store.load('meta', 'profiles')
+        if profiles is not None and symbol in profiles.index:
+            return profiles.loc[symbol].to_dict()
+        return self._get_default_stock_info(symbol)
     
     def _get_default_stock_info(self, symbol):
         """返回默认的股票信息"""
@@ -193,4 +285,209 @@ class StockDataFetcher:
             'large_net_inflow': 0,
             'medium_net_inflow': 0,
             'small_net_inflow': 0
-        } 
\ No newline at end of file
+        }
+    
+    def _get_market(self, symbol):
+        """根据代码判断交易所"""
+        if symbol.startswith('6'):
+            return 'sh'
+        if symbol.startswith(('4', '8', '9')):
+            return 'bj'
+        return 'sz'
+    
+    def get_fund_flow_history(self, symbol):
+        """
+        获取个股每日资金流向历史
+        
+        Args:
+            symbol: 股票代码 (如: '000001')
+            
+        Returns:
+            DataFrame: 以日期为索引的资金流向数据，失败返回None
+        """
+        try:
+            flow = ak.stock_individual_fund_flow(stock=symbol, market=self._get_market(symbol))
+            
+            if flow is None or flow.empty:
+                return None
+            
+            flow = flow.copy()
+            flow['date'] = pd.to_datetime(flow['日期'])
+            flow.set_index('date', inplace=True)
+            
+            columns = [col for col in FUND_FLOW_HISTORY_COLUMNS if col in flow.columns]
+            history = flow[columns].rename(columns=FUND_FLOW_HISTORY_COLUMNS)
+            return history.apply(pd.to_numeric, errors='coerce').sort_index()
+            
+        except Exception as e:
+            print(f"获取资金流向历史失败: {e}")
+            return None
+    
+    def last_published_trading_day(self):
+        """
+        数据已发布的最近交易日
+        
+        交易日publish_hour之前取上一交易日；周末、节假日取之前最后一个交易日；
+        没有交易日历时按工作日估计
+        """
+        now = datetime.now()
+        cutoff = pd.Timestamp(now.date())
+        if now.hour < STORE_CONFIG['publish_hour']:
+            cutoff -= pd.Timedelta(days=1)
+        
+        calendar = self.get_trade_calendar()
+        if calendar is not None and len(calendar):
+            past = calendar[calendar <= cutoff]
+            if len(past):
+                return past[-1]
+        return pd.Timestamp(np.busday_offset(cutoff.date(), 0, roll='backward'))
+    
+    def sync_fund_flow_history(self, symbol):
+        """
+        增量同步资金流向历史到本地仓库，返回完整历史
+        
+        本地已覆盖到数据已发布的最近交易日，或距上次同步不足sync_interval时不联网
+        """
+        stored = self.store.load('fund_flow', symbol)
+        if stored is not None and not stored.empty:
+            updated_at = self.store.updated_at('fund_flow', symbol)
+            recently_synced = updated_at is not None and time.time() - updated_at < STORE_CONFIG['sync_interval']
+            if recently_synced or stored.index[-1] >= self.last_published_trading_day():
+                return stored
+        
+        history = self.get_fund_flow_history(symbol)
+        if history is None or history.empty:
+            return stored
+        
+        if stored is not None and not stored.empty:
+            # 只追加新日期，并以最新数据覆盖最后一天（盘中数据可能被修正）
+            history = history[history.index >= stored.index[-1]]
+        
+        return self.store.append('fund_flow', symbol, history)
+    
+    def attach_fund_flow_history(self, data, symbol, sync=True):
+        """将资金流向历史按日期对齐为OHLCV数据的附加列"""
+        if data is None or data.empty:
+            return data
+        
+        history = self.sync_fund_flow_history(symbol) if sync else self.store.load('fund_flow', symbol)
+        aligned = align_to_index(history, data.index, list(FUND_FLOW_HISTORY_COLUMNS.values()))
+        
+        result = data.drop(columns=[col for col in aligned.columns if col in data.columns])
+        return result.join(aligned)
+    
+    def get_index_data(self, code):
+        """
+        获取指数日线数据
+        
+        Args:
+            code: 带交易所前缀的指数代码 (如: 'sh000300')
+            
+        Returns:
+            DataFrame: 以日期为索引的OHLCV数据，失败返回None
+        """
+        try:
+            index_data = ak.stock_zh_index_daily(symbol=code)
+            
+            if index_data is None or index_data.empty:
+                return None
+            
+            index_data = index_data.copy()
+            index_data['date'] = pd.to_datetime(index_data['date'])
+            index_data.set_index('date', inplace=True)
+            return index_data[['open', 'high', 'low', 'close', 'volume']].astype(float).sort_index()
+            
+        except Exception as e:
+            print(f"获取指数数据失败({code}): {e}")
+            return None
+    
+    def refresh_benchmark_indices(self):
+        """拉取全部基准指数并写入本地仓库，返回 {代码: DataFrame}"""
+        frames = {}
+        for code in BENCHMARK_CONFIG['indices']:
+            index_data = self.get_index_data(code)
+            if index_data is not None:
+                frames[code] = self.store.append('index', code, index_data)
+            else:
+                # 拉取失败时退回本地仓库中的历史
+                stored = self.store.load('index', code)
+                if stored is not None:
+                    frames[code] = stored
+        
+        _BENCHMARK_CACHE['frames'] = frames
+        _BENCHMARK_CACHE['refreshed_at'] = time.time()
+        return frames
+    
+    def stored_benchmark_indices(self):
+        """读取本地仓库中已同步的基准指数（不联网），返回 {代码: DataFrame}"""
+        frames = {}
+        for code in BENCHMARK_CONFIG['indices']:
+            frame = self.store.load('index', code)
+            if frame is not None and not frame.empty:
+                frames[code] = frame
+        return frames
+    
+    def get_benchmark_indices(self, refresh=False):
+        """获取共享的基准指数副本，超过刷新间隔才重新拉取"""
+        frames = _BENCHMARK_CACHE['frames']
+        expired = time.time() - _BENCHMARK_CACHE['refreshed_at'] > BENCHMARK_CONFIG['refresh_interval']
+        
+        if frames is None or refresh or expired:
+            frames = self.refresh_benchmark_indices()
+        
+        return frames
+    
+    def get_industry_membership(self):
+        """
+        获取全市场行业成分表（东方财富行业板块）
+        
+        Returns:
+            DataFrame: 列为 symbol, name, industry，失败返回None
+        """
+        try:
+            boards = ak.stock_board_industry_name_em()
+            if boards is None or boards.empty:
+                return None
+            
+            rows = []
+            for industry in boards['板块名称']:
+                try:
+                    cons = ak.stock_board_industry_cons_em(symbol=industry)
+                except Exception as e:
+                    print(f"获取行业成分失败({industry}): {e}")
+                    continue
+                if cons is None or cons.empty:
+                    continue
+                rows.append(pd.DataFrame({
+                    'symbol': cons['代码'].astype(str),
+                    'name': cons['名称'].astype(str),
+                    'industry': industry
+                }))
+            
+            if not rows:
+                return None
+            return pd.concat(rows, ignore_index=True).drop_duplicates('symbol')
+            
+        except Exception as e:
+            print(f"获取行业成分表失败: {e}")
+            return None
+    
+    def get_trade_calendar(self):
+        """
+        获取A股交易日历（本地仓库优先，覆盖不到今天时重新拉取）
+        
+        Returns:
+            DatetimeIndex: 全部交易日，失败返回None
+        """
+        stored = self.store.load('meta', 'calendar')
+        if stored is not None and not stored.empty and stored['trade_date'].iloc[-1] >= pd.Timestamp(datetime.now().date()):
+            return pd.DatetimeIndex(stored['trade_date'])
+        
+        try:
+            calendar = ak.tool_trade_date_hist_sina()
+            calendar = pd.DataFrame({'trade_date': pd.to_datetime(calendar['trade_date'])})
+            self.store.save('meta', 'calendar', calendar)
+            return pd.DatetimeIndex(calendar['trade_date'])
+        except Exception as e:
+            print(f"获取交易日历失败: {e}")
+            return pd.DatetimeIndex(stored['trade_date']) if stored is not None else None
@@ -0,0 +1,125 @@
+import os
+import pandas as pd
+from typing import Dict, List, Optional
+
+from .config import STORE_CONFIG
+
+
+_mounted_snapshot = {}
+
+
+def get_mounted_snapshot(path: str = None):
+    """挂载配置中的离线快照包（每个进程只打开一次），不存在时返回None"""
+    path = path or STORE_CONFIG.get('snapshot_path')
+    if not path or not os.path.exists(path):
+        return None
+    if path not in _mounted_snapshot:
+        from .snapshot import SnapshotBundle
+        try:
+            _mounted_snapshot[path] = SnapshotBundle(path)
+        except Exception as e:
+            print(f"挂载离线快照包失败: {e}")
+            _mounted_snapshot[path] = None
+    return _mounted_snapshot[path]
+
+
+class LocalDataStore:
+    """本地数据仓库 - 按分类/代码持久化时间序列数据，缺失时回退到离线快照包"""
+
+    def __init__(self, root_dir: str = None, snapshot=None):
+        self.root_dir = root_dir or STORE_CONFIG['root_dir']
+        # snapshot=None 使用配置中的快照包，False 表示不挂载
+        self.snapshot = get_mounted_snapshot() if snapshot is None else (snapshot or None)
+
+    def _path(self, kind: str, key: str) -> str:
+        """数据文件路径"""
+        return os.path.join(self.root_dir, kind, f"{key}.pkl")
+
+    def load(self, kind: str, key: str) -> Optional[pd.DataFrame]:
+        """读取一份时间序列，不存在时返回None"""
+        path = self._path(kind, key)
+        if not os.path.exists(path):
+            if self.snapshot is not None and self.snapshot.has(kind, key):
+                return self.snapshot.frame(kind, key)
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            print(f"读取本地数据失败({kind}/{key}): {e}")
+            return None
+
+    def save(self, kind: str, key: str, frame: pd.DataFrame, updated_at: float = None):
+        """整体写入一份时间序列（先写临时文件再替换，避免写坏），updated_at指定时保留原写入时间"""
+        path = self._path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        frame.to_pickle(tmp_path)
+        if updated_at is not None:
+            os.utime(tmp_path, (updated_at, updated_at))
+        os.replace(tmp_path, path)
+
+    def append(self, kind: str, key: str, frame: pd.DataFrame) -> pd.DataFrame:
+        """增量追加：按日期索引合并，重叠日期以新数据为准"""
+        existing = self.load(kind, key)
+        if existing is not None and not existing.empty:
+            merged = pd.concat([existing, frame])
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        else:
+            merged = frame.sort_index()
+        self.save(kind, key, merged)
+        return merged
+
+    def last_date(self, kind: str, key: str) -> Optional[pd.Timestamp]:
+        """已存储数据的最后日期"""
+        existing = self.load(kind, key)
+        if existing is None or existing.empty:
+            return None
+        return existing.index[-1]
+
+    def updated_at(self, kind: str, key: str) -> Optional[float]:
+        """数据文件最后写入时间（时间戳），只存在于快照包时取快照包记录的时间，都不存在时返回None"""
+        path = self._path(kind, key)
+        if os.path.exists(path):
+            return os.path.getmtime(path)
+        if self.snapshot is not None and self.snapshot.has(kind, key):
+            return self.snapshot.updated_at(kind, key)
+        return None
+
+    def keys(self, kind: str) -> List[str]:
+        """列出某分类下的全部代码"""
+        folder = os.path.join(self.root_dir, kind)
+        keys = set()
+        if os.path.isdir(folder):
+            keys.update(name[:-4] for name in os.listdir(folder) if name.endswith('.pkl'))
+        if self.snapshot is not None:
+            keys.update(self.snapshot.keys(kind))
+        return sorted(keys)
+
+    def kinds(self) -> List[str]:
+        """列出全部数据分类"""
+        kinds = set()
+        if os.path.isdir(self.root_dir):
+            kinds.update(name for name in os.listdir(self.root_dir)
+                         if os.path.isdir(os.path.join(self.root_dir, name)))
+        if self.snapshot is not None:
+            kinds.update(self.snapshot.kinds())
+        return sorted(kinds)
+
+    def load_many(self, kind: str, keys: List[str] = None) -> Dict[str, pd.DataFrame]:
+        """批量读取某分类下的数据"""
+        result = {}
+        for key in (keys if keys is not None else self.keys(kind)):
+            frame = self.load(kind, key)
+            if frame is not None:
+                result[key] = frame
+        return result
+
+
+def align_to_index(frame: Optional[pd.DataFrame], index: pd.Index,
+                   columns: List[str] = None) -> pd.DataFrame:
+    """将附加数据对齐到OHLCV日期索引，缺失日期填NaN"""
+    if frame is None or frame.empty:
+        return pd.DataFrame(index=index, columns=columns or [], dtype=float)
+    if columns is not None:
+        frame = frame.reindex(columns=columns)
+    return frame.reindex(index)
@@ -0,0 +1,164 @@
+"""
+事件检测 - 在整段历史和(标的×K线)面板上向量化识别交叉、突破与反转事件
+
+每个事件声明所需的列和判断函数，判断函数输入{列名: 数组}，沿最后一个轴比较当前与前一根K线，
+因此同一套规则既可用于单只股票的指标表，也可用于calculate_indicators_panel的面板结果。
+检测结果为紧凑的长表（每个事件一行），以(日期, 股票)为索引。
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterable, List, Union
+
+from .config import EVENT_CONFIG
+
+EVENT_REGISTRY: Dict[str, Dict] = {}
+
+
+def register_event(name: str, label: str, requires: List[str]):
+    """注册事件判断函数 func(src) -> 布尔数组，requires为所需列"""
+    def decorator(func: Callable) -> Callable:
+        EVENT_REGISTRY[name] = {'label': label, 'requires': list(requires), 'detect': func}
+        return func
+    return decorator
+
+
+def cross_above(a: np.ndarray, b) -> np.ndarray:
+    """a由下向上穿越b：当前a>b且前一根a<=b（首根K线与缺失值不产生事件）"""
+    a = np.asarray(a, dtype=float)
+    b = np.broadcast_to(np.asarray(b, dtype=float), a.shape)
+    crossed = np.zeros(a.shape, dtype=bool)
+    crossed[..., 1:] = (a[..., 1:] > b[..., 1:]) & (a[..., :-1] <= b[..., :-1])
+    return crossed
+
+
+def cross_below(a: np.ndarray, b) -> np.ndarray:
+    """a由上向下穿越b"""
+    a = np.asarray(a, dtype=float)
+    return cross_above(np.broadcast_to(np.asarray(b, dtype=float), a.shape), a)
+
+
+@register_event('macd_golden_cross', 'MACD金叉', ['MACD', 'MACD_signal'])
+def _macd_golden_cross(src):
+    return cross_above(src['MACD'], src['MACD_signal'])
+
+
+@register_event('macd_death_cross', 'MACD死叉', ['MACD', 'MACD_signal'])
+def _macd_death_cross(src):
+    return cross_below(src['MACD'], src['MACD_signal'])
+
+
+@register_event('kdj_golden_cross', 'KDJ金叉', ['K', 'D'])
+def _kdj_golden_cross(src):
+    return cross_above(src['K'], src['D'])
+
+
+@register_event('kdj_death_cross', 'KDJ死叉', ['K', 'D'])
+def _kdj_death_cross(src):
+    return cross_below(src['K'], src['D'])
+
+
+@register_event('bb_upper_break', '突破布林上轨', ['close', 'BB_upper'])
+def _bb_upper_break(src):
+    return cross_above(src['close'], src['BB_upper'])
+
+
+@register_event('bb_lower_break', '跌破布林下轨', ['close', 'BB_lower'])
+def _bb_lower_break(src):
+    return cross_below(src['close'], src['BB_lower'])
+
+
+@register_event('sar_flip_up', 'SAR转多', ['close', 'SAR'])
+def _sar_flip_up(src):
+    return cross_above(src['close'], src['SAR'])
+
+
+@register_event('sar_flip_down', 'SAR转空', ['close', 'SAR'])
+def _sar_flip_down(src):
+    return cross_below(src['close'], src['SAR'])
+
+
+@register_event('volume_breakout', '放量突破', ['Volume_Ratio'])
+def _volume_breakout(src):
+    return cross_above(src['Volume_Ratio'], EVENT_CONFIG['volume_breakout_ratio'])
+
+
+EVENT_LABELS = {name: entry['label'] for name, entry in EVENT_REGISTRY.items()}
+
+
+def resolve_events(events: Union[str, Iterable[str], None] = None) -> List[str]:
+    """将请求解析为事件名（按注册顺序），None表示全部，字符串中用"+"组合"""
+    if events is None:
+        return list(EVENT_REGISTRY)
+    if isinstance(events, str):
+        events = events.split('+')
+    wanted = {name.strip() for name in events}
+    unknown = wanted - set(EVENT_REGISTRY)
+    if unknown:
+        raise ValueError(f"未注册的事件: {sorted(unknown)}")
+    return [name for name in EVENT_REGISTRY if name in wanted]
+
+
+def event_flags(src, events: Union[str, Iterable[str], None] = None) -> Dict[str, np.ndarray]:
+    """
+    计算各事件的布尔数组，src为DataFrame或{列名: 数组}（一维序列或(标的×K线)面板）
+
+    缺少所需列的事件跳过
+    """
+    available = set(src.columns.tolist()) if isinstance(src, pd.DataFrame) else set(src)
+    arrays = {}
+    flags = {}
+    for name in resolve_events(events):
+        entry = EVENT_REGISTRY[name]
+        if not all(col in available for col in entry['requires']):
+            continue
+        for col in entry['requires']:
+            if col not in arrays:
+                arrays[col] = np.ascontiguousarray(src[col], dtype=float)
+        flags[name] = entry['detect'](arrays)
+    return flags
+
+
+def event_table(flags: Dict[str, np.ndarray], close: np.ndarray, dates: pd.Index,
+                symbols: List[str]) -> pd.DataFrame:
+    """
+    将(标的×K线)布尔数组汇总为事件长表
+
+    每个事件一行：event（分类，类别为全部注册事件）、close（事件当日收盘价），
+    以(date, symbol)为索引，按日期、股票、事件注册顺序排列
+    """
+    names = list(EVENT_REGISTRY)
+    close = np.atleast_2d(np.asarray(close, dtype=float))
+    # 堆叠为(K线×标的×事件)，一次nonzero即按日期、股票、事件顺序给出全部事件，无需排序
+    stacked = np.stack([np.atleast_2d(flag).T for flag in flags.values()], axis=-1) if flags else \
+        np.zeros(close.shape[::-1] + (0,), dtype=bool)
+    bar, row, position = np.nonzero(stacked)
+    code = np.array([names.index(name) for name in flags], dtype=int)[position]
+
+    index = pd.MultiIndex.from_arrays([
+        pd.Index(dates)[bar],
+        pd.Categorical.from_codes(row, list(symbols))
+    ], names=['date', 'symbol'])
+    return pd.DataFrame({
+        'event': pd.Categorical.from_codes(code, names),
+        'close': close[row, bar]
+    }, index=index)
+
+
+def detect_events(data: pd.DataFrame, symbol: str = '',
+                  events: Union[str, Iterable[str], None] = None) -> pd.DataFrame:
+    """单只股票指标表上的全部历史事件（指标表可用calculate_indicators(data, 'events')计算）"""
+    flags = event_flags(data, events)
+    return event_table(flags, data['close'].to_numpy(dtype=float), data.index, [symbol])
+
+
+def detect_panel_events(panel: Dict[str, np.ndarray], dates: pd.Index, symbols: List[str],
+                        events: Union[str, Iterable[str], None] = None) -> pd.DataFrame:
+    """
+    (标的×K线)面板上的全部历史事件
+
+    panel为{列名: (标的×K线)数组}，需包含close及事件所需的指标列；
+    calculate_indicators_panel的结果可按列名拆开后与价格面板合并传入
+    """
+    flags = event_flags(panel, events)
+    return event_table(flags, panel['close'], dates, symbols)
@@ -0,0 +1,274 @@
+"""
+组合相关性与行业暴露 - 自选股池或持仓的滚动收益相关矩阵、行业暴露与仓位限额检查
+
+各股票收盘价按日期对齐为(日期×股票)面板；相关矩阵由窗口内成对累计量得出，追加K线时
+只把新收益的外积加入、移出窗口外最旧的一根，每根K线O(N²)，不必按O(N²·T)整体重算。
+单股与行业仓位按POSITION_CONFIG的single_stock_limit、sector_limit检查，高度相关的
+股票即使行业不同也合并按sector_limit检查。
+
+用法：
+    python -m src.core.exposure --symbols 600519 000858 000001 --weights 0.3 0.2 0.2
+"""
+
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+from .config import EXPOSURE_CONFIG, POSITION_CONFIG
+from .data_store import LocalDataStore
+from .industry import IndustryTable
+
+
+def align_closes(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """各股票收盘价按日期对齐为(日期×股票)表，停牌日沿用前一收盘价，上市前为NaN"""
+    closes = pd.concat({symbol: frame['close'] for symbol, frame in frames.items()}, axis=1)
+    return closes.sort_index().ffill()
+
+
+def log_returns(closes: np.ndarray) -> np.ndarray:
+    """逐行对数收益率，首行及前一收盘价缺失处为NaN"""
+    closes = np.asarray(closes, dtype=float)
+    returns = np.full(closes.shape, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns[1:] = np.log(closes[1:] / closes[:-1])
+    return returns
+
+
+class RollingCorrelation:
+    """
+    滚动窗口收益相关矩阵的增量维护
+
+    窗口内收益率存于环形缓冲，同时维护成对有效样本数、成对求和、平方和与交叉积四个
+    (N×N)累计量；缺失收益按成对有效样本处理，与DataFrame.corr(min_periods)一致
+    """
+
+    def __init__(self, symbols: Iterable[str], window: int = None, min_periods: int = None):
+        self.symbols = list(symbols)
+        self.window = window or EXPOSURE_CONFIG['window']
+        self.min_periods = min_periods or EXPOSURE_CONFIG['min_periods']
+        self._buffer = np.full((self.window, len(self.symbols)), np.nan)
+        self._pos = 0
+        self._updates = 0
+        self._rebuild()
+
+    def _rebuild(self):
+        """由窗口数据重算累计量（缓冲中未填充的NaN行不产生贡献）"""
+        n = len(self.symbols)
+        self._count = np.zeros((n, n))
+        self._sum = np.zeros((n, n))        # [i, j]: i与j同时有效时i的收益之和
+        self._sum_sq = np.zeros((n, n))
+        self._cross = np.zeros((n, n))
+        self._accumulate(self._buffer, np.ones(self.window))
+        self._updates = 0
+
+    def _accumulate(self, rows: np.ndarray, signs: np.ndarray):
+        """把若干行收益按符号（+1加入、-1移出）计入累计量，一次矩阵乘法完成"""
+        valid = ~np.isnan(rows)
+        values = np.where(valid, rows, 0.0)
+        mask = valid.astype(float)
+        weighted_mask = mask * signs[:, None]
+        weighted_values = values * signs[:, None]
+        self._count += mask.T @ weighted_mask
+        self._sum += values.T @ weighted_mask
+        self._sum_sq += (values * values).T @ weighted_mask
+        self._cross += weighted_values.T @ values
+
+    def fit(self, returns: np.ndarray):
+        """用(K线×股票)收益矩阵的最近window行初始化"""
+        returns = np.asarray(returns, dtype=float)[-self.window:]
+        self._buffer[:] = np.nan
+        self._buffer[:len(returns)] = returns
+        self._pos = len(returns) % self.window
+        self._rebuild()
+
+    def push(self, row: np.ndarray):
+        """追加一根K线的收益，移出窗口外最旧的一根"""
+        row = np.asarray(row, dtype=float)
+        self._accumulate(np.vstack([row, self._buffer[self._pos]]), np.array([1.0, -1.0]))
+        self._buffer[self._pos] = row
+        self._pos = (self._pos + 1) % self.window
+        self._updates += 1
+        if self._updates >= EXPOSURE_CONFIG['rebuild_interval']:
+            self._rebuild()
+
+    def matrix(self) -> pd.DataFrame:
+        """当前窗口的相关矩阵"""
+        count = self._count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = self._cross - self._sum * self._sum.T / count
+            var = self._sum_sq - self._sum * self._sum / count
+            corr = np.clip(cov / np.sqrt(var * var.T), -1.0, 1.0)
+        corr[(count < self.min_periods) | ~(var > 0) | ~(var.T > 0)] = np.nan
+        diagonal = np.diag_indices_from(corr)
+        corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+
+
+def correlated_groups(corr: pd.DataFrame, threshold: float = None) -> List[List[str]]:
+    """相关系数高于threshold的股票连通成组（标签传播求连通分量），只返回两只以上的组"""
+    threshold = EXPOSURE_CONFIG['high_correlation'] if threshold is None else threshold
+    linked = corr.to_numpy() > threshold
+    n = len(linked)
+    labels = np.arange(n)
+    while True:
+        updated = np.minimum(labels, np.where(linked, labels[None, :], n).min(axis=1))
+        if np.array_equal(updated, labels):
+            break
+        labels = updated[updated]
+    symbols = np.asarray(corr.index)
+    groups = [symbols[labels == label].tolist() for label in np.unique(labels)]
+    return [group for group in groups if len(group) > 1]
+
+
+def cap_weights(weights: pd.Series, industry: IndustryTable, stock_limit: float = None,
+                sector_limit: float = None) -> pd.Series:
+    """
+    把仓位压到限额以内：单股先截断到single_stock_limit，超限行业的成分按比例缩减到sector_limit
+
+    只减不增，超出部分留作现金；未知行业不参与行业限额
+    """
+    stock_limit = POSITION_CONFIG['single_stock_limit'] if stock_limit is None else stock_limit
+    sector_limit = POSITION_CONFIG['sector_limit'] if sector_limit is None else sector_limit
+    values = np.minimum(weights.to_numpy(dtype=float), stock_limit)
+
+    codes = industry.industry_codes(weights.index)
+    known = codes >= 0
+    exposure = np.bincount(codes[known], weights=values[known], minlength=len(industry.industries))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.where(exposure > sector_limit, sector_limit / exposure, 1.0)
+    values[known] *= scale[codes[known]]
+    return pd.Series(values, index=weights.index)
+
+
+class WatchlistExposure:
+    """
+    自选股池/持仓组合的相关性与行业暴露
+
+    update传入（可能更长的）对齐收盘价面板时，只有新K线进入增量相关矩阵；股票列表变化或
+    已处理的历史被改写（复权、回补）时整体重建
+    """
+
+    def __init__(self, industry: IndustryTable = None, window: int = None):
+        self.industry = industry or IndustryTable(pd.DataFrame(columns=['symbol', 'name', 'industry']))
+        self.window = window or EXPOSURE_CONFIG['window']
+        self.correlation = None
+        self.tail = None            # 仍影响窗口收益的最近window+1行收盘价
+
+    def update(self, closes: pd.DataFrame) -> pd.DataFrame:
+        """按最新的(日期×股票)收盘价面板返回当前相关矩阵"""
+        if not self._extends(closes):
+            self.correlation = RollingCorrelation(closes.columns.tolist(), self.window)
+            self.correlation.fit(log_returns(closes.to_numpy(dtype=float)))
+        else:
+            pos = closes.index.searchsorted(self.tail.index[-1])
+            returns = log_returns(closes.iloc[pos:].to_numpy(dtype=float))
+            for row in returns[1:]:
+                self.correlation.push(row)
+        self.tail = closes.iloc[-(self.window + 1):]
+        return self.correlation.matrix()
+
+    def _extends(self, closes: pd.DataFrame) -> bool:
+        """新面板是否只是在已处理历史之后追加（窗口之前的历史被改写不影响相关矩阵）"""
+        if self.correlation is None or closes.columns.tolist() != self.correlation.symbols:
+            return False
+        end = closes.index.searchsorted(self.tail.index[-1]) + 1
+        start = end - len(self.tail)
+        if start < 0 or end > len(closes) or not closes.index[start:end].equals(self.tail.index):
+            return False
+        return np.array_equal(closes.iloc[start:end].to_numpy(dtype=float), self.tail.to_numpy(dtype=float),
+                              equal_nan=True)
+
+    def check_limits(self, weights: pd.Series) -> Dict:
+        """
+        检查仓位限额，返回{'stock', 'sector', 'correlated'}
+
+        stock、sector为超限股票/行业及其权重；correlated为合计仓位超过sector_limit的
+        高相关组（需先update）
+        """
+        stock_limit = POSITION_CONFIG['single_stock_limit']
+        sector_limit = POSITION_CONFIG['sector_limit']
+        correlated = []
+        if self.correlation is not None:
+            corr = self.correlation.matrix()
+            for group in correlated_groups(corr):
+                total = float(weights.reindex(group).fillna(0).sum())
+                if total > sector_limit:
+                    correlated.append({'symbols': group, 'weight': total})
+        return {
+            'stock': weights[weights > stock_limit].to_dict(),
+            'sector': self.industry.check_sector_limit(weights, sector_limit),
+            'correlated': correlated
+        }
+
+    def report(self, weights: pd.Series) -> Dict:
+        """相关矩阵、行业暴露、限额检查与压到限额以内的建议仓位"""
+        return {
+            'correlation': self.correlation.matrix() if self.correlation is not None else None,
+            'sector_exposure': self.industry.sector_exposure(weights),
+            'breaches': self.check_limits(weights),
+            'capped_weights': cap_weights(weights, self.industry)
+        }
+
+
+def load_watchlist(symbols: List[str], store: LocalDataStore = None) -> Optional[pd.DataFrame]:
+    """从本地仓库读取自选股日线并对齐收盘价（不联网），没有数据的股票跳过"""
+    store = store or LocalDataStore()
+    frames = {symbol: frame for symbol, frame in store.load_many('price', symbols).items()
+              if frame is not None and not frame.empty}
+    if not frames:
+        return None
+    return align_closes(frames)
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='组合相关性与行业暴露')
+    parser.add_argument('--symbols', nargs='+', required=True, help='股票代码')
+    parser.add_argument('--weights', nargs='*', type=float, default=None, help='各股票仓位（默认等权）')
+    parser.add_argument('--store', default=None, help='本地数据仓库目录')
+    parser.add_argument('--window', type=int, default=None, help='滚动相关窗口')
+    args = parser.parse_args(argv)
+
+    store = LocalDataStore(args.store)
+    closes = load_watchlist(args.symbols, store)
+    if closes is None:
+        print("❌ 本地仓库中没有这些股票的日线数据")
+        return 1
+
+    if args.weights:
+        weights = pd.Series(args.weights, index=args.symbols[:len(args.weights)])
+    else:
+        weights = pd.Series(1.0 / len(args.symbols), index=args.symbols)
+    weights = weights.reindex(closes.columns.tolist()).fillna(0.0)
+
+    try:
+        industry = IndustryTable.load(store)
+    except Exception as e:
+        print(f"加载行业成分表失败: {e}")
+        industry = None
+
+    exposure = WatchlistExposure(industry, args.window)
+    exposure.update(closes)
+    report = exposure.report(weights)
+    breaches = report['breaches']
+
+    print(f"📊 滚动相关矩阵（最近{exposure.window}根K线）")
+    print(report['correlation'].round(2).to_string())
+    print("\n🏭 行业暴露")
+    print(report['sector_exposure'].round(4).to_string())
+    for symbol, weight in breaches['stock'].items():
+        print(f"⚠️ {symbol} 仓位{weight:.1%}超过单股限额{POSITION_CONFIG['single_stock_limit']:.0%}")
+    for sector, weight in breaches['sector'].items():
+        print(f"⚠️ {sector} 行业仓位{weight:.1%}超过行业限额{POSITION_CONFIG['sector_limit']:.0%}")
+    for group in breaches['correlated']:
+        print(f"⚠️ 高相关组 {'/'.join(group['symbols'])} 合计仓位{group['weight']:.1%}超过行业限额")
+    if any(breaches.values()):
+        print("\n✂️ 限额内建议仓位")
+        print(report['capped_weights'].round(4).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import sys
+import time
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+from .config import CACHE_CONFIG
+
+
+def estimate_nbytes(value: Any) -> int:
+    """估算对象的实际内存占用（字节）"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(key) + estimate_nbytes(item) for key, item in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class FrameCache:
+    """进程内数据缓存 - 按实际内存占用做LRU淘汰"""
+
+    def __init__(self, max_bytes: int = None):
+        self.max_bytes = max_bytes or CACHE_CONFIG['max_bytes']
+        self._entries = OrderedDict()  # key -> (value, nbytes, expires_at)
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，命中后移到最近使用端"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, ttl: float = None) -> bool:
+        """写入缓存，超出预算时淘汰最久未使用的条目；单条超过预算则不缓存"""
+        nbytes = estimate_nbytes(value)
+        if nbytes > self.max_bytes:
+            return False
+
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, nbytes, expires_at)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def get_or_compute(self, key: Hashable, func: Callable[[], Any], ttl: float = None) -> Any:
+        """命中则直接返回，否则计算并写入缓存（None结果不缓存）"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        value = func()
+        if value is not None:
+            self.put(key, value, ttl)
+        return value
+
+    @staticmethod
+    def _expired(entry) -> bool:
+        return entry[2] is not None and entry[2] < time.time()
+
+    def _remove(self, key: Hashable):
+        value, nbytes, _ = self._entries.pop(key)
+        self.current_bytes -= nbytes
+
+    def pop(self, key: Hashable):
+        """删除指定条目"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def keys(self):
+        """当前全部缓存键（快照）"""
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict:
+        """缓存占用情况"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'usage_pct': self.current_bytes / self.max_bytes * 100 if self.max_bytes else 0,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total * 100 if total else 0,
+                'evictions': self.evictions
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        """与get一致：已过期的条目视为不存在并删除（不计入命中统计、不改变LRU顺序）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            if self._expired(entry):
+                self._remove(key)
+                return False
+            return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_frame_cache = None
+
+
+def get_frame_cache() -> FrameCache:
+    """获取进程级共享缓存"""
+    global _frame_cache
+    if _frame_cache is None:
+        _frame_cache = FrameCache()
+    return _frame_cache
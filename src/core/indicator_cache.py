@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Optional
+
+from .config import CACHE_CONFIG
+from .frame_cache import FrameCache, get_frame_cache
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _update_array(h, values):
+    """把一列数据的原始字节写入摘要（非数值列退化为文本）"""
+    array = np.asarray(values)
+    if array.dtype.kind in 'biufmM':
+        h.update(array.dtype.str.encode())
+        h.update(np.ascontiguousarray(array).tobytes())
+    else:
+        h.update(repr(array.tolist()).encode('utf-8'))
+
+
+def frame_fingerprint(data: pd.DataFrame, columns=None, extra=None) -> str:
+    """按内容计算DataFrame指纹（索引+指定列的原始字节+附加信息）"""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(str(len(data)).encode())
+    _update_array(h, data.index)
+    for col in (data.columns if columns is None else columns):
+        h.update(str(col).encode('utf-8'))
+        if col in data.columns:
+            _update_array(h, data[col].to_numpy())
+    if extra is not None:
+        h.update(json.dumps(extra, sort_keys=True, default=str).encode('utf-8'))
+    return h.hexdigest()
+
+
+def ohlcv_fingerprint(data: pd.DataFrame, extra=None) -> str:
+    """只按OHLCV与日期计算指纹，指标结果只依赖这些数据"""
+    return frame_fingerprint(data, PRICE_FIELDS, extra)
+
+
+def fields_fingerprint(index: pd.Index, fields: Dict[str, np.ndarray], extra=None) -> str:
+    """按日期与OHLCV数组计算指纹，与同样数据的ohlcv_fingerprint结果一致（无需先构造DataFrame）"""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(str(len(index)).encode())
+    _update_array(h, index)
+    for col in PRICE_FIELDS:
+        h.update(col.encode('utf-8'))
+        if col in fields:
+            _update_array(h, fields[col])
+    if extra is not None:
+        h.update(json.dumps(extra, sort_keys=True, default=str).encode('utf-8'))
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    """
+    按内容寻址的指标结果缓存 - 内存（FrameCache）+ 可选磁盘
+
+    磁盘缓存按保留天数与总大小限额清理：超过保留天数的结果直接删除，超出限额时按最近使用
+    时间（磁盘命中时刷新文件修改时间）删除最久未用的结果
+    """
+
+    def __init__(self, frame_cache: FrameCache = None, disk_dir: str = None, use_disk: bool = None,
+                 disk_max_bytes: int = None, disk_max_age_days: float = None):
+        self.frame_cache = frame_cache or get_frame_cache()
+        use_disk = CACHE_CONFIG['indicator_disk'] if use_disk is None else use_disk
+        self.disk_dir = (disk_dir or CACHE_CONFIG['indicator_dir']) if use_disk else None
+        self.disk_max_bytes = disk_max_bytes or CACHE_CONFIG['indicator_disk_max_bytes']
+        self.disk_max_age = (disk_max_age_days or CACHE_CONFIG['indicator_disk_max_age_days']) * 86400
+        self._disk_bytes = None     # 本进程估计的磁盘占用，首次写入时扫描目录得到
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """先查内存再查磁盘，磁盘命中后回填内存"""
+        result = self.frame_cache.get(('indicators', key))
+        if result is not None or self.disk_dir is None:
+            return result
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            result = pd.read_pickle(path)
+            os.utime(path)
+        except Exception as e:
+            print(f"读取指标缓存失败({key}): {e}")
+            return None
+        self.frame_cache.put(('indicators', key), result)
+        return result
+
+    def put(self, key: str, result: pd.DataFrame):
+        """写入内存与磁盘（先写临时文件再替换，多进程同时写入互不影响）"""
+        self.frame_cache.put(('indicators', key), result)
+        if self.disk_dir is None:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            result.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+            if self._disk_bytes is None:
+                self.prune_disk()
+            else:
+                self._disk_bytes += os.path.getsize(path)
+            if self._disk_bytes > self.disk_max_bytes:
+                self.prune_disk()
+        except Exception as e:
+            print(f"写入指标缓存失败({key}): {e}")
+
+    def prune_disk(self) -> int:
+        """删除过期结果，并按最久未用删除到限额以内，返回清理后的磁盘占用（字节）"""
+        if self.disk_dir is None or not os.path.isdir(self.disk_dir):
+            self._disk_bytes = 0
+            return 0
+        now = time.time()
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                    if now - stat.st_mtime > self.disk_max_age:
+                        os.remove(path)
+                    else:
+                        files.append((stat.st_mtime, stat.st_size, path))
+                except OSError:
+                    # 其他进程同时清理
+                    continue
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        self._disk_bytes = total
+        return total
+
+    def get_or_compute(self, key: str, func: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """命中则直接返回，否则计算并缓存"""
+        result = self.get(key)
+        if result is None:
+            result = func()
+            self.put(key, result)
+        return result
+
+    def clear(self, disk: bool = True):
+        """清空内存中的指标结果，可选同时清空磁盘缓存"""
+        for key in [k for k in self.frame_cache.keys() if isinstance(k, tuple) and k[0] == 'indicators']:
+            self.frame_cache.pop(key)
+        if disk and self.disk_dir and os.path.isdir(self.disk_dir):
+            for root, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    if name.endswith('.pkl'):
+                        os.remove(os.path.join(root, name))
+            self._disk_bytes = 0
+
+
+_indicator_cache = None
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """获取进程级共享的指标结果缓存"""
+    global _indicator_cache
+    if _indicator_cache is None:
+        _indicator_cache = IndicatorCache()
+    return _indicator_cache
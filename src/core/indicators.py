@@ -0,0 +1,325 @@
+"""
+技术指标注册表 - 每个指标声明输出列与依赖，按需只计算请求涉及的子图
+
+计算函数签名为 func(src, ta, **params) -> {列名: 数组}，src可按列名取值（DataFrame或字段->数组映射），
+ta为TA-Lib或同名接口的后端模块，因此同一套注册表可用于单只股票和(标的×K线)面板。
+参数在计算时从TECHNICAL_CONFIG读取（也可显式传入config，如参数扫描），同时作为结果缓存指纹的一部分。
+"""
+
+from collections import ChainMap
+from typing import Callable, Dict, Iterable, List, Union
+
+from .config import TECHNICAL_CONFIG
+from . import numpy_ta
+
+try:
+    import talib
+except ImportError:
+    talib = None
+
+BACKENDS = ('talib', 'numpy')
+
+INDICATOR_REGISTRY: Dict[str, Dict] = {}
+
+
+def register_indicator(name: str, outputs, depends: List[str] = None, params: Callable[[Dict], Dict] = None):
+    """
+    注册指标计算函数
+
+    outputs为输出列名列表，或按参数生成列名的函数（如均线族）；depends为依赖的其他指标
+    输出列（须先于本指标注册）；params为从TECHNICAL_CONFIG取出计算参数的函数
+    """
+    def decorator(func: Callable) -> Callable:
+        INDICATOR_REGISTRY[name] = {
+            'outputs': outputs,
+            'depends': list(depends or []),
+            'params': params or (lambda config: {}),
+            'compute': func
+        }
+        return func
+    return decorator
+
+
+def _entry_params(name: str, config: Dict = None) -> Dict:
+    return INDICATOR_REGISTRY[name]['params'](TECHNICAL_CONFIG if config is None else config)
+
+
+def _entry_outputs(name: str, config: Dict = None) -> List[str]:
+    outputs = INDICATOR_REGISTRY[name]['outputs']
+    return list(outputs(_entry_params(name, config)) if callable(outputs) else outputs)
+
+
+# 移动平均线族：周期取自配置，NumPy后端共用一次前缀和/时间循环
+@register_indicator('MA', lambda p: [f'MA{period}' for period in p['periods']],
+                    params=lambda c: {'periods': list(c['ma_periods'])})
+def _ma(src, ta, periods):
+    if ta is numpy_ta:
+        values = numpy_ta.sma_family(src['close'], periods)
+        return {f'MA{period}': values[period] for period in periods}
+    return {f'MA{period}': ta.SMA(src['close'], timeperiod=period) for period in periods}
+
+
+@register_indicator('EMA', lambda p: [f'EMA{period}' for period in p['periods']],
+                    params=lambda c: {'periods': list(c['ema_periods'])})
+def _ema(src, ta, periods):
+    if ta is numpy_ta:
+        values = numpy_ta.ema_family(src['close'], periods)
+        return {f'EMA{period}': values[period] for period in periods}
+    return {f'EMA{period}': ta.EMA(src['close'], timeperiod=period) for period in periods}
+
+
+@register_indicator('BBANDS', ['BB_upper', 'BB_middle', 'BB_lower'],
+                    params=lambda c: {'timeperiod': c['bb_period'], 'nbdev': c['bb_std']})
+def _bbands(src, ta, timeperiod, nbdev):
+    upper, middle, lower = ta.BBANDS(src['close'], timeperiod=timeperiod, nbdevup=nbdev, nbdevdn=nbdev, matype=0)
+    return {'BB_upper': upper, 'BB_middle': middle, 'BB_lower': lower}
+
+
+@register_indicator('MACD', ['MACD', 'MACD_signal', 'MACD_hist'],
+                    params=lambda c: {'fastperiod': c['macd_fast'], 'slowperiod': c['macd_slow'],
+                                      'signalperiod': c['macd_signal']})
+def _macd(src, ta, fastperiod, slowperiod, signalperiod):
+    macd, signal, hist = ta.MACD(src['close'], fastperiod=fastperiod, slowperiod=slowperiod,
+                                 signalperiod=signalperiod)
+    return {'MACD': macd, 'MACD_signal': signal, 'MACD_hist': hist}
+
+
+@register_indicator('RSI', ['RSI'], params=lambda c: {'timeperiod': c['rsi_period']})
+def _rsi(src, ta, timeperiod):
+    return {'RSI': ta.RSI(src['close'], timeperiod=timeperiod)}
+
+
+@register_indicator('ADX', ['ADX'], params=lambda c: {'timeperiod': c['adx_period']})
+def _adx(src, ta, timeperiod):
+    return {'ADX': ta.ADX(src['high'], src['low'], src['close'], timeperiod=timeperiod)}
+
+
+@register_indicator('PLUS_DI', ['PLUS_DI'], params=lambda c: {'timeperiod': c['adx_period']})
+def _plus_di(src, ta, timeperiod):
+    return {'PLUS_DI': ta.PLUS_DI(src['high'], src['low'], src['close'], timeperiod=timeperiod)}
+
+
+@register_indicator('MINUS_DI', ['MINUS_DI'], params=lambda c: {'timeperiod': c['adx_period']})
+def _minus_di(src, ta, timeperiod):
+    return {'MINUS_DI': ta.MINUS_DI(src['high'], src['low'], src['close'], timeperiod=timeperiod)}
+
+
+@register_indicator('ATR', ['ATR'], params=lambda c: {'timeperiod': c['atr_period']})
+def _atr(src, ta, timeperiod):
+    return {'ATR': ta.ATR(src['high'], src['low'], src['close'], timeperiod=timeperiod)}
+
+
+@register_indicator('Volume_MA5', ['Volume_MA5'], params=lambda c: {'timeperiod': c['volume_ma_period']})
+def _volume_ma(src, ta, timeperiod):
+    return {'Volume_MA5': ta.SMA(src['volume'], timeperiod=timeperiod)}
+
+
+@register_indicator('Volume_Ratio', ['Volume_Ratio'], depends=['Volume_MA5'])
+def _volume_ratio(src, ta):
+    return {'Volume_Ratio': src['volume'] / src['Volume_MA5']}
+
+
+@register_indicator('KDJ', ['K', 'D', 'J'],
+                    params=lambda c: {'fastk_period': c['kdj_period'], 'slowk_period': c['kdj_m1'],
+                                      'slowd_period': c['kdj_m2']})
+def _kdj(src, ta, fastk_period, slowk_period, slowd_period):
+    k, d = ta.STOCH(src['high'], src['low'], src['close'],
+                    fastk_period=fastk_period, slowk_period=slowk_period, slowk_matype=0,
+                    slowd_period=slowd_period, slowd_matype=0)
+    return {'K': k, 'D': d, 'J': 3 * k - 2 * d}
+
+
+@register_indicator('WILLR', ['WILLR'], params=lambda c: {'timeperiod': c['willr_period']})
+def _willr(src, ta, timeperiod):
+    return {'WILLR': ta.WILLR(src['high'], src['low'], src['close'], timeperiod=timeperiod)}
+
+
+@register_indicator('CCI', ['CCI'], params=lambda c: {'timeperiod': c['cci_period']})
+def _cci(src, ta, timeperiod):
+    return {'CCI': ta.CCI(src['high'], src['low'], src['close'], timeperiod=timeperiod)}
+
+
+@register_indicator('STOCHF', ['STOCH_K', 'STOCH_D'],
+                    params=lambda c: {'fastk_period': c['stochf_fastk'], 'fastd_period': c['stochf_fastd']})
+def _stochf(src, ta, fastk_period, fastd_period):
+    fast_k, fast_d = ta.STOCHF(src['high'], src['low'], src['close'],
+                               fastk_period=fastk_period, fastd_period=fastd_period, fastd_matype=0)
+    return {'STOCH_K': fast_k, 'STOCH_D': fast_d}
+
+
+@register_indicator('MOM', ['MOM'], params=lambda c: {'timeperiod': c['mom_period']})
+def _mom(src, ta, timeperiod):
+    return {'MOM': ta.MOM(src['close'], timeperiod=timeperiod)}
+
+
+@register_indicator('ROC', ['ROC'], params=lambda c: {'timeperiod': c['roc_period']})
+def _roc(src, ta, timeperiod):
+    return {'ROC': ta.ROC(src['close'], timeperiod=timeperiod)}
+
+
+@register_indicator('AD', ['AD'])
+def _ad(src, ta):
+    return {'AD': ta.AD(src['high'], src['low'], src['close'], src['volume'])}
+
+
+@register_indicator('ADOSC', ['ADOSC'],
+                    params=lambda c: {'fastperiod': c['adosc_fast'], 'slowperiod': c['adosc_slow']})
+def _adosc(src, ta, fastperiod, slowperiod):
+    return {'ADOSC': ta.ADOSC(src['high'], src['low'], src['close'], src['volume'],
+                              fastperiod=fastperiod, slowperiod=slowperiod)}
+
+
+@register_indicator('SAR', ['SAR'],
+                    params=lambda c: {'acceleration': c['sar_acceleration'], 'maximum': c['sar_maximum']})
+def _sar(src, ta, acceleration, maximum):
+    return {'SAR': ta.SAR(src['high'], src['low'], acceleration=acceleration, maximum=maximum)}
+
+
+@register_indicator('TRIX', ['TRIX'], params=lambda c: {'timeperiod': c['trix_period']})
+def _trix(src, ta, timeperiod):
+    return {'TRIX': ta.TRIX(src['close'], timeperiod=timeperiod)}
+
+
+@register_indicator('ULTOSC', ['ULTOSC'], params=lambda c: {'periods': list(c['ultosc_periods'])})
+def _ultosc(src, ta, periods):
+    return {'ULTOSC': ta.ULTOSC(src['high'], src['low'], src['close'],
+                                timeperiod1=periods[0], timeperiod2=periods[1], timeperiod3=periods[2])}
+
+
+def get_backend(name: str = None):
+    """
+    获取指标计算后端模块（TA-Lib或同名接口的NumPy实现）
+
+    name为'auto'/'talib'/'numpy'，默认取TECHNICAL_CONFIG['backend']；指定TA-Lib但未安装时回退到NumPy
+    """
+    name = name or TECHNICAL_CONFIG.get('backend', 'auto')
+    if name not in BACKENDS + ('auto',):
+        raise ValueError(f"未知的指标计算后端: {name}")
+    if name == 'numpy':
+        return numpy_ta
+    if talib is None:
+        if name == 'talib':
+            print("TA-Lib未安装，使用NumPy后端计算指标")
+        return numpy_ta
+    return talib
+
+
+def backend_name(ta) -> str:
+    """后端模块对应的名称"""
+    return 'numpy' if ta is numpy_ta else 'talib'
+
+
+def all_indicator_columns() -> List[str]:
+    """全部指标输出列（按注册顺序，均线列随配置变化）"""
+    return [col for name in INDICATOR_REGISTRY for col in _entry_outputs(name)]
+
+
+def _output_owner(column: str):
+    """输出列所属的指标名"""
+    for name in INDICATOR_REGISTRY:
+        if column in _entry_outputs(name):
+            return name
+    return None
+
+
+# 预设组合：按消费方声明所需的列，可用"+"组合，如"signals+chart"
+INDICATOR_PRESETS = {
+    # 六维信号验证
+    'signals': ['MA', 'TRIX', 'ADX', 'RSI', 'CCI', 'WILLR',
+                'Volume_Ratio', 'ADOSC', 'SAR', 'BB_upper', 'MACD', 'MACD_signal', 'ULTOSC'],
+    # 波段类型与位置
+    'band': ['ADX', 'Volume_Ratio', 'ATR', 'TRIX', 'RSI', 'MA',
+             'BB_upper', 'BB_middle', 'BB_lower', 'MACD', 'MACD_signal'],
+    # 交易决策、持仓分析与风险提示
+    'decision': ['ATR', 'RSI', 'ADX', 'Volume_Ratio', 'BB_upper', 'BB_lower', 'MACD', 'MACD_signal'],
+    # 图表（StockVisualizer）
+    'chart': ['MA', 'BB_upper', 'BB_middle', 'BB_lower',
+              'MACD', 'MACD_signal', 'MACD_hist', 'RSI', 'Volume_MA5'],
+    # 交叉与突破事件（events模块）
+    'events': ['MACD', 'MACD_signal', 'BB_upper', 'BB_lower', 'SAR', 'KDJ', 'Volume_Ratio'],
+}
+INDICATOR_PRESETS['analysis'] = sorted(set(INDICATOR_PRESETS['signals'] + INDICATOR_PRESETS['band'] +
+                                           INDICATOR_PRESETS['decision']))
+
+
+def resolve_indicators(indicators: Union[str, Iterable[str], None] = None) -> List[str]:
+    """
+    将请求解析为需要计算的指标名（含依赖，按注册顺序）
+
+    indicators可以是预设名、输出列名或指标名，字符串中用"+"组合；None或'all'表示全部
+    """
+    if indicators is None:
+        return list(INDICATOR_REGISTRY)
+    if isinstance(indicators, str):
+        indicators = indicators.split('+')
+
+    wanted = set()
+    pending = []
+    for token in indicators:
+        token = token.strip()
+        if token == 'all':
+            return list(INDICATOR_REGISTRY)
+        if token in INDICATOR_PRESETS:
+            pending.extend(INDICATOR_PRESETS[token])
+        elif token:
+            pending.append(token)
+
+    while pending:
+        token = pending.pop()
+        name = token if token in INDICATOR_REGISTRY else _output_owner(token)
+        if name is None:
+            raise ValueError(f"未注册的指标: {token}")
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(INDICATOR_REGISTRY[name]['depends'])
+
+    return [name for name in INDICATOR_REGISTRY if name in wanted]
+
+
+def compute_indicators(src, indicators: Union[str, Iterable[str], None] = None, ta=None,
+                       out: Dict = None, config: Dict = None) -> Dict:
+    """
+    按需计算指标，返回{列名: 数组}，包含被依赖的中间列；ta为后端模块，默认按配置选择
+
+    out为{列名: 预分配数组}时，每个指标算完即写入对应数组并释放中间结果，返回值中为out里的数组；
+    config为指标参数（同TECHNICAL_CONFIG的键），默认取TECHNICAL_CONFIG
+    """
+    ta = ta or get_backend()
+    results = {}
+    lookup = ChainMap(results, src)
+    for name in resolve_indicators(indicators):
+        for col, values in INDICATOR_REGISTRY[name]['compute'](lookup, ta, **_entry_params(name, config)).items():
+            if out is not None and col in out:
+                out[col][...] = values
+                values = out[col]
+            results[col] = values
+    return results
+
+
+def indicator_columns(indicators: Union[str, Iterable[str], None] = None, config: Dict = None) -> List[str]:
+    """请求涉及的全部输出列（含依赖的中间列），顺序与compute_indicators的结果一致"""
+    return [col for name in resolve_indicators(indicators) for col in _entry_outputs(name, config)]
+
+
+def indicator_params(indicators: Union[str, Iterable[str], None] = None, config: Dict = None) -> Dict[str, Dict]:
+    """请求涉及的各指标的有效参数，用于结果缓存指纹"""
+    return {name: _entry_params(name, config) for name in resolve_indicators(indicators)}
+
+
+# 指标族：一次计算同一指标的多个周期（共用前缀和/Wilder递推状态），用于策略研究
+INDICATOR_FAMILIES = {
+    'MA': ('MA{}', lambda src, periods: numpy_ta.sma_family(src['close'], periods)),
+    'EMA': ('EMA{}', lambda src, periods: numpy_ta.ema_family(src['close'], periods)),
+    'RSI': ('RSI{}', lambda src, periods: numpy_ta.rsi_family(src['close'], periods)),
+    'ATR': ('ATR{}', lambda src, periods: numpy_ta.atr_family(src['high'], src['low'], src['close'], periods)),
+    'Volume_MA': ('Volume_MA{}', lambda src, periods: numpy_ta.sma_family(src['volume'], periods)),
+}
+
+
+def compute_family(src, family: str, periods: Iterable[int]) -> Dict[str, object]:
+    """按周期批量计算指标族，如compute_family(data, 'MA', range(3, 121))，返回{列名: 数组}"""
+    if family not in INDICATOR_FAMILIES:
+        raise ValueError(f"不支持的指标族: {family}，可选: {', '.join(INDICATOR_FAMILIES)}")
+    template, func = INDICATOR_FAMILIES[family]
+    values = func(src, periods)
+    return {template.format(period): values[period] for period in sorted(values)}
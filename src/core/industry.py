@@ -0,0 +1,86 @@
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, FrozenSet, Iterable
+
+from .config import STORE_CONFIG, POSITION_CONFIG
+from .data_store import LocalDataStore
+
+UNKNOWN_INDUSTRY = '未知'
+
+
+class IndustryTable:
+    """行业成分表 - 股票与行业的双向O(1)映射"""
+
+    def __init__(self, membership: pd.DataFrame):
+        membership = membership.drop_duplicates('symbol').reset_index(drop=True)
+        self.membership = membership
+
+        # 行业编码：按行业名称排序后的位置，未知行业编码为-1
+        self.industries = pd.Index(sorted(membership['industry'].unique()))
+        codes = self.industries.get_indexer(membership['industry'])
+        self._symbol_index = pd.Index(membership['symbol'])
+        self._codes = codes
+
+        self._symbol_to_industry = dict(zip(membership['symbol'], membership['industry']))
+        self._industry_to_symbols = {
+            industry: frozenset(group['symbol'])
+            for industry, group in membership.groupby('industry')
+        }
+
+    @classmethod
+    def load(cls, store: LocalDataStore = None, fetcher=None, refresh: bool = False):
+        """从本地仓库加载成分表，过期或强制刷新时重新拉取"""
+        store = store or LocalDataStore()
+        membership = store.load('meta', 'industry')
+        updated_at = store.updated_at('meta', 'industry') or 0
+        expired = time.time() - updated_at > STORE_CONFIG['industry_refresh_days'] * 86400
+
+        if membership is None or refresh or expired:
+            if fetcher is None:
+                from .data_fetcher import StockDataFetcher
+                fetcher = StockDataFetcher(store)
+            fresh = fetcher.get_industry_membership()
+            if fresh is not None and not fresh.empty:
+                store.save('meta', 'industry', fresh)
+                membership = fresh
+
+        if membership is None:
+            membership = pd.DataFrame(columns=['symbol', 'name', 'industry'])
+        return cls(membership)
+
+    def industry_of(self, symbol: str) -> str:
+        """查询股票所属行业"""
+        return self._symbol_to_industry.get(symbol, UNKNOWN_INDUSTRY)
+
+    def constituents(self, industry: str) -> FrozenSet[str]:
+        """查询行业成分股"""
+        return self._industry_to_symbols.get(industry, frozenset())
+
+    def industry_codes(self, symbols: Iterable[str]) -> np.ndarray:
+        """批量获取行业编码（向量化），未收录的股票为-1"""
+        positions = self._symbol_index.get_indexer(pd.Index(list(symbols)))
+        # 只对已收录的股票取编码，成分表为空时也不会越界
+        matched = positions >= 0
+        codes = np.full(len(positions), -1, dtype=int)
+        codes[matched] = self._codes[positions[matched]]
+        return codes
+
+    def sector_exposure(self, weights: pd.Series) -> pd.Series:
+        """按行业汇总持仓权重，weights以股票代码为索引"""
+        codes = self.industry_codes(weights.index)
+        values = weights.to_numpy(dtype=float)
+
+        known = codes >= 0
+        exposure = np.bincount(codes[known], weights=values[known], minlength=len(self.industries))
+        result = pd.Series(exposure, index=self.industries)
+        if not known.all():
+            result[UNKNOWN_INDUSTRY] = values[~known].sum()
+        return result[result != 0].sort_values(ascending=False)
+
+    def check_sector_limit(self, weights: pd.Series, limit: float = None) -> Dict[str, float]:
+        """检查同行业仓位是否超过sector_limit，返回超限行业及其权重"""
+        limit = POSITION_CONFIG['sector_limit'] if limit is None else limit
+        exposure = self.sector_exposure(weights)
+        exceeded = exposure[(exposure > limit) & (exposure.index != UNKNOWN_INDUSTRY)]
+        return exceeded.to_dict()
@@ -0,0 +1,134 @@
+"""
+最新K线特征快照 - 同一次分析中各方法共用的紧凑记录
+
+波段识别、六维信号、持仓分析与交易决策只关心最后一根K线和少量近期窗口统计，
+这些值从指标表中一次性提取为浮点字段；均线排列、布林带收口与突破形态也只判断一次。
+"""
+
+import numpy as np
+import pandas as pd
+
+from .config import TECHNICAL_CONFIG
+
+# 字段名 -> 指标表列名（缺少该列时为NaN）
+COLUMN_FIELDS = {
+    'close': 'close',
+    'atr': 'ATR',
+    'rsi': 'RSI',
+    'cci': 'CCI',
+    'willr': 'WILLR',
+    'adx': 'ADX',
+    'trix': 'TRIX',
+    'adosc': 'ADOSC',
+    'sar': 'SAR',
+    'ultosc': 'ULTOSC',
+    'macd': 'MACD',
+    'macd_signal': 'MACD_signal',
+    'bb_upper': 'BB_upper',
+    'bb_middle': 'BB_middle',
+    'bb_lower': 'BB_lower',
+    'volume_ratio': 'Volume_Ratio',
+    'main_net_inflow': 'main_net_inflow',
+    'market_regime': 'Market_Regime',
+}
+
+# 近期窗口统计：前一根K线的MACD、20日高低点、ATR均值、年化波动率
+WINDOW_FIELDS = ('prev_macd', 'prev_macd_signal', 'high_20', 'low_20', 'atr_mean', 'volatility')
+
+# 形态判断结果
+FLAG_FIELDS = ('ma_alignment', 'bb_squeeze', 'pattern_breakthrough')
+
+FLOAT_FIELDS = tuple(COLUMN_FIELDS) + WINDOW_FIELDS
+
+
+def _mean(values: np.ndarray) -> float:
+    """忽略NaN的均值，全为NaN时返回NaN（与pandas的mean一致）"""
+    valid = values[~np.isnan(values)]
+    return valid.mean() if len(valid) else np.nan
+
+
+class LatestBar:
+    """最新K线特征快照，未提供的浮点字段为NaN、形态字段为False"""
+
+    __slots__ = FLOAT_FIELDS + FLAG_FIELDS
+
+    def __init__(self, **values):
+        for name in FLOAT_FIELDS:
+            setattr(self, name, float(values.get(name, np.nan)))
+        for name in FLAG_FIELDS:
+            setattr(self, name, bool(values.get(name, False)))
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> 'LatestBar':
+        """从指标表提取最新K线特征"""
+        n = len(data)
+        # 整张表一次性转为浮点矩阵，各列取视图；逐列按标签取Series的开销远大于计算本身
+        try:
+            block = data.to_numpy(dtype=float)
+        except (TypeError, ValueError):
+            data = data.select_dtypes('number')
+            block = data.to_numpy(dtype=float)
+        positions = {name: i for i, name in enumerate(data.columns.tolist())}
+
+        def column(name: str):
+            return block[:, positions[name]] if name in positions else None
+
+        values = {}
+        arrays = {field: column(name) for field, name in COLUMN_FIELDS.items()}
+        if n:
+            values.update({field: array[-1] for field, array in arrays.items() if array is not None})
+
+        macd, macd_signal = arrays['macd'], arrays['macd_signal']
+        if macd is not None and macd_signal is not None and n >= 2:
+            values['prev_macd'] = macd[-2]
+            values['prev_macd_signal'] = macd_signal[-2]
+
+        # 20日高低点：窗口内有缺失时为NaN（与rolling(20)一致）
+        for field, name, reduce in (('high_20', 'high', np.max), ('low_20', 'low', np.min)):
+            window = column(name)
+            if window is not None and n >= 20:
+                window = window[-20:]
+                values[field] = np.nan if np.isnan(window).any() else reduce(window)
+
+        # ATR均值与波动率使用完整历史
+        if arrays['atr'] is not None:
+            values['atr_mean'] = _mean(arrays['atr'])
+
+        close = arrays['close']
+        if close is not None and n >= 2:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                returns = close[1:] / close[:-1] - 1
+            returns = returns[~np.isnan(returns)]
+            values['volatility'] = returns.std(ddof=1) * np.sqrt(252) if len(returns) >= 2 else np.nan
+
+        latest = cls(**values)
+        latest.ma_alignment = n > 0 and cls._ma_alignment(column)
+        latest.bb_squeeze = n > 0 and cls._bollinger_squeeze(arrays)
+        latest.pattern_breakthrough = n >= 20 and latest._pattern_breakthrough()
+        return latest
+
+    @staticmethod
+    def _ma_alignment(column) -> bool:
+        """均线多头排列（按配置的均线周期由短到长）"""
+        arrays = [column(f'MA{period}') for period in sorted(TECHNICAL_CONFIG['ma_periods'])]
+        if any(array is None for array in arrays):
+            return False
+        values = [array[-1] for array in arrays]
+        return all(short > long for short, long in zip(values, values[1:]))
+
+    @staticmethod
+    def _bollinger_squeeze(arrays: dict) -> bool:
+        """布林带收口：最近一根的带宽低于近5根均值的80%"""
+        upper, lower, middle = arrays['bb_upper'], arrays['bb_lower'], arrays['bb_middle']
+        if upper is None or lower is None or middle is None:
+            return False
+        with np.errstate(invalid='ignore', divide='ignore'):
+            width = (upper[-5:] - lower[-5:]) / middle[-5:]
+        return bool(width[-1] < _mean(width) * 0.8)
+
+    def _pattern_breakthrough(self) -> bool:
+        """突破形态：布林带上轨突破、MACD金叉、成交量突破至少满足两个"""
+        bb_breakout = self.close > self.bb_upper
+        macd_cross = self.macd > self.macd_signal and self.prev_macd <= self.prev_macd_signal
+        volume_breakout = self.volume_ratio > 1.5
+        return sum([bb_breakout, macd_cross, volume_breakout]) >= 2
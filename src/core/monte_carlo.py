@@ -0,0 +1,160 @@
+"""
+蒙特卡洛持仓风险 - 按近期K线块自助重采样未来价格路径，套用止损规则估计VaR、ES与回撤概率
+
+以前一收盘价为基准的开高低收比值按整根K线成块重采样，保留同一根K线内部的关系与短期
+波动聚集；每条路径按calculate_stop_profit_loss的移动止损、紧急止损逐日检查（跳空时按
+开盘价成交），未触发的在时间止损当日收盘卖出，与决策矩阵回测的退出规则一致。
+全部路径在(路径×天数)矩阵上一次算出。
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from .config import MONTE_CARLO_CONFIG, RISK_CONFIG
+
+# 退出原因
+EXIT_REASONS = ('trailing', 'emergency', 'time')
+EXIT_TRAILING, EXIT_EMERGENCY, EXIT_TIME = range(len(EXIT_REASONS))
+
+BAR_FIELDS = ('open', 'high', 'low', 'close')
+
+
+def bar_ratios(data: pd.DataFrame, lookback: int = None) -> Dict[str, np.ndarray]:
+    """最近lookback根K线的开高低收与前一收盘价之比，含缺失值的K线剔除"""
+    lookback = lookback or MONTE_CARLO_CONFIG['lookback']
+    tail = data.tail(lookback + 1)
+    fields = {field: tail[field].to_numpy(dtype=float) for field in BAR_FIELDS}
+    prev_close = fields['close'][:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratios = {field: values[1:] / prev_close for field, values in fields.items()}
+    valid = np.logical_and.reduce([np.isfinite(values) & (values > 0) for values in ratios.values()])
+    return {field: values[valid] for field, values in ratios.items()}
+
+
+def block_bootstrap_index(n: int, paths: int, horizon: int, block_size: int,
+                          rng: np.random.Generator) -> np.ndarray:
+    """块自助法抽样位置：每条路径由若干段连续K线拼接，返回(路径×天数)的样本下标"""
+    block_size = max(1, min(block_size, n))
+    blocks = -(-horizon // block_size)
+    starts = rng.integers(0, n - block_size + 1, size=(paths, blocks))
+    index = starts[:, :, None] + np.arange(block_size)
+    return index.reshape(paths, blocks * block_size)[:, :horizon]
+
+
+def simulate_paths(ratios: Dict[str, np.ndarray], latest_price: float, paths: int, horizon: int,
+                   block_size: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """生成(路径×天数)的开高低收价格矩阵"""
+    index = block_bootstrap_index(len(ratios['close']), paths, horizon, block_size, rng)
+    close = latest_price * np.cumprod(ratios['close'][index], axis=1)
+    prev_close = np.column_stack([np.full(paths, latest_price), close[:, :-1]])
+    return {
+        'open': prev_close * ratios['open'][index],
+        'high': prev_close * ratios['high'][index],
+        'low': prev_close * ratios['low'][index],
+        'close': close
+    }
+
+
+def apply_stops(prices: Dict[str, np.ndarray], latest_price: float, stop_strategy: Dict) -> Dict[str, np.ndarray]:
+    """
+    逐路径套用止损，返回每条路径的退出天、退出价、退出原因、持有期最大回撤及不止损时整条
+    路径的最大回撤
+
+    止损线在当日开盘前确定：max(紧急止损价, 此前最高价×(1-移动止损幅度))，移动止损幅度
+    由trailing_stop相对当前价的比例得出；最低价触及止损线时按min(开盘价, 止损线)卖出
+    """
+    open_, high, low, close = (prices[field] for field in BAR_FIELDS)
+    paths, horizon = close.shape
+    trailing_pct = 1 - stop_strategy['trailing_stop'] / latest_price
+    emergency = stop_strategy['emergency_stop']
+
+    peak = np.fmax.accumulate(np.column_stack([np.full(paths, latest_price), high[:, :-1]]), axis=1)
+    trailing_level = peak * (1 - trailing_pct)
+    level = np.maximum(trailing_level, emergency)
+
+    hit = low <= level
+    rows = np.arange(paths)
+    stopped = hit.any(axis=1)
+    exit_day = np.where(stopped, hit.argmax(axis=1), horizon - 1)
+    exit_level = level[rows, exit_day]
+    exit_price = np.where(stopped, np.fmin(open_[rows, exit_day], exit_level), close[rows, exit_day])
+    exit_reason = np.select(
+        [stopped & (trailing_level[rows, exit_day] >= emergency), stopped],
+        [EXIT_TRAILING, EXIT_EMERGENCY], EXIT_TIME
+    )
+
+    # 持有期内的回撤：退出前按最低价，退出当日按成交价（止损）或最低价（时间止损）
+    days = np.arange(horizon)
+    held_low = np.where(days < exit_day[:, None], low, np.inf)
+    held_low[rows, exit_day] = np.where(stopped, exit_price, low[rows, exit_day])
+    drawdown = np.max(1 - held_low / peak, axis=1)
+
+    return {
+        'exit_day': exit_day,
+        'exit_price': exit_price,
+        'exit_reason': exit_reason,
+        'max_drawdown': drawdown,
+        'path_drawdown': np.max(1 - low / peak, axis=1)
+    }
+
+
+def tail_risk(returns: np.ndarray, confidence: float) -> tuple:
+    """收益分布的VaR与ES（以正数表示损失比例）"""
+    threshold = np.quantile(returns, 1 - confidence)
+    return float(-threshold), float(-returns[returns <= threshold].mean())
+
+
+def simulate_position_risk(data: pd.DataFrame, stop_strategy: Dict, cost_price: float = None,
+                           position_size: int = 0, params: Dict = None) -> Optional[Dict]:
+    """
+    模拟持仓未来价格路径的风险，K线不足时返回None
+
+    收益按当前价计算（即从现在起继续持有的风险）；返回各置信水平的VaR、ES（比例与金额）、
+    触及RISK_CONFIG最大回撤的概率、各退出原因占比及期望收益，并附不设止损时的对照
+    """
+    params = {**MONTE_CARLO_CONFIG, **(params or {})}
+    ratios = bar_ratios(data, params['lookback'])
+    if len(ratios['close']) < params['min_bars']:
+        return None
+
+    latest_price = float(data['close'].iloc[-1])
+    horizon = int(params['horizon'] or stop_strategy['time_stop'])
+    rng = np.random.default_rng(params['seed'])
+    prices = simulate_paths(ratios, latest_price, params['paths'], horizon, params['block_size'], rng)
+    exits = apply_stops(prices, latest_price, stop_strategy)
+
+    returns = exits['exit_price'] / latest_price - 1
+    unmanaged = prices['close'][:, -1] / latest_price - 1
+    max_drawdown = RISK_CONFIG['system_risk']['max_drawdown']
+    market_value = latest_price * position_size
+
+    tail = {}
+    for confidence in params['confidence']:
+        var, es = tail_risk(returns, confidence)
+        unmanaged_var, unmanaged_es = tail_risk(unmanaged, confidence)
+        tail[confidence] = {
+            'var': var,
+            'es': es,
+            'var_amount': var * market_value,
+            'es_amount': es * market_value,
+            'unmanaged_var': unmanaged_var,
+            'unmanaged_es': unmanaged_es
+        }
+
+    reasons = np.bincount(exits['exit_reason'], minlength=len(EXIT_REASONS)) / params['paths']
+    result = {
+        'paths': params['paths'],
+        'horizon': horizon,
+        'samples': len(ratios['close']),
+        'tail_risk': tail,
+        'expected_return': float(returns.mean()),
+        'drawdown_limit': max_drawdown,
+        'drawdown_probability': float((exits['max_drawdown'] >= max_drawdown).mean()),
+        'unmanaged_drawdown_probability': float((exits['path_drawdown'] >= max_drawdown).mean()),
+        'exit_probability': dict(zip(EXIT_REASONS, reasons.tolist())),
+        'average_holding_days': float(exits['exit_day'].mean() + 1)
+    }
+    if cost_price:
+        result['loss_probability'] = float((exits['exit_price'] < cost_price).mean())
+    return result
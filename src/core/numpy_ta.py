@@ -0,0 +1,603 @@
+"""
+NumPy向量化技术指标 - 与TA-Lib同名同参数
+
+所有函数沿最后一个轴（K线）计算，既可输入一维序列，也可输入(标的×K线)二维面板，
+面板的每一行必须是完整且等长的历史（不支持中间缺失）。输入pandas.Series时返回Series。
+递推类指标（EMA、Wilder平滑、SAR等）按时间循环，每一步对所有标的同时向量化计算；
+安装Numba时改用ta_kernels中按标的并行的编译内核。
+"""
+
+import functools
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Tuple
+
+from .config import TECHNICAL_CONFIG
+from . import ta_kernels
+
+
+def _series_aware(func):
+    """输入为Series时转为数组计算，并把结果包装回Series"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        index = None
+        converted = []
+        for arg in args:
+            if isinstance(arg, pd.Series):
+                index = arg.index if index is None else index
+                arg = arg.to_numpy(dtype=float)
+            converted.append(arg)
+        result = func(*converted, **kwargs)
+        if index is None:
+            return result
+        if isinstance(result, tuple):
+            return tuple(pd.Series(item, index=index) for item in result)
+        return pd.Series(result, index=index)
+    return wrapper
+
+
+def use_jit() -> bool:
+    """是否使用Numba编译内核"""
+    return ta_kernels.NUMBA_AVAILABLE and TECHNICAL_CONFIG.get('numba_jit', True)
+
+
+def _rows(x: np.ndarray) -> np.ndarray:
+    """转为(标的×K线)的C连续二维数组，供编译内核使用"""
+    return np.ascontiguousarray(x.reshape(-1, x.shape[-1]), dtype=float)
+
+
+def _as_float(x) -> np.ndarray:
+    return np.asarray(x, dtype=float)
+
+
+def _is_zero(x):
+    """与TA-Lib的TA_IS_ZERO一致"""
+    return (x > -0.00000001) & (x < 0.00000001)
+
+
+def _nan_like(x: np.ndarray) -> np.ndarray:
+    return np.full(x.shape, np.nan)
+
+
+def _prefix_sums(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """前缀和（先减去首值以降低累积误差），多个周期可共用"""
+    base = x[..., :1]
+    return np.cumsum(x - base, axis=-1), base
+
+
+def _rolling_sum_from_prefix(prefix: np.ndarray, base: np.ndarray, period: int) -> np.ndarray:
+    out = _nan_like(prefix)
+    n = prefix.shape[-1]
+    if n < period:
+        return out
+    sums = prefix[..., period - 1:].copy()
+    sums[..., 1:] -= prefix[..., :n - period]
+    out[..., period - 1:] = sums + base * period
+    return out
+
+
+def _rolling_sum(x: np.ndarray, period: int) -> np.ndarray:
+    """滚动求和（前缀和实现）"""
+    if x.shape[-1] < period:
+        return _nan_like(x)
+    prefix, base = _prefix_sums(x)
+    return _rolling_sum_from_prefix(prefix, base, period)
+
+
+def _rolling_extreme(x: np.ndarray, period: int, reduce: np.ufunc) -> np.ndarray:
+    """
+    滚动最大/最小值（van Herk/Gil-Werman）
+
+    按period分块求块内前缀与后缀极值，每个窗口恰好由相邻两块的后缀[i]与前缀[i+period-1]组成，
+    计算量O(n)且与周期无关；窗口内有NaN时结果为NaN（与逐窗口max/min一致）
+    """
+    out = _nan_like(x)
+    n = x.shape[-1]
+    if n < period:
+        return out
+    blocks = -(-n // period)
+    padded = np.full(x.shape[:-1] + (blocks * period,), np.nan)
+    padded[..., :n] = x
+    blocked = padded.reshape(x.shape[:-1] + (blocks, period))
+    prefix = reduce.accumulate(blocked, axis=-1).reshape(padded.shape)
+    suffix = reduce.accumulate(blocked[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    out[..., period - 1:] = reduce(suffix[..., :n - period + 1], prefix[..., period - 1:n])
+    return out
+
+
+def _rolling_max(x: np.ndarray, period: int) -> np.ndarray:
+    return _rolling_extreme(x, period, np.maximum)
+
+
+def _rolling_min(x: np.ndarray, period: int) -> np.ndarray:
+    return _rolling_extreme(x, period, np.minimum)
+
+
+def _shift(x: np.ndarray, periods: int) -> np.ndarray:
+    out = _nan_like(x)
+    if x.shape[-1] > periods:
+        out[..., periods:] = x[..., :-periods]
+    return out
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """真实波幅，首根K线为NaN"""
+    prev_close = _shift(close, 1)
+    tr = np.maximum(high - low, np.abs(high - prev_close))
+    tr = np.maximum(tr, np.abs(low - prev_close))
+    tr[..., :1] = np.nan
+    return tr
+
+
+def _sma_from(x: np.ndarray, period: int, start: int = 0) -> np.ndarray:
+    """从start位置开始有效的序列上计算SMA"""
+    out = _nan_like(x)
+    if x.shape[-1] - start >= period:
+        out[..., start:] = _rolling_sum(x[..., start:], period) / period
+    return out
+
+
+def _ema_from(x: np.ndarray, period: int, start: int = 0) -> np.ndarray:
+    """EMA：以start起前period个值的均值为种子，之后逐根递推"""
+    out = _nan_like(x)
+    n = x.shape[-1]
+    first = start + period - 1
+    if n <= first:
+        return out
+    if use_jit():
+        ta_kernels.ema_kernel(_rows(x), period, start, out.reshape(-1, n))
+        return out
+    k = 2.0 / (period + 1)
+    prev = x[..., start:first + 1].sum(axis=-1) / period
+    out[..., first] = prev
+    for t in range(first + 1, n):
+        prev = ((x[..., t] - prev) * k) + prev
+        out[..., t] = prev
+    return out
+
+
+def _wilder_from(x: np.ndarray, period: int, start: int) -> np.ndarray:
+    """Wilder平滑：以start起前period个值的均值为种子，prev=(prev*(p-1)+x)/p"""
+    out = _nan_like(x)
+    n = x.shape[-1]
+    first = start + period - 1
+    if n <= first:
+        return out
+    if use_jit():
+        ta_kernels.wilder_kernel(_rows(x), period, start, out.reshape(-1, n))
+        return out
+    prev = x[..., start:first + 1].sum(axis=-1) / period
+    out[..., first] = prev
+    for t in range(first + 1, n):
+        prev = ((prev * (period - 1)) + x[..., t]) / period
+        out[..., t] = prev
+    return out
+
+
+@_series_aware
+def SMA(real, timeperiod: int = 30):
+    return _sma_from(_as_float(real), timeperiod)
+
+
+@_series_aware
+def EMA(real, timeperiod: int = 30):
+    return _ema_from(_as_float(real), timeperiod)
+
+
+@_series_aware
+def BBANDS(real, timeperiod: int = 5, nbdevup: float = 2, nbdevdn: float = 2, matype: int = 0):
+    if matype != 0:
+        raise ValueError("NumPy后端的BBANDS只支持matype=0(SMA)")
+    real = _as_float(real)
+    middle = _rolling_sum(real, timeperiod) / timeperiod
+    mean2 = _rolling_sum(real * real, timeperiod) / timeperiod
+    variance = mean2 - middle * middle
+    stddev = np.where(variance < 0.00000001, 0.0, np.sqrt(np.abs(variance)))
+    stddev[np.isnan(middle)] = np.nan
+    return middle + stddev * nbdevup, middle, middle - stddev * nbdevdn
+
+
+@_series_aware
+def MACD(real, fastperiod: int = 12, slowperiod: int = 26, signalperiod: int = 9):
+    real = _as_float(real)
+    if slowperiod < fastperiod:
+        fastperiod, slowperiod = slowperiod, fastperiod
+    macd = _nan_like(real)
+    signal = _nan_like(real)
+    n = real.shape[-1]
+    start = slowperiod - 1
+    if n > start:
+        # 快线种子取慢线种子窗口末尾的fast根K线，与TA-Lib对齐
+        slow = _ema_from(real, slowperiod)
+        fast = _ema_from(real, fastperiod, start=slowperiod - fastperiod)
+        macd[..., start:] = fast[..., start:] - slow[..., start:]
+        signal = _ema_from(macd, signalperiod, start=start)
+    valid = start + signalperiod - 1
+    macd[..., :valid] = np.nan
+    return macd, signal, macd - signal
+
+
+@_series_aware
+def RSI(real, timeperiod: int = 14):
+    real = _as_float(real)
+    out = _nan_like(real)
+    n = real.shape[-1]
+    if n <= timeperiod:
+        return out
+    diff = np.diff(real, axis=-1)
+    gains = np.where(diff > 0, diff, 0.0)
+    losses = np.where(diff < 0, -diff, 0.0)
+    avg_gain = _wilder_from(gains, timeperiod, 0)
+    avg_loss = _wilder_from(losses, timeperiod, 0)
+    total = avg_gain + avg_loss
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(_is_zero(total), 0.0, 100.0 * (avg_gain / total))
+    rsi[np.isnan(total)] = np.nan
+    out[..., 1:] = rsi
+    return out
+
+
+@_series_aware
+def ATR(high, low, close, timeperiod: int = 14):
+    tr = _true_range(_as_float(high), _as_float(low), _as_float(close))
+    return _wilder_from(tr, timeperiod, 1)
+
+
+def _directional(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                 period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """计算PLUS_DI、MINUS_DI与ADX（TA-Lib的DM/TR累加与平滑方式）"""
+    plus_di, minus_di, adx = _nan_like(close), _nan_like(close), _nan_like(close)
+    n = close.shape[-1]
+    if n <= period:
+        return plus_di, minus_di, adx
+
+    diff_p = np.diff(high, axis=-1)
+    diff_m = -np.diff(low, axis=-1)
+    minus_mask = (diff_m > 0) & (diff_p < diff_m)
+    plus_mask = ~minus_mask & (diff_p > 0) & (diff_p > diff_m)
+    minus_dm = np.where(minus_mask, diff_m, 0.0)
+    plus_dm = np.where(plus_mask, diff_p, 0.0)
+    tr = _true_range(high, low, close)[..., 1:]
+
+    if use_jit():
+        ta_kernels.directional_kernel(_rows(plus_dm), _rows(minus_dm), _rows(tr), period,
+                                      plus_di.reshape(-1, n), minus_di.reshape(-1, n), adx.reshape(-1, n))
+        return plus_di, minus_di, adx
+
+    # 前period-1根直接累加
+    prev_plus = plus_dm[..., :period - 1].sum(axis=-1)
+    prev_minus = minus_dm[..., :period - 1].sum(axis=-1)
+    prev_tr = tr[..., :period - 1].sum(axis=-1)
+    sum_dx = np.zeros(prev_tr.shape)
+    prev_adx = None
+
+    for i in range(period - 1, n - 1):
+        t = i + 1
+        prev_minus = prev_minus - prev_minus / period + minus_dm[..., i]
+        prev_plus = prev_plus - prev_plus / period + plus_dm[..., i]
+        prev_tr = prev_tr - (prev_tr / period) + tr[..., i]
+
+        tr_zero = _is_zero(prev_tr)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m_di = np.where(tr_zero, 0.0, 100.0 * (prev_minus / prev_tr))
+            p_di = np.where(tr_zero, 0.0, 100.0 * (prev_plus / prev_tr))
+            di_total = m_di + p_di
+            dx_valid = ~tr_zero & ~_is_zero(di_total)
+            dx = np.where(dx_valid, 100.0 * (np.abs(m_di - p_di) / di_total), 0.0)
+        plus_di[..., t] = p_di
+        minus_di[..., t] = m_di
+
+        adx_count = i - period + 2
+        if adx_count <= period:
+            sum_dx = sum_dx + np.where(dx_valid, dx, 0.0)
+            if adx_count == period:
+                prev_adx = sum_dx / period
+                adx[..., t] = prev_adx
+        else:
+            prev_adx = np.where(dx_valid, ((prev_adx * (period - 1)) + dx) / period, prev_adx)
+            adx[..., t] = prev_adx
+
+    return plus_di, minus_di, adx
+
+
+@_series_aware
+def ADX(high, low, close, timeperiod: int = 14):
+    return _directional(_as_float(high), _as_float(low), _as_float(close), timeperiod)[2]
+
+
+@_series_aware
+def PLUS_DI(high, low, close, timeperiod: int = 14):
+    return _directional(_as_float(high), _as_float(low), _as_float(close), timeperiod)[0]
+
+
+@_series_aware
+def MINUS_DI(high, low, close, timeperiod: int = 14):
+    return _directional(_as_float(high), _as_float(low), _as_float(close), timeperiod)[1]
+
+
+def _fast_k(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    highest = _rolling_max(high, period)
+    lowest = _rolling_min(low, period)
+    diff = (highest - lowest) / 100.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fast_k = np.where(diff != 0.0, (close - lowest) / diff, 0.0)
+    fast_k[np.isnan(diff)] = np.nan
+    return fast_k
+
+
+@_series_aware
+def STOCH(high, low, close, fastk_period: int = 5, slowk_period: int = 3, slowk_matype: int = 0,
+          slowd_period: int = 3, slowd_matype: int = 0):
+    if slowk_matype != 0 or slowd_matype != 0:
+        raise ValueError("NumPy后端的STOCH只支持matype=0(SMA)")
+    fast_k = _fast_k(_as_float(high), _as_float(low), _as_float(close), fastk_period)
+    slow_k = _sma_from(fast_k, slowk_period, fastk_period - 1)
+    slow_d = _sma_from(slow_k, slowd_period, fastk_period + slowk_period - 2)
+    slow_k[np.isnan(slow_d)] = np.nan
+    return slow_k, slow_d
+
+
+@_series_aware
+def STOCHF(high, low, close, fastk_period: int = 5, fastd_period: int = 3, fastd_matype: int = 0):
+    if fastd_matype != 0:
+        raise ValueError("NumPy后端的STOCHF只支持matype=0(SMA)")
+    fast_k = _fast_k(_as_float(high), _as_float(low), _as_float(close), fastk_period)
+    fast_d = _sma_from(fast_k, fastd_period, fastk_period - 1)
+    fast_k[np.isnan(fast_d)] = np.nan
+    return fast_k, fast_d
+
+
+@_series_aware
+def WILLR(high, low, close, timeperiod: int = 14):
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    highest = _rolling_max(high, timeperiod)
+    lowest = _rolling_min(low, timeperiod)
+    diff = (highest - lowest) / (-100.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.where(diff != 0.0, (highest - close) / diff, 0.0)
+    out[np.isnan(diff)] = np.nan
+    return out
+
+
+@_series_aware
+def CCI(high, low, close, timeperiod: int = 14):
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    typical = (high + low + close) / 3
+    out = _nan_like(typical)
+    if typical.shape[-1] < timeperiod:
+        return out
+    windows = sliding_window_view(typical, timeperiod, axis=-1)
+    average = windows.sum(axis=-1) / timeperiod
+    deviation = np.abs(windows - average[..., None]).sum(axis=-1)
+    diff = typical[..., timeperiod - 1:] - average
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cci = np.where((diff != 0.0) & (deviation != 0.0),
+                       diff / (0.015 * (deviation / timeperiod)), 0.0)
+    out[..., timeperiod - 1:] = cci
+    return out
+
+
+@_series_aware
+def MOM(real, timeperiod: int = 10):
+    real = _as_float(real)
+    return real - _shift(real, timeperiod)
+
+
+@_series_aware
+def ROC(real, timeperiod: int = 10):
+    real = _as_float(real)
+    previous = _shift(real, timeperiod)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.where(previous != 0.0, ((real / previous) - 1.0) * 100.0, 0.0)
+    out[np.isnan(previous)] = np.nan
+    return out
+
+
+def _money_flow_volume(high, low, close, volume) -> np.ndarray:
+    spread = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(spread > 0.0, (((close - low) - (high - close)) / spread) * volume, 0.0)
+
+
+@_series_aware
+def AD(high, low, close, volume):
+    flow = _money_flow_volume(_as_float(high), _as_float(low), _as_float(close), _as_float(volume))
+    return np.cumsum(flow, axis=-1)
+
+
+def _adosc_from_ad(ad: np.ndarray, fastperiod: int, slowperiod: int) -> np.ndarray:
+    """ADOSC：两条以首个AD值为种子的EMA之差"""
+    out = _nan_like(ad)
+    n = ad.shape[-1]
+    lookback = max(fastperiod, slowperiod) - 1
+    if n <= lookback:
+        return out
+    if use_jit():
+        ta_kernels.adosc_kernel(_rows(ad), fastperiod, slowperiod, out.reshape(-1, n))
+        return out
+    fast_k = 2.0 / (fastperiod + 1)
+    slow_k = 2.0 / (slowperiod + 1)
+    fast = ad[..., 0]
+    slow = ad[..., 0]
+    for t in range(1, n):
+        fast = (fast_k * ad[..., t]) + ((1.0 - fast_k) * fast)
+        slow = (slow_k * ad[..., t]) + ((1.0 - slow_k) * slow)
+        if t >= lookback:
+            out[..., t] = fast - slow
+    return out
+
+
+@_series_aware
+def ADOSC(high, low, close, volume, fastperiod: int = 3, slowperiod: int = 10):
+    ad = AD(high, low, close, volume)
+    return _adosc_from_ad(ad, fastperiod, slowperiod)
+
+
+@_series_aware
+def SAR(high, low, acceleration: float = 0.02, maximum: float = 0.2):
+    high, low = _as_float(high), _as_float(low)
+    out = _nan_like(high)
+    n = high.shape[-1]
+    if n < 2:
+        return out
+    if acceleration > maximum:
+        acceleration = maximum
+    if use_jit():
+        ta_kernels.sar_kernel(_rows(high), _rows(low), float(acceleration), float(maximum), out.reshape(-1, n))
+        return out
+
+    # 首根K线用MINUS_DM判断初始方向
+    diff_p = high[..., 1] - high[..., 0]
+    diff_m = low[..., 0] - low[..., 1]
+    is_long = ~((diff_m > 0) & (diff_p < diff_m))
+    ep = np.where(is_long, high[..., 1], low[..., 1])
+    sar = np.where(is_long, low[..., 0], high[..., 0])
+    af = np.full(ep.shape, acceleration)
+    new_low, new_high = low[..., 1], high[..., 1]
+
+    for t in range(1, n):
+        prev_low, prev_high = new_low, new_high
+        new_low, new_high = low[..., t], high[..., t]
+
+        # 多头反转为空头
+        to_short = is_long & (new_low <= sar)
+        # 空头反转为多头
+        to_long = ~is_long & (new_high >= sar)
+        stay_long = is_long & ~to_short
+        stay_short = ~is_long & ~to_long
+
+        reversal_short = np.maximum(np.maximum(ep, prev_high), new_high)
+        reversal_long = np.minimum(np.minimum(ep, prev_low), new_low)
+        output = np.where(to_short, reversal_short, np.where(to_long, reversal_long, sar))
+        out[..., t] = output
+
+        extend_long = stay_long & (new_high > ep)
+        extend_short = stay_short & (new_low < ep)
+        af = np.where(to_short | to_long, acceleration,
+                      np.where(extend_long | extend_short, np.minimum(af + acceleration, maximum), af))
+        ep = np.where(to_short | extend_short, new_low, np.where(to_long | extend_long, new_high, ep))
+
+        base = np.where(to_short | to_long, output, sar)
+        next_sar = base + af * (ep - base)
+        short_side = to_short | stay_short
+        next_sar = np.where(short_side, np.maximum(np.maximum(next_sar, prev_high), new_high),
+                            np.minimum(np.minimum(next_sar, prev_low), new_low))
+        sar = next_sar
+        is_long = to_long | stay_long
+
+    return out
+
+
+@_series_aware
+def TRIX(real, timeperiod: int = 30):
+    real = _as_float(real)
+    ema1 = _ema_from(real, timeperiod)
+    ema2 = _ema_from(ema1, timeperiod, timeperiod - 1)
+    ema3 = _ema_from(ema2, timeperiod, 2 * (timeperiod - 1))
+    return ROC(ema3, 1)
+
+
+@_series_aware
+def ULTOSC(high, low, close, timeperiod1: int = 7, timeperiod2: int = 14, timeperiod3: int = 28):
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    periods = sorted([timeperiod1, timeperiod2, timeperiod3])
+    prev_close = _shift(close, 1)
+    true_low = np.where(low < prev_close, low, prev_close)
+    close_minus_true_low = close - true_low
+    true_range = _true_range(high, low, close)
+
+    output = np.zeros(close.shape)
+    for period, weight in zip(periods, (4.0, 2.0, 1.0)):
+        a_total = np.full(close.shape, np.nan)
+        b_total = np.full(close.shape, np.nan)
+        a_total[..., 1:] = _rolling_sum(close_minus_true_low[..., 1:], period)
+        b_total[..., 1:] = _rolling_sum(true_range[..., 1:], period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            output = output + np.where(_is_zero(b_total), 0.0, weight * (a_total / b_total))
+    output = 100.0 * (output / 7.0)
+    output[..., :periods[2]] = np.nan
+    return output
+
+
+def _family_periods(periods) -> np.ndarray:
+    return np.asarray(sorted({int(p) for p in periods}), dtype=np.int64)
+
+
+def _recursive_family(x: np.ndarray, periods: np.ndarray, start: int, kind: str) -> np.ndarray:
+    """
+    多周期递推（EMA或Wilder平滑），返回(周期×...×K线)数组
+
+    所有周期共用一次时间循环和前缀累加，种子为start起前period个值的均值
+    """
+    out = np.full((len(periods),) + x.shape, np.nan)
+    n = x.shape[-1]
+    if use_jit():
+        flat = out.reshape(len(periods), -1, n)
+        if kind == 'ema':
+            ta_kernels.ema_family_kernel(_rows(x), periods, flat)
+        else:
+            ta_kernels.wilder_family_kernel(_rows(x), periods, start, flat)
+        return out
+
+    shape = (len(periods),) + (1,) * (x.ndim - 1)
+    firsts = start + periods - 1
+    coef = (2.0 / (periods + 1)).reshape(shape) if kind == 'ema' else periods.reshape(shape).astype(float)
+    prev = np.full((len(periods),) + x.shape[:-1], np.nan)
+    total = np.zeros(x.shape[:-1])
+    for t in range(start, n):
+        value = x[..., t]
+        total = total + value
+        active = firsts < t
+        if active.any():
+            if kind == 'ema':
+                prev[active] = ((value - prev[active]) * coef[active]) + prev[active]
+            else:
+                prev[active] = ((prev[active] * (coef[active] - 1)) + value) / coef[active]
+        seed = firsts == t
+        if seed.any():
+            prev[seed] = total / periods[seed].reshape((-1,) + shape[1:])
+        out[..., t] = prev
+    return out
+
+
+def sma_family(real, periods) -> Dict[int, np.ndarray]:
+    """多周期SMA，共用一次前缀和"""
+    real = _as_float(real)
+    prefix, base = _prefix_sums(real)
+    return {int(p): _rolling_sum_from_prefix(prefix, base, int(p)) / int(p) for p in _family_periods(periods)}
+
+
+def ema_family(real, periods) -> Dict[int, np.ndarray]:
+    """多周期EMA，共用一次时间循环"""
+    real = _as_float(real)
+    periods = _family_periods(periods)
+    values = _recursive_family(real, periods, 0, 'ema')
+    return {int(p): values[i] for i, p in enumerate(periods)}
+
+
+def rsi_family(real, periods) -> Dict[int, np.ndarray]:
+    """多周期RSI，共用涨跌幅序列与一次Wilder递推"""
+    real = _as_float(real)
+    periods = _family_periods(periods)
+    result = {int(p): _nan_like(real) for p in periods}
+    if real.shape[-1] < 2:
+        return result
+    diff = np.diff(real, axis=-1)
+    gains = _recursive_family(np.where(diff > 0, diff, 0.0), periods, 0, 'wilder')
+    losses = _recursive_family(np.where(diff < 0, -diff, 0.0), periods, 0, 'wilder')
+    total = gains + losses
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(_is_zero(total), 0.0, 100.0 * (gains / total))
+    rsi[np.isnan(total)] = np.nan
+    for i, p in enumerate(periods):
+        result[int(p)][..., 1:] = rsi[i]
+    return result
+
+
+def atr_family(high, low, close, periods) -> Dict[int, np.ndarray]:
+    """多周期ATR，共用真实波幅与一次Wilder递推"""
+    tr = _true_range(_as_float(high), _as_float(low), _as_float(close))
+    periods = _family_periods(periods)
+    values = _recursive_family(tr, periods, 1, 'wilder')
+    return {int(p): values[i] for i, p in enumerate(periods)}
@@ -0,0 +1,167 @@
+"""
+全市场筛选 - 从本地数据仓库批量计算六维信号、波段类型与波段位置，按信号强度排序
+
+股票按批分发到多个进程，每个进程自行从本地仓库读取数据（只传代码，不传DataFrame），
+基准指数与股票名称每个进程只加载一次；每批先按黑名单规则整体过滤，再计算指标。
+
+用法：
+    python -m src.core.screener
+    python -m src.core.screener --symbols 600519 000001 --top 20
+"""
+
+import os
+import sys
+import argparse
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .config import SCREENER_CONFIG
+from .data_fetcher import StockDataFetcher
+from .data_store import LocalDataStore
+from .technical_analysis import TechnicalAnalyzer
+from .universe import eligible_symbols, load_names
+
+SORT_COLUMNS = ['signal_count', 'overall_score']
+
+
+def evaluate_symbol(analyzer: TechnicalAnalyzer, symbol: str, data: pd.DataFrame) -> Optional[Dict]:
+    """评估一只股票最近的K线，返回一行筛选结果；K线不足时返回None"""
+    data = data.tail(SCREENER_CONFIG['lookback_bars'])
+    if len(data) < SCREENER_CONFIG['min_bars']:
+        return None
+
+    data_with_indicators = analyzer.calculate_indicators(data, 'analysis')
+    latest = analyzer.latest_bar(data_with_indicators)
+    signal_result = analyzer.six_dimension_signal_check(data_with_indicators, latest=latest)
+    band_info = analyzer.identify_band_type(data_with_indicators, latest)
+    return {
+        'symbol': symbol,
+        'date': data_with_indicators.index[-1],
+        'close': latest.close,
+        'signal_count': signal_result['signal_count'],
+        'overall_score': signal_result['overall_score'],
+        'recommendation': signal_result['recommendation'],
+        'band_type': band_info['type'],
+        'band_position': band_info['position'],
+        'position_percent': band_info['position_percent'],
+        **{key: bool(signal['status']) for key, signal in signal_result['signals'].items()}
+    }
+
+
+_worker = {}
+
+
+def _init_worker(store_dir: Optional[str], apply_blacklist: bool = True):
+    """子进程初始化：打开本地仓库，加载基准指数与股票名称"""
+    store = LocalDataStore(store_dir)
+    fetcher = StockDataFetcher(store)
+    _worker['store'] = store
+    _worker['fetcher'] = fetcher
+    _worker['analyzer'] = TechnicalAnalyzer(fetcher.stored_benchmark_indices())
+    _worker['names'] = load_names(store) if apply_blacklist else None
+
+
+def screen_symbols(symbols: List[str]) -> tuple:
+    """筛选一批股票（在子进程中执行），返回(结果行, 被黑名单排除的股票数)"""
+    store, fetcher, analyzer = _worker['store'], _worker['fetcher'], _worker['analyzer']
+    frames = {}
+    for symbol in symbols:
+        data = store.load('price', symbol)
+        if data is not None and not data.empty:
+            frames[symbol] = data
+
+    eligible = frames
+    if _worker['names'] is not None:
+        eligible = {symbol: frames[symbol] for symbol in eligible_symbols(frames, _worker['names'])}
+
+    rows = []
+    for symbol, data in eligible.items():
+        try:
+            # 使用已同步到本地的资金流向历史做资金验证（不联网）
+            data = fetcher.attach_fund_flow_history(data, symbol, sync=False)
+            row = evaluate_symbol(analyzer, symbol, data)
+            if row is not None:
+                rows.append(row)
+        except Exception as e:
+            print(f"筛选{symbol}失败: {e}")
+    return rows, len(frames) - len(eligible)
+
+
+def rank_results(rows: List[Dict], names: Dict[str, str] = None) -> pd.DataFrame:
+    """按信号数量、综合评分降序排列"""
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    if names:
+        table.insert(1, 'name', table['symbol'].map(names).fillna(''))
+    return table.sort_values(SORT_COLUMNS + ['symbol'], ascending=[False, False, True], ignore_index=True)
+
+
+def run_screener(symbols: List[str] = None, store_dir: str = None, workers: int = None,
+                 apply_blacklist: bool = None) -> pd.DataFrame:
+    """筛选全部（或指定）股票，返回排序后的结果表"""
+    store = LocalDataStore(store_dir)
+    symbols = symbols or store.keys('price')
+    workers = workers or SCREENER_CONFIG['workers'] or os.cpu_count() or 1
+    if apply_blacklist is None:
+        apply_blacklist = SCREENER_CONFIG['apply_blacklist']
+    size = SCREENER_CONFIG['chunk_size']
+    chunks = [symbols[i:i + size] for i in range(0, len(symbols), size)]
+    print(f"全市场筛选: {len(symbols)}只股票, {len(chunks)}批, {workers}个进程")
+
+    rows = []
+    excluded = 0
+    if workers <= 1 or len(chunks) <= 1:
+        _init_worker(store_dir, apply_blacklist)
+        for chunk in chunks:
+            chunk_rows, chunk_excluded = screen_symbols(chunk)
+            rows.extend(chunk_rows)
+            excluded += chunk_excluded
+        _worker.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(store_dir, apply_blacklist)) as pool:
+            futures = [pool.submit(screen_symbols, chunk) for chunk in chunks]
+            for done, future in enumerate(as_completed(futures), 1):
+                chunk_rows, chunk_excluded = future.result()
+                rows.extend(chunk_rows)
+                excluded += chunk_excluded
+                if done % 10 == 0 or done == len(futures):
+                    print(f"   已完成 {done}/{len(futures)}批")
+    if apply_blacklist:
+        print(f"   黑名单规则排除 {excluded}只股票")
+
+    return rank_results(rows, load_names(store))
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='全市场六维信号筛选')
+    parser.add_argument('--symbols', nargs='*', default=None, help='只筛选指定股票（默认本地仓库全部股票）')
+    parser.add_argument('--store', default=None, help='本地数据仓库目录')
+    parser.add_argument('--workers', type=int, default=None, help='进程数')
+    parser.add_argument('--output', default=None, help='结果CSV路径')
+    parser.add_argument('--top', type=int, default=20, help='显示排名前N的股票')
+    parser.add_argument('--no-blacklist', action='store_true', help='不按黑名单规则预先过滤')
+    args = parser.parse_args(argv)
+
+    start = datetime.now()
+    table = run_screener(args.symbols, args.store, args.workers, False if args.no_blacklist else None)
+    if table.empty:
+        print("❌ 没有可筛选的股票数据")
+        return 1
+
+    output = args.output or os.path.join(SCREENER_CONFIG['output_dir'], f"screen_{start:%Y%m%d_%H%M%S}.csv")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    table.to_csv(output, index=False, encoding='utf-8-sig')
+
+    elapsed = (datetime.now() - start).total_seconds()
+    print(f"✅ 已筛选 {len(table)} 只股票，用时{elapsed:.1f}秒 -> {output}")
+    print(table.head(args.top).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
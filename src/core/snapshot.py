@@ -0,0 +1,225 @@
+"""
+离线快照包 - 将本地数据仓库导出为单个带版本号的文件，启动时内存映射挂载
+
+文件布局：
+    MAGIC(8字节) | 版本(uint16) | 清单长度(uint64) | 清单JSON | 对齐填充 | 数据块...
+数值列以原始字节按64字节对齐存放，挂载后通过mmap零拷贝读取；文本列存放在清单中。
+
+用法：
+    python -m src.core.snapshot export data/snapshot.bmsnap
+    python -m src.core.snapshot import data/snapshot.bmsnap
+    python -m src.core.snapshot info data/snapshot.bmsnap
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .data_store import LocalDataStore
+
+MAGIC = b'BMSNAP\x00\x00'
+BUNDLE_VERSION = 1
+ALIGNMENT = 64
+_HEADER = struct.Struct('<HQ')
+
+
+def _aligned(size: int) -> int:
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _encode_array(values, blocks: List[np.ndarray], offset: int):
+    """编码一列数据，返回(描述, 新偏移量)；数值与时间列写入数据块，其余写入清单"""
+    if isinstance(values, pd.RangeIndex):
+        return {'type': 'range', 'start': values.start, 'step': values.step}, offset
+
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.datetime64):
+        array = array.astype('datetime64[ns]')
+        spec = {'type': 'datetime', 'dtype': '<i8'}
+        array = array.view('<i8')
+    elif array.dtype.kind in 'biuf':
+        spec = {'type': 'numeric', 'dtype': array.dtype.str}
+    else:
+        return {'type': 'json', 'values': [None if pd.isna(v) else v for v in array.tolist()]}, offset
+
+    array = np.ascontiguousarray(array)
+    spec['offset'] = offset
+    blocks.append(array)
+    return spec, offset + _aligned(array.nbytes)
+
+
+def export_snapshot(path: str, store: LocalDataStore = None, kinds: List[str] = None) -> Dict:
+    """将本地仓库导出为快照包，返回导出摘要"""
+    store = store or LocalDataStore(snapshot=False)
+    kinds = kinds or store.kinds()
+
+    manifest = {
+        'version': BUNDLE_VERSION,
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'frames': []
+    }
+    blocks = []
+    offset = 0
+
+    for kind in kinds:
+        for key, frame in store.load_many(kind).items():
+            entry = {'kind': kind, 'key': key, 'rows': len(frame),
+                     'index_name': frame.index.name, 'updated_at': store.updated_at(kind, key),
+                     'columns': []}
+            entry['index'], offset = _encode_array(frame.index, blocks, offset)
+            for column in frame.columns:
+                spec, offset = _encode_array(frame[column].to_numpy(), blocks, offset)
+                spec['name'] = column
+                entry['columns'].append(spec)
+            manifest['frames'].append(entry)
+
+    header = json.dumps(manifest, ensure_ascii=False, default=str).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + _HEADER.size + len(header))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(BUNDLE_VERSION, len(header)))
+        f.write(header)
+        f.write(b'\x00' * (data_start - f.tell()))
+        for array in blocks:
+            raw = array.tobytes()
+            f.write(raw)
+            f.write(b'\x00' * (_aligned(len(raw)) - len(raw)))
+    os.replace(tmp_path, path)
+
+    return {
+        'path': path,
+        'version': BUNDLE_VERSION,
+        'frames': len(manifest['frames']),
+        'bytes': os.path.getsize(path)
+    }
+
+
+class SnapshotBundle:
+    """已挂载的快照包 - 按需从内存映射中构造DataFrame"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"快照包为空: {path}")
+
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"不是有效的快照包: {path}")
+
+        version, header_len = _HEADER.unpack_from(self._mm, len(MAGIC))
+        if version > BUNDLE_VERSION:
+            self.close()
+            raise ValueError(f"快照包版本{version}高于当前支持的版本{BUNDLE_VERSION}")
+
+        header_start = len(MAGIC) + _HEADER.size
+        self.manifest = json.loads(self._mm[header_start:header_start + header_len].decode('utf-8'))
+        self.version = version
+        self._data_start = _aligned(header_start + header_len)
+        self._entries = {(e['kind'], e['key']): e for e in self.manifest['frames']}
+
+    def _decode_array(self, spec: Dict, rows: int):
+        if spec['type'] == 'range':
+            return pd.RangeIndex(spec['start'], spec['start'] + spec['step'] * rows, spec['step'])
+        if spec['type'] == 'json':
+            return np.array(spec['values'], dtype=object)
+        array = np.frombuffer(self._mm, dtype=np.dtype(spec['dtype']), count=rows,
+                              offset=self._data_start + spec['offset'])
+        if spec['type'] == 'datetime':
+            return array.view('datetime64[ns]')
+        return array
+
+    def kinds(self) -> List[str]:
+        """快照包中的全部分类"""
+        return sorted({kind for kind, _ in self._entries})
+
+    def keys(self, kind: str) -> List[str]:
+        """快照包中某分类的全部代码"""
+        return sorted(key for k, key in self._entries if k == kind)
+
+    def has(self, kind: str, key: str) -> bool:
+        return (kind, key) in self._entries
+
+    def updated_at(self, kind: str, key: str) -> Optional[float]:
+        """导出时该份数据的写入时间（时间戳），清单未记录时按快照包创建时间"""
+        entry = self._entries.get((kind, key))
+        if entry is None:
+            return None
+        if entry.get('updated_at') is not None:
+            return float(entry['updated_at'])
+        return datetime.strptime(self.manifest['created_at'], '%Y-%m-%d %H:%M:%S').timestamp()
+
+    def frame(self, kind: str, key: str) -> Optional[pd.DataFrame]:
+        """读取一份数据，数值列直接引用映射内存（只读）"""
+        entry = self._entries.get((kind, key))
+        if entry is None:
+            return None
+        rows = entry['rows']
+        index = pd.Index(self._decode_array(entry['index'], rows), name=entry.get('index_name'))
+        columns = {spec['name']: self._decode_array(spec, rows) for spec in entry['columns']}
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def close(self):
+        try:
+            self._mm.close()
+        except Exception:
+            pass
+        self._file.close()
+
+
+def import_snapshot(path: str, store: LocalDataStore = None) -> Dict:
+    """将快照包解包写入本地仓库（覆盖同名数据）"""
+    store = store or LocalDataStore(snapshot=False)
+    bundle = SnapshotBundle(path)
+    count = 0
+    try:
+        for kind in bundle.kinds():
+            for key in bundle.keys(kind):
+                store.save(kind, key, bundle.frame(kind, key).copy(), bundle.updated_at(kind, key))
+                count += 1
+    finally:
+        bundle.close()
+    return {'path': path, 'version': bundle.version, 'frames': count}
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='BandMaster Pro 离线快照包工具')
+    parser.add_argument('action', choices=['export', 'import', 'info'], help='导出 / 解包导入 / 查看信息')
+    parser.add_argument('path', help='快照包路径')
+    parser.add_argument('--store', default=None, help='本地数据仓库目录')
+    parser.add_argument('--kinds', nargs='*', default=None, help='只导出指定分类')
+    args = parser.parse_args(argv)
+
+    store = LocalDataStore(args.store, snapshot=False)
+
+    if args.action == 'export':
+        result = export_snapshot(args.path, store, args.kinds)
+        print(f"✅ 已导出 {result['frames']} 份数据，{result['bytes'] / 1024 / 1024:.1f}MB -> {result['path']}")
+    elif args.action == 'import':
+        result = import_snapshot(args.path, store)
+        print(f"✅ 已导入 {result['frames']} 份数据 -> {store.root_dir}")
+    else:
+        bundle = SnapshotBundle(args.path)
+        print(f"📦 版本: {bundle.version}  创建时间: {bundle.manifest['created_at']}")
+        for kind in bundle.kinds():
+            print(f"   - {kind}: {len(bundle.keys(kind))} 份")
+        bundle.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
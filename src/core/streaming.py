@@ -0,0 +1,742 @@
+import math
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Dict
+
+from .config import TECHNICAL_CONFIG
+
+NAN = float('nan')
+
+
+def _is_zero(value: float) -> bool:
+    """与TA-Lib的TA_IS_ZERO一致"""
+    return -0.00000001 < value < 0.00000001
+
+
+def _true_range(high: float, low: float, prev_close: float) -> float:
+    """与TA-Lib的TRUE_RANGE宏一致（比较顺序相同）"""
+    result = high - low
+    temp = abs(high - prev_close)
+    if temp > result:
+        result = temp
+    temp = abs(low - prev_close)
+    if temp > result:
+        result = temp
+    return result
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    """与pandas列除法一致：除以0得到inf，0/0得到NaN"""
+    if denominator != 0:
+        return numerator / denominator
+    if numerator == 0 or math.isnan(numerator):
+        return NAN
+    return math.copysign(math.inf, numerator)
+
+
+def _clone(value):
+    """
+    复制指标状态：对象、字典、列表与deque逐层复制，元素（浮点数、元组）不可变直接共享
+
+    比copy.deepcopy少了逐个元素的备忘查找，试算未收盘K线时每次复制都要用到
+    """
+    if isinstance(value, deque):
+        return deque(value, maxlen=value.maxlen)
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    if hasattr(value, '__dict__'):
+        clone = object.__new__(type(value))
+        clone.__dict__.update({key: _clone(item) for key, item in value.__dict__.items()})
+        return clone
+    return value
+
+
+class _SMA:
+    """简单移动平均 - 与TA-Lib相同的滚动求和顺序"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+
+    def update(self, value: float) -> float:
+        self.window.append(value)
+        self.total += value
+        if len(self.window) < self.period:
+            return NAN
+        result = self.total / self.period
+        self.total -= self.window.popleft()
+        return result
+
+
+class _EMA:
+    """指数移动平均 - 以前period个值的均值作为种子"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.seed_total = 0.0
+        self.count = 0
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        if self.count < self.period:
+            self.count += 1
+            self.seed_total += value
+            if self.count == self.period:
+                self.value = self.seed_total / self.period
+            return self.value
+        self.value = ((value - self.value) * self.k) + self.value
+        return self.value
+
+
+class _MACD:
+    """MACD - 快线种子取慢线种子窗口末尾的fast根K线，与TA-Lib对齐"""
+
+    def __init__(self, fast: int, slow: int, signal: int):
+        self.fast, self.slow = fast, slow
+        self.fast_k = 2.0 / (fast + 1)
+        self.recent = deque(maxlen=fast)
+        self.slow_ema = _EMA(slow)
+        self.fast_value = NAN
+        self.signal_ema = _EMA(signal)
+        self.count = 0
+
+    def update(self, value: float):
+        self.count += 1
+        slow_value = self.slow_ema.update(value)
+        if self.count < self.slow:
+            self.recent.append(value)
+            return NAN, NAN, NAN
+        if self.count == self.slow:
+            self.recent.append(value)
+            total = 0.0
+            for item in self.recent:
+                total += item
+            self.fast_value = total / self.fast
+            self.recent = None
+        else:
+            self.fast_value = ((value - self.fast_value) * self.fast_k) + self.fast_value
+
+        macd = self.fast_value - slow_value
+        signal = self.signal_ema.update(macd)
+        if math.isnan(signal):
+            return NAN, NAN, NAN
+        return macd, signal, macd - signal
+
+
+class _RSI:
+    """Wilder RSI"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.prev = None
+        self.count = 0
+        self.gain = 0.0
+        self.loss = 0.0
+
+    def _output(self) -> float:
+        total = self.gain + self.loss
+        return 100.0 * (self.gain / total) if not _is_zero(total) else 0.0
+
+    def update(self, value: float) -> float:
+        if self.prev is None:
+            self.prev = value
+            return NAN
+        diff = value - self.prev
+        self.prev = value
+        self.count += 1
+
+        if self.count <= self.period:
+            if diff < 0:
+                self.loss -= diff
+            else:
+                self.gain += diff
+            if self.count < self.period:
+                return NAN
+            self.loss /= self.period
+            self.gain /= self.period
+            return self._output()
+
+        self.loss *= (self.period - 1)
+        self.gain *= (self.period - 1)
+        if diff < 0:
+            self.loss -= diff
+        else:
+            self.gain += diff
+        self.loss /= self.period
+        self.gain /= self.period
+        return self._output()
+
+
+class _ATR:
+    """Wilder ATR - 种子为前period个真实波幅的均值"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.prev_close = None
+        self.count = 0
+        self.total = 0.0
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            self.prev_close = close
+            return NAN
+        tr = _true_range(high, low, self.prev_close)
+        self.prev_close = close
+        self.count += 1
+
+        if self.count <= self.period:
+            self.total += tr
+            if self.count == self.period:
+                self.value = self.total / self.period
+            return self.value
+
+        self.value *= self.period - 1
+        self.value += tr
+        self.value /= self.period
+        return self.value
+
+
+class _Directional:
+    """方向运动指标 - 同时输出PLUS_DI、MINUS_DI与ADX"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.prev_high = self.prev_low = self.prev_close = None
+        self.plus_dm = self.minus_dm = self.tr = 0.0
+        self.sum_dx = 0.0
+        self.adx = NAN
+
+    def update(self, high: float, low: float, close: float):
+        if self.prev_high is None:
+            self.prev_high, self.prev_low, self.prev_close = high, low, close
+            return NAN, NAN, NAN
+
+        period = self.period
+        diff_p = high - self.prev_high
+        diff_m = self.prev_low - low
+        self.prev_high, self.prev_low = high, low
+        tr = _true_range(high, low, self.prev_close)
+        self.prev_close = close
+        self.count += 1
+
+        if self.count < period:
+            if diff_m > 0 and diff_p < diff_m:
+                self.minus_dm += diff_m
+            elif diff_p > 0 and diff_p > diff_m:
+                self.plus_dm += diff_p
+            self.tr += tr
+            return NAN, NAN, NAN
+
+        self.minus_dm -= self.minus_dm / period
+        self.plus_dm -= self.plus_dm / period
+        if diff_m > 0 and diff_p < diff_m:
+            self.minus_dm += diff_m
+        elif diff_p > 0 and diff_p > diff_m:
+            self.plus_dm += diff_p
+        self.tr = self.tr - (self.tr / period) + tr
+
+        if not _is_zero(self.tr):
+            minus_di = 100.0 * (self.minus_dm / self.tr)
+            plus_di = 100.0 * (self.plus_dm / self.tr)
+        else:
+            minus_di = plus_di = 0.0
+
+        # ADX：前period个DX取均值作为种子，之后Wilder平滑
+        dx = NAN
+        if not _is_zero(self.tr):
+            di_total = minus_di + plus_di
+            if not _is_zero(di_total):
+                dx = 100.0 * (abs(minus_di - plus_di) / di_total)
+
+        adx_count = self.count - period + 1
+        if adx_count <= period:
+            if not math.isnan(dx):
+                self.sum_dx += dx
+            if adx_count == period:
+                self.adx = self.sum_dx / period
+        elif not math.isnan(dx):
+            self.adx = ((self.adx * (period - 1)) + dx) / period
+
+        return plus_di, minus_di, self.adx
+
+
+class _WindowExtremes:
+    """滚动窗口最高价/最低价"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.highs = deque(maxlen=period)
+        self.lows = deque(maxlen=period)
+
+    def update(self, high: float, low: float):
+        self.highs.append(high)
+        self.lows.append(low)
+        if len(self.highs) < self.period:
+            return None
+        return max(self.highs), min(self.lows)
+
+
+class _FastK:
+    """随机指标原始K值"""
+
+    def __init__(self, period: int):
+        self.window = _WindowExtremes(period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        extremes = self.window.update(high, low)
+        if extremes is None:
+            return NAN
+        highest, lowest = extremes
+        diff = (highest - lowest) / 100.0
+        return (close - lowest) / diff if diff != 0.0 else 0.0
+
+
+class _Stoch:
+    """慢速随机指标(KDJ的K、D)"""
+
+    def __init__(self, fastk: int, slowk: int, slowd: int):
+        self.fastk = _FastK(fastk)
+        self.slowk = _SMA(slowk)
+        self.slowd = _SMA(slowd)
+
+    def update(self, high: float, low: float, close: float):
+        fastk = self.fastk.update(high, low, close)
+        if math.isnan(fastk):
+            return NAN, NAN
+        slowk = self.slowk.update(fastk)
+        if math.isnan(slowk):
+            return NAN, NAN
+        slowd = self.slowd.update(slowk)
+        if math.isnan(slowd):
+            return NAN, NAN
+        return slowk, slowd
+
+
+class _StochF:
+    """快速随机指标"""
+
+    def __init__(self, fastk: int, fastd: int):
+        self.fastk = _FastK(fastk)
+        self.fastd = _SMA(fastd)
+
+    def update(self, high: float, low: float, close: float):
+        fastk = self.fastk.update(high, low, close)
+        if math.isnan(fastk):
+            return NAN, NAN
+        fastd = self.fastd.update(fastk)
+        if math.isnan(fastd):
+            return NAN, NAN
+        return fastk, fastd
+
+
+class _WillR:
+    """威廉指标"""
+
+    def __init__(self, period: int):
+        self.window = _WindowExtremes(period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        extremes = self.window.update(high, low)
+        if extremes is None:
+            return NAN
+        highest, lowest = extremes
+        diff = (highest - lowest) / (-100.0)
+        return (highest - close) / diff if diff != 0.0 else 0.0
+
+
+class _CCI:
+    """顺势指标 - 环形缓冲区求和顺序与TA-Lib一致"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.buffer = [0.0] * period
+        self.count = 0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        typical = (high + low + close) / 3
+        self.buffer[self.count % self.period] = typical
+        self.count += 1
+        if self.count < self.period:
+            return NAN
+
+        average = 0.0
+        for item in self.buffer:
+            average += item
+        average /= self.period
+        deviation = 0.0
+        for item in self.buffer:
+            deviation += abs(item - average)
+        diff = typical - average
+        if diff != 0.0 and deviation != 0.0:
+            return diff / (0.015 * (deviation / self.period))
+        return 0.0
+
+
+class _Lag:
+    """保存最近period根之前的值（MOM、ROC）"""
+
+    def __init__(self, period: int):
+        self.window = deque(maxlen=period + 1)
+
+    def update(self, value: float):
+        self.window.append(value)
+        if len(self.window) <= self.window.maxlen - 1:
+            return None
+        return self.window[0]
+
+
+class _ROC:
+    """变动率 ((当前/前值)-1)*100"""
+
+    def __init__(self, period: int):
+        self.lag = _Lag(period)
+
+    def update(self, value: float) -> float:
+        previous = self.lag.update(value)
+        if previous is None:
+            return NAN
+        return ((value / previous) - 1.0) * 100.0 if previous != 0.0 else 0.0
+
+
+class _MOM:
+    """动量"""
+
+    def __init__(self, period: int):
+        self.lag = _Lag(period)
+
+    def update(self, value: float) -> float:
+        previous = self.lag.update(value)
+        return NAN if previous is None else value - previous
+
+
+class _ADOSC:
+    """累积/派发线及其震荡指标 - EMA以首个AD值为种子"""
+
+    def __init__(self, fast: int, slow: int):
+        self.fast_k = 2.0 / (fast + 1)
+        self.slow_k = 2.0 / (slow + 1)
+        self.lookback = slow - 1
+        self.ad = 0.0
+        self.count = 0
+        self.fast_ema = self.slow_ema = 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float):
+        spread = high - low
+        if spread > 0.0:
+            self.ad += (((close - low) - (high - close)) / spread) * volume
+        self.count += 1
+
+        if self.count == 1:
+            self.fast_ema = self.slow_ema = self.ad
+        else:
+            self.fast_ema = (self.fast_k * self.ad) + ((1.0 - self.fast_k) * self.fast_ema)
+            self.slow_ema = (self.slow_k * self.ad) + ((1.0 - self.slow_k) * self.slow_ema)
+
+        adosc = self.fast_ema - self.slow_ema if self.count > self.lookback else NAN
+        return self.ad, adosc
+
+
+class _SAR:
+    """抛物线SAR - 首根K线用MINUS_DM判断初始方向"""
+
+    def __init__(self, acceleration: float, maximum: float):
+        self.acceleration = acceleration
+        self.maximum = maximum
+        self.af = acceleration if acceleration <= maximum else maximum
+        self.first = None
+        self.is_long = None
+        self.sar = self.ep = NAN
+        self.new_high = self.new_low = NAN
+
+    def update(self, high: float, low: float) -> float:
+        if self.first is None:
+            self.first = (high, low)
+            return NAN
+
+        if self.is_long is None:
+            prev_high, prev_low = self.first
+            diff_p = high - prev_high
+            diff_m = prev_low - low
+            minus_dm = diff_m if (diff_m > 0 and diff_p < diff_m) else 0.0
+            self.is_long = not minus_dm > 0
+            if self.is_long:
+                self.ep, self.sar = high, prev_low
+            else:
+                self.ep, self.sar = low, prev_high
+            self.new_low, self.new_high = low, high
+
+        prev_low, prev_high = self.new_low, self.new_high
+        self.new_low, self.new_high = low, high
+        new_low, new_high = low, high
+        acceleration = self.acceleration
+
+        if self.is_long:
+            if new_low <= self.sar:
+                self.is_long = False
+                sar = self.ep
+                if sar < prev_high:
+                    sar = prev_high
+                if sar < new_high:
+                    sar = new_high
+                output = sar
+                self.af = acceleration
+                self.ep = new_low
+                sar = sar + self.af * (self.ep - sar)
+                if sar < prev_high:
+                    sar = prev_high
+                if sar < new_high:
+                    sar = new_high
+            else:
+                output = self.sar
+                if new_high > self.ep:
+                    self.ep = new_high
+                    self.af += acceleration
+                    if self.af > self.maximum:
+                        self.af = self.maximum
+                sar = self.sar + self.af * (self.ep - self.sar)
+                if sar > prev_low:
+                    sar = prev_low
+                if sar > new_low:
+                    sar = new_low
+        else:
+            if new_high >= self.sar:
+                self.is_long = True
+                sar = self.ep
+                if sar > prev_low:
+                    sar = prev_low
+                if sar > new_low:
+                    sar = new_low
+                output = sar
+                self.af = acceleration
+                self.ep = new_high
+                sar = sar + self.af * (self.ep - sar)
+                if sar > prev_low:
+                    sar = prev_low
+                if sar > new_low:
+                    sar = new_low
+            else:
+                output = self.sar
+                if new_low < self.ep:
+                    self.ep = new_low
+                    self.af += acceleration
+                    if self.af > self.maximum:
+                        self.af = self.maximum
+                sar = self.sar + self.af * (self.ep - self.sar)
+                if sar < prev_high:
+                    sar = prev_high
+                if sar < new_high:
+                    sar = new_high
+
+        self.sar = sar
+        return output
+
+
+class _TRIX:
+    """三重指数平滑的1日变动率"""
+
+    def __init__(self, period: int):
+        self.ema1 = _EMA(period)
+        self.ema2 = _EMA(period)
+        self.ema3 = _EMA(period)
+        self.roc = _ROC(1)
+
+    def update(self, value: float) -> float:
+        value = self.ema1.update(value)
+        if math.isnan(value):
+            return NAN
+        value = self.ema2.update(value)
+        if math.isnan(value):
+            return NAN
+        value = self.ema3.update(value)
+        if math.isnan(value):
+            return NAN
+        return self.roc.update(value)
+
+
+class _ULTOSC:
+    """终极摆动指标"""
+
+    def __init__(self, period1: int, period2: int, period3: int):
+        self.periods = sorted([period1, period2, period3])
+        self.windows = [deque() for _ in self.periods]
+        self.a_totals = [0.0, 0.0, 0.0]
+        self.b_totals = [0.0, 0.0, 0.0]
+        self.prev_close = None
+        self.count = 0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            self.prev_close = close
+            return NAN
+
+        true_low = low if low < self.prev_close else self.prev_close
+        close_minus_true_low = close - true_low
+        true_range = _true_range(high, low, self.prev_close)
+        self.prev_close = close
+        self.count += 1
+
+        term = (close_minus_true_low, true_range)
+        if self.count < self.periods[2]:
+            # 输出前各窗口保留最近period-1项
+            for i in range(3):
+                self.windows[i].append(term)
+                if len(self.windows[i]) > self.periods[i] - 1:
+                    self.windows[i].popleft()
+            return NAN
+
+        if self.count == self.periods[2]:
+            # 首次输出前重新累加各窗口，与TA-Lib的预热求和顺序一致
+            for i in range(3):
+                a_total = b_total = 0.0
+                for a, b in self.windows[i]:
+                    a_total += a
+                    b_total += b
+                self.a_totals[i], self.b_totals[i] = a_total, b_total
+
+        for i in range(3):
+            self.windows[i].append(term)
+            self.a_totals[i] += close_minus_true_low
+            self.b_totals[i] += true_range
+
+        output = 0.0
+        if not _is_zero(self.b_totals[0]):
+            output += 4.0 * (self.a_totals[0] / self.b_totals[0])
+        if not _is_zero(self.b_totals[1]):
+            output += 2.0 * (self.a_totals[1] / self.b_totals[1])
+        if not _is_zero(self.b_totals[2]):
+            output += self.a_totals[2] / self.b_totals[2]
+
+        for i in range(3):
+            a, b = self.windows[i].popleft()
+            self.a_totals[i] -= a
+            self.b_totals[i] -= b
+
+        return 100.0 * (output / 7.0)
+
+
+class StreamingIndicatorEngine:
+    """增量指标引擎 - 每个指标只保存固定大小的状态，逐根K线更新，结果与calculate_indicators一致"""
+
+    def __init__(self, config: Dict = None):
+        # 参数与calculate_indicators一致，默认取TECHNICAL_CONFIG
+        c = config or TECHNICAL_CONFIG
+        self.ma = {period: _SMA(period) for period in c['ma_periods']}
+        self.ema = {period: _EMA(period) for period in c['ema_periods']}
+        self.bb_period = c['bb_period']
+        self.bb_std = c['bb_std']
+        self.bb_window = deque()
+        self.bb_total = 0.0
+        self.bb_total2 = 0.0
+        self.macd = _MACD(c['macd_fast'], c['macd_slow'], c['macd_signal'])
+        self.rsi = _RSI(c['rsi_period'])
+        self.directional = _Directional(c['adx_period'])
+        self.atr = _ATR(c['atr_period'])
+        self.volume_ma = _SMA(c['volume_ma_period'])
+        self.stoch = _Stoch(c['kdj_period'], c['kdj_m1'], c['kdj_m2'])
+        self.willr = _WillR(c['willr_period'])
+        self.cci = _CCI(c['cci_period'])
+        self.stochf = _StochF(c['stochf_fastk'], c['stochf_fastd'])
+        self.mom = _MOM(c['mom_period'])
+        self.roc = _ROC(c['roc_period'])
+        self.adosc = _ADOSC(c['adosc_fast'], c['adosc_slow'])
+        self.sar = _SAR(c['sar_acceleration'], c['sar_maximum'])
+        self.trix = _TRIX(c['trix_period'])
+        self.ultosc = _ULTOSC(*c['ultosc_periods'])
+        self.bars = 0
+        self.columns = (
+            [f'MA{period}' for period in self.ma] + [f'EMA{period}' for period in self.ema] + [
+                'BB_upper', 'BB_middle', 'BB_lower',
+                'MACD', 'MACD_signal', 'MACD_hist',
+                'RSI', 'ADX', 'PLUS_DI', 'MINUS_DI', 'ATR',
+                'Volume_MA5', 'Volume_Ratio',
+                'K', 'D', 'J', 'WILLR', 'CCI', 'STOCH_K', 'STOCH_D',
+                'MOM', 'ROC', 'AD', 'ADOSC', 'SAR', 'TRIX', 'ULTOSC'
+            ]
+        )
+
+    def _update_bbands(self, close: float):
+        """布林带 - 滚动平方和方式计算标准差，与TA-Lib一致"""
+        period = self.bb_period
+        self.bb_window.append(close)
+        self.bb_total += close
+        self.bb_total2 += close * close
+        if len(self.bb_window) < period:
+            return NAN, NAN, NAN
+
+        middle = self.bb_total / period
+        mean2 = self.bb_total2 / period
+        trailing = self.bb_window.popleft()
+        self.bb_total -= trailing
+        self.bb_total2 -= trailing * trailing
+
+        variance = mean2 - middle * middle
+        stddev = math.sqrt(variance) if not variance < 0.00000001 else 0.0
+        width = stddev * self.bb_std
+        return middle + width, middle, middle - width
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """输入一根新K线，返回该K线的全部指标值"""
+        values = {}
+        for period, state in self.ma.items():
+            values[f'MA{period}'] = state.update(close)
+        for period, state in self.ema.items():
+            values[f'EMA{period}'] = state.update(close)
+
+        values['BB_upper'], values['BB_middle'], values['BB_lower'] = self._update_bbands(close)
+        values['MACD'], values['MACD_signal'], values['MACD_hist'] = self.macd.update(close)
+        values['RSI'] = self.rsi.update(close)
+
+        plus_di, minus_di, adx = self.directional.update(high, low, close)
+        values['ADX'], values['PLUS_DI'], values['MINUS_DI'] = adx, plus_di, minus_di
+        values['ATR'] = self.atr.update(high, low, close)
+
+        values['Volume_MA5'] = self.volume_ma.update(volume)
+        values['Volume_Ratio'] = _divide(volume, values['Volume_MA5'])
+
+        values['K'], values['D'] = self.stoch.update(high, low, close)
+        values['J'] = 3 * values['K'] - 2 * values['D']
+        values['WILLR'] = self.willr.update(high, low, close)
+        values['CCI'] = self.cci.update(high, low, close)
+        values['STOCH_K'], values['STOCH_D'] = self.stochf.update(high, low, close)
+        values['MOM'] = self.mom.update(close)
+        values['ROC'] = self.roc.update(close)
+        values['AD'], values['ADOSC'] = self.adosc.update(high, low, close, volume)
+        values['SAR'] = self.sar.update(high, low)
+        values['TRIX'] = self.trix.update(close)
+        values['ULTOSC'] = self.ultosc.update(high, low, close)
+
+        self.bars += 1
+        return values
+
+    def update_bar(self, bar) -> Dict[str, float]:
+        """按列名读取一根K线（Series或dict）并更新"""
+        return self.update(float(bar['open']), float(bar['high']), float(bar['low']),
+                           float(bar['close']), float(bar['volume']))
+
+    def warm_up(self, data: pd.DataFrame):
+        """用历史K线预热状态，不保留输出"""
+        arrays = [data[col].to_numpy(dtype=float) for col in ['open', 'high', 'low', 'close', 'volume']]
+        for bar in zip(*arrays):
+            self.update(*bar)
+        return self
+
+    def run(self, data: pd.DataFrame, columns=None) -> pd.DataFrame:
+        """依次输入多根K线，返回与输入索引对齐的指标表（指定columns时只输出其中的列）"""
+        columns = self.columns if columns is None else [col for col in self.columns if col in columns]
+        block = np.empty((len(data), len(columns)))
+        arrays = [data[col].to_numpy(dtype=float) for col in ['open', 'high', 'low', 'close', 'volume']]
+        for i, bar in enumerate(zip(*arrays)):
+            values = self.update(*bar)
+            block[i] = [values[col] for col in columns]
+        return pd.DataFrame(block, index=data.index, columns=columns)
+
+    def copy(self) -> 'StreamingIndicatorEngine':
+        """复制当前状态（用于试算未收盘的K线）"""
+        return _clone(self)
@@ -0,0 +1,358 @@
+"""
+参数扫描 - 多进程评估指标参数、信号阈值与回测参数网格
+
+网格键分三类：TECHNICAL_CONFIG中的指标参数（需重算指标）、六维信号阈值（只重算信号）、
+回测参数（只重跑回测）。每组指标参数与每批股票（每批symbols_per_task只）组合为一个任务，任务内
+对每只股票只计算一次指标，再遍历其余参数组合。所有股票的OHLCV连同资金流向与市场状态列拼接后放入共享内存，子进程按名称
+挂载，不经pickle传输，六维信号的资金验证与市场环境维度与实时分析一致（数据中缺少这两列时为NaN，
+对应条件不成立/不生效）。
+每个任务完成后立即写出一个列式分片文件（有pyarrow时为parquet），中断后重跑会跳过已完成的任务。
+
+用法：
+    python -m src.core.sweep --symbols 600519 000001 --output data/sweeps/demo
+"""
+
+import os
+import sys
+import json
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, List
+
+from .config import SWEEP_CONFIG, TECHNICAL_CONFIG
+from .indicators import compute_indicators
+from .indicator_cache import frame_fingerprint
+from .technical_analysis import TechnicalAnalyzer
+from .backtest import METRIC_FIELDS, backtest_params, run_backtest
+
+try:
+    import pyarrow  # noqa: F401
+    PART_SUFFIX = '.parquet'
+except ImportError:
+    PART_SUFFIX = '.pkl'
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# 六维信号在OHLCV之外用到的列：资金验证的主力净流入、市场环境的大盘状态
+SIGNAL_INPUT_FIELDS = ('main_net_inflow', 'Market_Regime')
+PANEL_FIELDS = PRICE_FIELDS + SIGNAL_INPUT_FIELDS
+
+
+def split_grid(grid: Dict[str, list]) -> tuple:
+    """把网格键分为(指标参数, 信号阈值, 回测参数)三组"""
+    signal_keys = set(TechnicalAnalyzer()._signal_thresholds())
+    backtest_keys = set(backtest_params())
+    groups = ({}, {}, {})
+    for key, values in grid.items():
+        if key in signal_keys:
+            groups[1][key] = list(values)
+        elif key in backtest_keys:
+            groups[2][key] = list(values)
+        elif key in TECHNICAL_CONFIG:
+            groups[0][key] = list(values)
+        else:
+            raise ValueError(f"未知的扫描参数: {key}")
+    return groups
+
+
+def expand_grid(group: Dict[str, list]) -> List[Dict]:
+    """网格的笛卡尔积，每个组合为一个参数字典"""
+    keys = list(group)
+    return [dict(zip(keys, values)) for values in itertools.product(*group.values())]
+
+
+def sweep_tasks(grid: Dict[str, list], symbols: List[str] = None, symbols_per_task: int = None) -> List[Dict]:
+    """
+    展开网格：每组指标参数×每批股票一个任务，任务内包含信号阈值×回测参数的全部组合
+
+    组合编号只取决于网格，与股票分批无关；symbols为None时每组指标参数一个任务，覆盖全部股票
+    """
+    indicator_group, signal_group, backtest_group = split_grid(grid)
+    inner = [(signal, backtest) for signal in expand_grid(signal_group) for backtest in expand_grid(backtest_group)]
+    if symbols is None:
+        chunks = [None]
+    else:
+        size = max(1, symbols_per_task or SWEEP_CONFIG['symbols_per_task'])
+        chunks = [list(symbols[i:i + size]) for i in range(0, len(symbols), size)]
+
+    tasks = []
+    for i, indicator in enumerate(expand_grid(indicator_group)):
+        combos = [{'combo': i * len(inner) + j, 'signal': signal, 'backtest': backtest}
+                  for j, (signal, backtest) in enumerate(inner)]
+        for chunk in chunks:
+            tasks.append({'task': len(tasks), 'indicator': indicator, 'symbols': chunk, 'combos': combos})
+    return tasks
+
+
+def combo_params(grid: Dict[str, list], combo: int) -> Dict:
+    """按组合编号还原该组合的全部参数"""
+    for task in sweep_tasks(grid):
+        for item in task['combos']:
+            if item['combo'] == combo:
+                return {**task['indicator'], **item['signal'], **item['backtest']}
+    raise ValueError(f"组合编号超出范围: {combo}")
+
+
+class SharedArray:
+    """把任意数组复制到共享内存，子进程用attach_array按spec挂载"""
+
+    def __init__(self, array: np.ndarray):
+        array = np.ascontiguousarray(array)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf)[...] = array
+        self.spec = {'name': self.shm.name, 'shape': array.shape, 'dtype': array.dtype.str}
+
+    def close(self):
+        """释放共享内存"""
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach_array(spec: Dict) -> tuple:
+    """按spec挂载共享数组，返回(共享内存句柄, 数组视图)"""
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    return shm, np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']), buffer=shm.buf)
+
+
+class SharedPanel:
+    """
+    多只股票的PANEL_FIELDS拼接为(字段×总K线)数组放入共享内存，子进程用attach_panel按spec挂载
+
+    前五行为OHLCV，其后为资金流向与市场状态，缺少的列填NaN
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        self.symbols = list(frames)
+        lengths = [len(frames[symbol]) for symbol in self.symbols]
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(int)
+        block = np.full((len(PANEL_FIELDS), int(offsets[-1])), np.nan)
+        for symbol, start, end in zip(self.symbols, offsets[:-1], offsets[1:]):
+            for i, field in enumerate(PANEL_FIELDS):
+                if field in frames[symbol].columns:
+                    block[i, start:end] = pd.to_numeric(frames[symbol][field], errors='coerce').to_numpy(dtype=float)
+        self.array = SharedArray(block)
+        self.spec = {**self.array.spec, 'symbols': self.symbols, 'offsets': offsets.tolist()}
+
+    def close(self):
+        """释放共享内存"""
+        self.array.close()
+
+
+def attach_panel(spec: Dict) -> tuple:
+    """按spec挂载共享内存，返回(共享内存句柄, {代码: {字段: 一维视图}})"""
+    shm, block = attach_array(spec)
+    offsets = spec['offsets']
+    views = {
+        symbol: {field: block[i, offsets[j]:offsets[j + 1]] for i, field in enumerate(PANEL_FIELDS)}
+        for j, symbol in enumerate(spec['symbols'])
+    }
+    return shm, views
+
+
+_worker = {}
+
+
+def _init_worker(spec: Dict):
+    """子进程初始化：挂载一次共享内存，后续任务复用"""
+    _worker['shm'], _worker['panel'] = attach_panel(spec)
+    _worker['analyzer'] = TechnicalAnalyzer()
+
+
+def format_param(value):
+    """非标量参数（如RSI区间）转成文本，便于写入列式文件"""
+    return json.dumps(list(value)) if isinstance(value, (list, tuple)) else value
+
+
+def write_part(rows: List[Dict], path: str):
+    """写出一个任务的分片（先写临时文件再替换，中断时不会留下半个分片）"""
+    frame = pd.DataFrame(rows)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if PART_SUFFIX == '.parquet':
+        frame.to_parquet(tmp_path, index=False)
+    else:
+        frame.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def evaluate_task(task: Dict, panel: Dict[str, Dict[str, np.ndarray]], analyzer: TechnicalAnalyzer) -> List[Dict]:
+    """
+    计算一个任务：该批每只股票按该组指标参数算一次指标，再评估全部阈值/回测组合
+
+    指标参数显式传给compute_indicators与six_dimension_signal_series，不改动全局TECHNICAL_CONFIG
+    """
+    config = {**TECHNICAL_CONFIG, **task['indicator']}
+    rows = []
+    for symbol in (task['symbols'] if task['symbols'] is not None else panel):
+        fields = panel[symbol]
+        computed = compute_indicators(fields, 'signals', analyzer.ta, config=config)
+        frame = pd.DataFrame({**fields, **computed})
+        for item in task['combos']:
+            signals = analyzer.six_dimension_signal_series(frame, thresholds=item['signal'], config=config)
+            params = backtest_params(item['backtest'])
+            metrics = run_backtest(fields, signals['signal_count'].to_numpy(), params)['metrics']
+            params_row = {key: format_param(value)
+                          for key, value in {**task['indicator'], **item['signal'], **item['backtest']}.items()}
+            rows.append({'task': task['task'], 'combo': item['combo'], 'symbol': symbol,
+                         **params_row, **metrics})
+    return rows
+
+
+def _run_task(task: Dict, part_path: str) -> int:
+    rows = evaluate_task(task, _worker['panel'], _worker['analyzer'])
+    write_part(rows, part_path)
+    return task['task']
+
+
+def _part_path(output_dir: str, task_id: int) -> str:
+    return os.path.join(output_dir, f"part-{task_id:05d}{PART_SUFFIX}")
+
+
+def _check_manifest(output_dir: str, manifest: Dict):
+    """同一目录只能续跑同一网格与同一批数据的扫描"""
+    path = os.path.join(output_dir, 'manifest.json')
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if json.load(f) != manifest:
+                raise ValueError(f"输出目录{output_dir}中已有不同网格或数据的扫描结果")
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def run_sweep(frames: Dict[str, pd.DataFrame], grid: Dict[str, list] = None, output_dir: str = None,
+              workers: int = None, symbols_per_task: int = None) -> pd.DataFrame:
+    """
+    执行参数扫描并返回全部结果（每行为一个组合在一只股票上的回测指标）
+
+    frames为{股票代码: OHLCV DataFrame}；已写出分片的任务会被跳过
+    """
+    grid = grid or SWEEP_CONFIG['grid']
+    output_dir = output_dir or SWEEP_CONFIG['output_dir']
+    workers = workers or SWEEP_CONFIG['workers'] or os.cpu_count() or 1
+    symbols_per_task = symbols_per_task or SWEEP_CONFIG['symbols_per_task']
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = {
+        'grid': {key: [format_param(value) for value in values] for key, values in grid.items()},
+        'data': {symbol: frame_fingerprint(frame, list(PANEL_FIELDS)) for symbol, frame in frames.items()},
+        'symbols_per_task': symbols_per_task
+    }
+    _check_manifest(output_dir, manifest)
+
+    all_tasks = sweep_tasks(grid, list(frames), symbols_per_task)
+    tasks = [task for task in all_tasks if not os.path.exists(_part_path(output_dir, task['task']))]
+    total = len(all_tasks)
+    print(f"参数扫描: {len(frames)}只股票, {total}个任务, 待计算{len(tasks)}个")
+    for field in SIGNAL_INPUT_FIELDS:
+        if not any(field in frame.columns for frame in frames.values()):
+            print(f"⚠️ 数据中没有{field}列，依赖它的信号条件不参与扫描")
+
+    panel = SharedPanel(frames)
+    try:
+        if workers <= 1 or len(tasks) <= 1:
+            _init_worker(panel.spec)
+            try:
+                for task in tasks:
+                    _run_task(task, _part_path(output_dir, task['task']))
+            finally:
+                shm = _worker['shm']
+                _worker.clear()
+                shm.close()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(panel.spec,)) as pool:
+                futures = [pool.submit(_run_task, task, _part_path(output_dir, task['task'])) for task in tasks]
+                for done, future in enumerate(as_completed(futures), 1):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"扫描任务失败: {e}")
+                    if done % 10 == 0 or done == len(futures):
+                        print(f"   已完成 {done}/{len(futures)}")
+    finally:
+        panel.close()
+
+    return load_sweep(output_dir)
+
+
+def load_sweep(output_dir: str) -> pd.DataFrame:
+    """读取目录中全部已完成的分片"""
+    if not os.path.isdir(output_dir):
+        return pd.DataFrame()
+    parts = sorted(name for name in os.listdir(output_dir)
+                   if name.startswith('part-') and name.endswith(('.parquet', '.pkl')))
+    frames = [pd.read_parquet(os.path.join(output_dir, name)) if name.endswith('.parquet')
+              else pd.read_pickle(os.path.join(output_dir, name)) for name in parts]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def summarize_sweep(results: pd.DataFrame, sort_by: str = 'sharpe') -> pd.DataFrame:
+    """按组合汇总各股票的回测指标（取均值），按sort_by降序排列"""
+    if results.empty:
+        return results
+    metric_columns = [col for col in METRIC_FIELDS if col in results.columns]
+    param_columns = [col for col in results.columns if col not in ('task', 'combo', 'symbol', *metric_columns)]
+    grouped = results.groupby('combo', sort=False)
+    summary = grouped[param_columns].first().join(grouped[metric_columns].mean())
+    summary['symbols'] = grouped['symbol'].nunique()
+    return summary.reset_index().sort_values(sort_by, ascending=False, ignore_index=True)
+
+
+def load_frames(symbols: List[str], apply_blacklist: bool = False) -> Dict[str, pd.DataFrame]:
+    """
+    从本地数据仓库读取日线，缺失的股票跳过；apply_blacklist时按黑名单规则排除股票
+
+    同时附加本地仓库中的资金流向历史与基准指数得出的市场状态（不联网）
+    """
+    from .data_fetcher import StockDataFetcher
+    from .data_store import LocalDataStore
+    from .universe import eligible_symbols, load_names
+
+    store = LocalDataStore()
+    fetcher = StockDataFetcher(store)
+    analyzer = TechnicalAnalyzer(fetcher.stored_benchmark_indices())
+    frames = {}
+    for symbol in symbols:
+        frame = store.load('price', symbol)
+        if frame is None or frame.empty:
+            print(f"⚠️ 本地无{symbol}的日线数据，已跳过")
+            continue
+        frame = fetcher.attach_fund_flow_history(frame, symbol, sync=False)
+        if analyzer.market_regime is not None:
+            frame['Market_Regime'] = analyzer.calculate_market_features(frame)['Market_Regime']
+        frames[symbol] = frame
+
+    if apply_blacklist and frames:
+        eligible = eligible_symbols(frames, load_names(store))
+        if len(eligible) < len(frames):
+            print(f"⚠️ 黑名单规则排除{len(frames) - len(eligible)}只股票")
+        frames = {symbol: frames[symbol] for symbol in eligible}
+    return frames
+
+
+def main(argv=None):
+    """命令行入口：从本地数据仓库读取日线后扫描"""
+    parser = argparse.ArgumentParser(description='决策矩阵参数扫描')
+    parser.add_argument('--symbols', nargs='+', required=True, help='股票代码')
+    parser.add_argument('--output', default=SWEEP_CONFIG['output_dir'], help='结果目录')
+    parser.add_argument('--workers', type=int, default=None, help='进程数')
+    parser.add_argument('--symbols-per-task', type=int, default=None, help='每个任务的股票数')
+    parser.add_argument('--top', type=int, default=10, help='显示排名前N的组合')
+    parser.add_argument('--blacklist', action='store_true', help='按黑名单规则排除股票')
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.symbols, args.blacklist)
+    if not frames:
+        return 1
+
+    results = run_sweep(frames, output_dir=args.output, workers=args.workers,
+                        symbols_per_task=args.symbols_per_task)
+    print(summarize_sweep(results).head(args.top).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+递推类指标的JIT编译内核（可选依赖Numba）
+
+输入统一为(标的×K线)的二维C连续float64数组，按标的并行（prange）逐根递推，
+计算公式与numpy_ta中的NumPy实现逐项一致。未安装Numba时NUMBA_AVAILABLE为False，
+numpy_ta自动使用NumPy实现。
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, cache=True)
+    def ema_kernel(x, period, start, out):
+        """EMA：以start起前period个值的均值为种子"""
+        rows, n = x.shape
+        first = start + period - 1
+        k = 2.0 / (period + 1)
+        for r in prange(rows):
+            total = 0.0
+            for t in range(start, first + 1):
+                total += x[r, t]
+            prev = total / period
+            out[r, first] = prev
+            for t in range(first + 1, n):
+                prev = ((x[r, t] - prev) * k) + prev
+                out[r, t] = prev
+
+    @njit(parallel=True, cache=True)
+    def wilder_kernel(x, period, start, out):
+        """Wilder平滑：prev=(prev*(p-1)+x)/p"""
+        rows, n = x.shape
+        first = start + period - 1
+        for r in prange(rows):
+            total = 0.0
+            for t in range(start, first + 1):
+                total += x[r, t]
+            prev = total / period
+            out[r, first] = prev
+            for t in range(first + 1, n):
+                prev = ((prev * (period - 1)) + x[r, t]) / period
+                out[r, t] = prev
+
+    @njit(parallel=True, cache=True)
+    def directional_kernel(plus_dm, minus_dm, tr, period, plus_di, minus_di, adx):
+        """PLUS_DI/MINUS_DI/ADX递推；plus_dm等为首根之后的逐根序列（比输出少一列）"""
+        rows, m = tr.shape
+        for r in prange(rows):
+            prev_plus = 0.0
+            prev_minus = 0.0
+            prev_tr = 0.0
+            for i in range(period - 1):
+                prev_plus += plus_dm[r, i]
+                prev_minus += minus_dm[r, i]
+                prev_tr += tr[r, i]
+            sum_dx = 0.0
+            prev_adx = 0.0
+            for i in range(period - 1, m):
+                t = i + 1
+                prev_minus = prev_minus - prev_minus / period + minus_dm[r, i]
+                prev_plus = prev_plus - prev_plus / period + plus_dm[r, i]
+                prev_tr = prev_tr - (prev_tr / period) + tr[r, i]
+
+                m_di = 0.0
+                p_di = 0.0
+                dx = 0.0
+                dx_valid = False
+                if not (-0.00000001 < prev_tr < 0.00000001):
+                    m_di = 100.0 * (prev_minus / prev_tr)
+                    p_di = 100.0 * (prev_plus / prev_tr)
+                    di_total = m_di + p_di
+                    if not (-0.00000001 < di_total < 0.00000001):
+                        dx = 100.0 * (abs(m_di - p_di) / di_total)
+                        dx_valid = True
+                plus_di[r, t] = p_di
+                minus_di[r, t] = m_di
+
+                adx_count = i - period + 2
+                if adx_count <= period:
+                    if dx_valid:
+                        sum_dx += dx
+                    if adx_count == period:
+                        prev_adx = sum_dx / period
+                        adx[r, t] = prev_adx
+                else:
+                    if dx_valid:
+                        prev_adx = ((prev_adx * (period - 1)) + dx) / period
+                    adx[r, t] = prev_adx
+
+    @njit(parallel=True, cache=True)
+    def sar_kernel(high, low, acceleration, maximum, out):
+        """抛物线SAR（TA-Lib算法，首根K线用MINUS_DM判断初始方向）"""
+        rows, n = high.shape
+        for r in prange(rows):
+            diff_p = high[r, 1] - high[r, 0]
+            diff_m = low[r, 0] - low[r, 1]
+            is_long = not (diff_m > 0 and diff_p < diff_m)
+            if is_long:
+                ep = high[r, 1]
+                sar = low[r, 0]
+            else:
+                ep = low[r, 1]
+                sar = high[r, 0]
+            af = acceleration
+            new_low = low[r, 1]
+            new_high = high[r, 1]
+
+            for t in range(1, n):
+                prev_low = new_low
+                prev_high = new_high
+                new_low = low[r, t]
+                new_high = high[r, t]
+
+                if is_long:
+                    if new_low <= sar:
+                        # 多头反转为空头
+                        is_long = False
+                        sar = max(max(ep, prev_high), new_high)
+                        out[r, t] = sar
+                        af = acceleration
+                        ep = new_low
+                        sar = sar + af * (ep - sar)
+                        sar = max(max(sar, prev_high), new_high)
+                    else:
+                        out[r, t] = sar
+                        if new_high > ep:
+                            ep = new_high
+                            af = min(af + acceleration, maximum)
+                        sar = sar + af * (ep - sar)
+                        sar = min(min(sar, prev_low), new_low)
+                else:
+                    if new_high >= sar:
+                        # 空头反转为多头
+                        is_long = True
+                        sar = min(min(ep, prev_low), new_low)
+                        out[r, t] = sar
+                        af = acceleration
+                        ep = new_high
+                        sar = sar + af * (ep - sar)
+                        sar = min(min(sar, prev_low), new_low)
+                    else:
+                        out[r, t] = sar
+                        if new_low < ep:
+                            ep = new_low
+                            af = min(af + acceleration, maximum)
+                        sar = sar + af * (ep - sar)
+                        sar = max(max(sar, prev_high), new_high)
+
+    @njit(parallel=True, cache=True)
+    def adosc_kernel(ad, fastperiod, slowperiod, out):
+        """ADOSC：两条以首个AD值为种子的EMA之差"""
+        rows, n = ad.shape
+        lookback = max(fastperiod, slowperiod) - 1
+        fast_k = 2.0 / (fastperiod + 1)
+        slow_k = 2.0 / (slowperiod + 1)
+        for r in prange(rows):
+            fast = ad[r, 0]
+            slow = ad[r, 0]
+            for t in range(1, n):
+                fast = (fast_k * ad[r, t]) + ((1.0 - fast_k) * fast)
+                slow = (slow_k * ad[r, t]) + ((1.0 - slow_k) * slow)
+                if t >= lookback:
+                    out[r, t] = fast - slow
+
+    @njit(parallel=True, cache=True)
+    def ema_family_kernel(x, periods, out):
+        """多周期EMA：逐根K线同时更新所有周期的状态"""
+        rows, n = x.shape
+        count = periods.shape[0]
+        for r in prange(rows):
+            prev = np.zeros(count)
+            total = 0.0
+            for t in range(n):
+                total += x[r, t]
+                for j in range(count):
+                    period = periods[j]
+                    if t == period - 1:
+                        prev[j] = total / period
+                        out[j, r, t] = prev[j]
+                    elif t >= period:
+                        prev[j] = ((x[r, t] - prev[j]) * (2.0 / (period + 1))) + prev[j]
+                        out[j, r, t] = prev[j]
+
+    @njit(parallel=True, cache=True)
+    def wilder_family_kernel(x, periods, start, out):
+        """多周期Wilder平滑：逐根K线同时更新所有周期的状态"""
+        rows, n = x.shape
+        count = periods.shape[0]
+        for r in prange(rows):
+            prev = np.zeros(count)
+            total = 0.0
+            for t in range(start, n):
+                total += x[r, t]
+                for j in range(count):
+                    period = periods[j]
+                    first = start + period - 1
+                    if t == first:
+                        prev[j] = total / period
+                        out[j, r, t] = prev[j]
+                    elif t > first:
+                        prev[j] = ((prev[j] * (period - 1)) + x[r, t]) / period
+                        out[j, r, t] = prev[j]
@@ -1,118 +1,286 @@
 import pandas as pd
 import numpy as np
-import talib
-from typing import Dict, List, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 
+from .config import BENCHMARK_CONFIG, DECISION_CONFIG, SIGNAL_CONFIG, TECHNICAL_CONFIG
+from .streaming import StreamingIndicatorEngine
+from .latest_bar import LatestBar
+from . import numpy_ta
+from .indicators import compute_indicators, compute_family, indicator_columns, indicator_params, get_backend, backend_name
+from .indicator_cache import PRICE_FIELDS, IndicatorCache, fields_fingerprint, frame_fingerprint
+
+# 波段位置：(20日高低点区间内的位置下限%, 位置, 描述, 指导建议)，自上而下取第一个满足的，都不满足为最后一项
+BAND_POSITIONS = [
+    (80, "波段顶部", "价格接近20日高点，处于波段高位", "注意获利了结，设置止盈位，警惕回调风险"),
+    (60, "波段中上", "价格处于波段中上位置，仍有上涨空间", "可继续持有，关注量能配合，设置移动止损"),
+    (40, "波段中部", "价格处于波段中部，方向待确认", "观望为主，等待明确信号，可小仓位试探"),
+    (20, "波段中下", "价格处于波段中下位置，存在反弹机会", "关注支撑位，可逢低建仓，设置严格止损"),
+    (None, "波段底部", "价格接近20日低点，处于波段低位", "关注超跌反弹，可分批建仓，注意风险控制"),
+]
+
+# 结合RSI与MACD对指导建议的补充（顺序与判断优先级一致）
+GUIDANCE_SUFFIXES = ["，RSI超买，建议减仓", "，RSI超卖，可考虑抄底", "，MACD金叉，可适当加仓"]
+
+# 波段类型 -> 预期周期（第一项为默认类型，其余按判断优先级排列）
+BAND_TYPES = {
+    '标准波段': '5-15天',
+    '微型波段': '15-30分钟',
+    '趋势波段': '15-30天',
+    '短线波段': '1-3天',
+    '震荡波段': '3-7天',
+}
+
+
+def decision_tiers() -> List[Dict]:
+    """决策矩阵档位按min_signals从高到低排列，取第一个满足的；交易决策与决策矩阵回测共用"""
+    return sorted(DECISION_CONFIG['decision_matrix'].values(), key=lambda tier: tier['min_signals'], reverse=True)
+
+
+def decision_tier(signal_count: int) -> Dict:
+    """信号数量对应的决策矩阵档位"""
+    return next(tier for tier in decision_tiers() if signal_count >= tier['min_signals'])
+
+
 class TechnicalAnalyzer:
     """技术分析引擎 - 基于TA-Lib专业指标库"""
     
-    def __init__(self):
-        pass
+    def __init__(self, benchmarks: Dict[str, pd.DataFrame] = None, cache: IndicatorCache = None,
+                 backend: str = None):
+        # 指标计算后端：TA-Lib或NumPy实现，默认按TECHNICAL_CONFIG['backend']选择
+        self.ta = get_backend(backend)
+        self.benchmarks = {}
+        self.market_regime = None
+        self._benchmark_key = None
+        self._benchmark_frame = None
+        self.cache = cache
+        if benchmarks:
+            self.set_benchmarks(benchmarks)
+    
+    def set_benchmarks(self, benchmarks: Dict[str, pd.DataFrame]):
+        """设置共享的基准指数，并预先计算市场状态（1多头/0震荡/-1空头）"""
+        self.benchmarks = benchmarks or {}
+        self.market_regime = None
+        self._benchmark_key = None
+        self._benchmark_frame = None
+        
+        if self.benchmarks:
+            self._benchmark_key = {
+                'config': BENCHMARK_CONFIG,
+                'indices': {code: frame_fingerprint(frame, ['close']) for code, frame in self.benchmarks.items()}
+            }
+        
+        primary = self.benchmarks.get(BENCHMARK_CONFIG['primary'])
+        if primary is not None and not primary.empty:
+            close = primary['close'].astype(float)
+            ma = self.ta.SMA(close, timeperiod=BENCHMARK_CONFIG['regime_ma_period'])
+            slope = ma.diff(BENCHMARK_CONFIG['regime_slope_period'])
+            regime = np.where((close > ma) & (slope > 0), 1,
+                              np.where((close < ma) & (slope < 0), -1, 0))
+            self.market_regime = pd.Series(regime, index=close.index, dtype=float).where(ma.notna())
+        
+        # 各指数收盘价与市场状态合并为一张表并向前填充，每只股票只需按日期查找一次
+        if self.benchmarks:
+            columns = {code: frame['close'].astype(float) for code, frame in self.benchmarks.items()}
+            if self.market_regime is not None:
+                columns['Market_Regime'] = self.market_regime
+            self._benchmark_frame = pd.concat(columns, axis=1).sort_index().ffill()
+    
+    @property
+    def benchmark_key(self) -> Optional[Dict]:
+        """当前基准指数的内容指纹，基准变化后依赖市场特征的增量结果需要重建"""
+        return self._benchmark_key
+    
+    def calculate_market_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        """基于基准指数计算相对强弱(RS_指数代码)和市场状态(Market_Regime)"""
+        return pd.DataFrame(self._market_columns(data['close'], data.index), index=data.index)
+    
+    def _market_columns(self, close, index: pd.Index) -> Dict[str, np.ndarray]:
+        """相对强弱与市场状态的各列数组，没有基准指数时为空"""
+        if not self.benchmarks:
+            return {}
+        
+        period = BENCHMARK_CONFIG['rs_period']
+        stock = np.asarray(close, dtype=float)
+        aligned = self._align_benchmark(index)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stock_return = stock / numpy_ta._shift(stock, period) - 1
+            columns = {f'RS_{code}': (stock_return - (aligned[i] / numpy_ta._shift(aligned[i], period) - 1)) * 100
+                       for i, code in enumerate(self.benchmarks)}
+        if self.market_regime is not None:
+            columns['Market_Regime'] = aligned[-1]
+        return columns
+    
+    def _align_benchmark(self, index: pd.Index) -> np.ndarray:
+        """
+        将已向前填充的指数表按日期对齐到个股索引，返回(列×K线)数组
+        
+        每个日期取不晚于它的最近一行（停牌等缺失日期沿用之前的值），早于指数起始日期的为NaN
+        """
+        frame = self._benchmark_frame
+        positions = frame.index.searchsorted(index, side='right') - 1
+        values = frame.to_numpy(dtype=float)[np.maximum(positions, 0)]
+        values[positions < 0] = np.nan
+        return values.T
+    
+    def calculate_indicators(self, data: pd.DataFrame, indicators: Union[str, List[str]] = None) -> pd.DataFrame:
+        """
+        计算技术指标（TA-Lib或NumPy后端）
+        
+        indicators为预设名或列名（可用"+"组合，如"signals+chart"），只计算涉及的指标及其依赖；
+        默认计算全部指标；OHLCV在结果中统一为float64
+        """
+        # OHLCV转为连续的float64数组，指标直接在数组上计算，不复制整张表
+        fields = {col: np.ascontiguousarray(pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan))
+                  for col in PRICE_FIELDS}
+        
+        # 有结果缓存时按OHLCV内容+有效参数寻址，命中则跳过计算
+        key = None
+        cached = None
+        if self.cache is not None:
+            key = fields_fingerprint(data.index, fields, {'params': indicator_params(indicators),
+                                                         'backend': backend_name(self.ta),
+                                                         'benchmarks': self._benchmark_key})
+            cached = self.cache.get(key)
+        
+        columns = list(cached.columns) if cached is not None else self._feature_columns(indicators)
+        result, rows = self._allocate(data, fields, columns)
+        if cached is not None:
+            for col, values in cached.items():
+                rows[col][:] = values
+        else:
+            self._compute_features(data.index, fields, indicators, rows)
+            if key is not None:
+                # 缓存结果块中指标部分的列切片（写时复制，调用方修改结果不会影响缓存）
+                self.cache.put(key, result.iloc[:, len(result.columns) - len(columns):])
+        
+        return self._restore_columns(data, result)
+    
+    def _feature_columns(self, indicators: Union[str, List[str]] = None) -> List[str]:
+        """计算结果的列：请求的指标（含依赖）及基准指数特征"""
+        columns = indicator_columns(indicators) + [f'RS_{code}' for code in self.benchmarks]
+        if self.market_regime is not None:
+            columns.append('Market_Regime')
+        return columns
+    
+    def _compute_features(self, index: pd.Index, fields: Dict[str, np.ndarray],
+                          indicators: Union[str, List[str]], out: Dict[str, np.ndarray]):
+        """计算请求的指标（含依赖）及基准指数特征，直接写入out中的预分配数组"""
+        # 按注册表计算请求的指标及其依赖
+        with np.errstate(divide='ignore', invalid='ignore'):
+            compute_indicators(fields, indicators, self.ta, out=out)
+        
+        # 基准指数相对强弱与市场状态
+        for col, values in self._market_columns(fields['close'], index).items():
+            out[col][:] = values
+    
+    def _allocate(self, data: pd.DataFrame, fields: Dict[str, np.ndarray],
+                  columns: List[str]) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+        """
+        预分配(列×K线)float64块，写入数值型原始列后只包装一次DataFrame
+        
+        返回结果DataFrame与各指标列的可写视图（写入视图即写入结果）；已存在的同名原始列
+        以新结果为准，非数值原始列由_restore_columns放回
+        """
+        kinds = dict(zip(data.columns.tolist(), (dtype.kind for dtype in data.dtypes)))
+        numeric = [col for col in kinds if col not in columns and (col in fields or kinds[col] in 'iuf')]
+        
+        block = np.empty((len(numeric) + len(columns), len(data)))
+        for i, col in enumerate(numeric):
+            block[i] = fields[col] if col in fields else data[col].to_numpy(dtype=float, na_value=np.nan)
+        rows = {col: block[i] for i, col in enumerate(columns, len(numeric))}
+        
+        # 按(列×K线)存放，转置后传入使每列在内存中连续，copy=False直接使用该块
+        result = pd.DataFrame(block.T, index=data.index, columns=numeric + columns, copy=False)
+        return result, rows
+    
+    def _restore_columns(self, data: pd.DataFrame, result: pd.DataFrame) -> pd.DataFrame:
+        """放回非数值原始列（保持原类型和位置），没有时原样返回"""
+        others = [col for col in data.columns if col not in result.columns]
+        if not others:
+            return result
+        passthrough = [col for col in data.columns if col in others or col in result.columns]
+        order = list(dict.fromkeys(passthrough + list(result.columns)))
+        return pd.concat([data[others], result], axis=1)[order]
     
-    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
-        """使用TA-Lib计算所有技术指标"""
-        df = data.copy()
-        
-        # 确保数据类型正确
-        df['open'] = pd.to_numeric(df['open'], errors='coerce')
-        df['high'] = pd.to_numeric(df['high'], errors='coerce')
-        df['low'] = pd.to_numeric(df['low'], errors='coerce')
-        df['close'] = pd.to_numeric(df['close'], errors='coerce')
-        df['volume'] = pd.to_numeric(df['volume'], errors='coerce')
-        
-        # 移动平均线 - 使用TA-Lib
-        df['MA5'] = talib.SMA(df['close'], timeperiod=5)
-        df['MA10'] = talib.SMA(df['close'], timeperiod=10)
-        df['MA20'] = talib.SMA(df['close'], timeperiod=20)
-        df['MA60'] = talib.SMA(df['close'], timeperiod=60)
-        df['EMA20'] = talib.EMA(df['close'], timeperiod=20)
-        df['EMA60'] = talib.EMA(df['close'], timeperiod=60)
-        
-        # 布林带 - 使用TA-Lib
-        bb_upper, bb_middle, bb_lower = talib.BBANDS(df['close'], timeperiod=20, nbdevup=2, nbdevdn=2, matype=0)
-        df['BB_upper'] = bb_upper
-        df['BB_middle'] = bb_middle
-        df['BB_lower'] = bb_lower
-        
-        # MACD - 使用TA-Lib
-        macd, macd_signal, macd_hist = talib.MACD(df['close'], fastperiod=12, slowperiod=26, signalperiod=9)
-        df['MACD'] = macd
-        df['MACD_signal'] = macd_signal
-        df['MACD_hist'] = macd_hist
-        
-        # RSI - 使用TA-Lib
-        df['RSI'] = talib.RSI(df['close'], timeperiod=14)
-        
-        # ADX - 使用TA-Lib
-        df['ADX'] = talib.ADX(df['high'], df['low'], df['close'], timeperiod=14)
-        df['PLUS_DI'] = talib.PLUS_DI(df['high'], df['low'], df['close'], timeperiod=14)
-        df['MINUS_DI'] = talib.MINUS_DI(df['high'], df['low'], df['close'], timeperiod=14)
-        
-        # ATR - 使用TA-Lib
-        df['ATR'] = talib.ATR(df['high'], df['low'], df['close'], timeperiod=14)
-        
-        # 成交量相关指标
-        df['Volume_MA5'] = talib.SMA(df['volume'], timeperiod=5)
-        df['Volume_Ratio'] = df['volume'] / df['Volume_MA5']
-        
-        # KDJ指标 - 使用TA-Lib
-        df['K'], df['D'] = talib.STOCH(df['high'], df['low'], df['close'], 
-                                      fastk_period=9, slowk_period=3, slowk_matype=0, 
-                                      slowd_period=3, slowd_matype=0)
-        df['J'] = 3 * df['K'] - 2 * df['D']
-        
-        # 威廉指标 - 使用TA-Lib
-        df['WILLR'] = talib.WILLR(df['high'], df['low'], df['close'], timeperiod=14)
-        
-        # CCI指标 - 使用TA-Lib
-        df['CCI'] = talib.CCI(df['high'], df['low'], df['close'], timeperiod=14)
-        
-        # 随机指标 - 使用TA-Lib
-        df['STOCH_K'], df['STOCH_D'] = talib.STOCHF(df['high'], df['low'], df['close'], 
-                                                    fastk_period=5, fastd_period=3, fastd_matype=0)
-        
-        # 动量指标 - 使用TA-Lib
-        df['MOM'] = talib.MOM(df['close'], timeperiod=10)
-        
-        # 价格震荡指标 - 使用TA-Lib
-        df['ROC'] = talib.ROC(df['close'], timeperiod=10)
-        
-        # 成交量价格趋势 - 使用TA-Lib
-        df['AD'] = talib.AD(df['high'], df['low'], df['close'], df['volume'])
-        df['ADOSC'] = talib.ADOSC(df['high'], df['low'], df['close'], df['volume'], 
-                                 fastperiod=3, slowperiod=10)
-        
-        # 抛物线SAR - 使用TA-Lib
-        df['SAR'] = talib.SAR(df['high'], df['low'], acceleration=0.02, maximum=0.2)
-        
-        # 三重指数移动平均线 - 使用TA-Lib
-        df['TRIX'] = talib.TRIX(df['close'], timeperiod=30)
-        
-        # 终极摆动指标 - 使用TA-Lib
-        df['ULTOSC'] = talib.ULTOSC(df['high'], df['low'], df['close'], 
-                                   timeperiod1=7, timeperiod2=14, timeperiod3=28)
-        
-        return df
+    def calculate_indicator_family(self, data: pd.DataFrame, family: str, periods) -> pd.DataFrame:
+        """
+        一次计算同一指标的多个周期（如MA 3..120、多窗口RSI），共用前缀和与递推状态
+        
+        返回与输入索引对齐的DataFrame，列名形如MA3、RSI14
+        """
+        src = {col: pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=float)
+               for col in ('open', 'high', 'low', 'close', 'volume') if col in data.columns}
+        return pd.DataFrame(compute_family(src, family, periods), index=data.index)
     
-    def identify_band_type(self, data: pd.DataFrame) -> Dict:
+    def calculate_indicators_panel(self, panel: Dict[str, np.ndarray],
+                                   indicators: Union[str, List[str]] = None) -> Tuple[np.ndarray, List[str]]:
+        """
+        面板批量计算：一次性计算整个自选股池的指标
+        
+        panel为{'open','high','low','close','volume'}到(标的×K线)二维数组的映射，
+        每行须为等长完整历史。返回(标的×K线×指标)的结果张量及指标列名。
+        """
+        fields = {name: np.atleast_2d(np.asarray(panel[name], dtype=float))
+                  for name in ('open', 'high', 'low', 'close', 'volume')}
+        shape = fields['close'].shape
+        for name, values in fields.items():
+            if values.shape != shape:
+                raise ValueError(f"面板字段{name}形状{values.shape}与close{shape}不一致")
+        
+        arrays = compute_indicators(fields, indicators, ta=numpy_ta)
+        columns = list(arrays)
+        result = np.empty(shape + (len(columns),))
+        for i, col in enumerate(columns):
+            result[:, :, i] = arrays[col]
+        return result, columns
+    
+    def create_streaming_engine(self, data: pd.DataFrame = None) -> StreamingIndicatorEngine:
+        """创建增量指标引擎，传入历史数据时先逐根预热"""
+        engine = StreamingIndicatorEngine()
+        if data is not None and not data.empty:
+            engine.warm_up(data)
+        return engine
+    
+    def append_bars(self, data_with_indicators: pd.DataFrame, new_bars: pd.DataFrame,
+                    engine: StreamingIndicatorEngine) -> pd.DataFrame:
+        """用增量引擎计算新K线的指标并追加到已有结果，历史行不再重算"""
+        computed = engine.run(new_bars, set(data_with_indicators.columns.tolist()))
+        parts = [new_bars, computed]
+        
+        # 相对强弱依赖前rs_period根收盘价，只用已有结果的尾部收盘价计算新K线的市场特征
+        if self.benchmarks:
+            history = data_with_indicators.tail(BENCHMARK_CONFIG['rs_period'])
+            close = np.concatenate([history['close'].to_numpy(dtype=float), new_bars['close'].to_numpy(dtype=float)])
+            market_columns = self._market_columns(close, history.index.append(new_bars.index))
+            parts.append(pd.DataFrame({col: values[len(history):] for col, values in market_columns.items()},
+                                      index=new_bars.index))
+        
+        new_rows = pd.concat(parts, axis=1)
+        return pd.concat([data_with_indicators, new_rows])
+    
+    def latest_bar(self, data: pd.DataFrame) -> LatestBar:
+        """提取最新K线特征快照，同一次分析的各方法可通过latest参数共用"""
+        return LatestBar.from_frame(data)
+    
+    def identify_band_type(self, data: pd.DataFrame, latest: LatestBar = None) -> Dict:
         """识别波段类型和位置 - 基于TA-Lib指标"""
-        latest = data.iloc[-1]
-        recent_5 = data.tail(5)
-        recent_15 = data.tail(15)
+        if latest is None:
+            latest = self.latest_bar(data)
         
-        # 计算价格波动幅度
-        price_volatility = data['close'].pct_change().std() * np.sqrt(252)
+        # 价格波动幅度
+        price_volatility = latest.volatility
         
         # 计算波段位置
-        band_position = self._analyze_band_position(data)
+        band_position = self._analyze_band_position(latest)
         
         # 判断波段类型
         band_info = {
             'type': '标准波段',
-            'period_range': '5-15天',
+            'period_range': BAND_TYPES['标准波段'],
             'volatility': price_volatility,
-            'trend_strength': latest['ADX'] if not pd.isna(latest['ADX']) else 20,
+            'trend_strength': latest.adx if not pd.isna(latest.adx) else 20,
             'position': band_position['position'],
             'position_description': band_position['description'],
             'guidance': band_position['guidance'],
@@ -123,41 +291,35 @@ class TechnicalAnalyzer:
         
         # 微型波段：短期高波动 + 高成交量
         if (price_volatility > 0.4 and 
-            latest['Volume_Ratio'] > 1.5 and 
-            latest['ATR'] > data['ATR'].mean() * 1.2):
+            latest.volume_ratio > 1.5 and 
+            latest.atr > latest.atr_mean * 1.2):
             band_info['type'] = '微型波段'
-            band_info['period_range'] = '15-30分钟'
         
         # 趋势波段：长期趋势明确 + ADX强
-        elif (latest['ADX'] > 30 and 
-              self._check_ma_alignment(latest) and
-              latest['TRIX'] > 0):
+        elif (latest.adx > 30 and 
+              latest.ma_alignment and
+              latest.trix > 0):
             band_info['type'] = '趋势波段'
-            band_info['period_range'] = '15-30天'
         
         # 短线波段：布林带收口 + 低波动
-        elif (self._check_bollinger_squeeze(recent_5) and
+        elif (latest.bb_squeeze and
               price_volatility < 0.2):
             band_info['type'] = '短线波段'
-            band_info['period_range'] = '1-3天'
         
         # 震荡波段：RSI在40-60区间 + 低ADX
-        elif (40 <= latest['RSI'] <= 60 and
-              latest['ADX'] < 20):
+        elif (40 <= latest.rsi <= 60 and
+              latest.adx < 20):
             band_info['type'] = '震荡波段'
-            band_info['period_range'] = '3-7天'
         
+        band_info['period_range'] = BAND_TYPES[band_info['type']]
         return band_info
     
-    def _analyze_band_position(self, data: pd.DataFrame) -> Dict:
+    def _analyze_band_position(self, latest: LatestBar) -> Dict:
         """分析当前在波段中的位置"""
-        latest = data.iloc[-1]
-        recent_10 = data.tail(10)
-        
-        # 计算关键价格水平
-        high_20 = data['high'].rolling(20).max().iloc[-1]
-        low_20 = data['low'].rolling(20).min().iloc[-1]
-        current_price = latest['close']
+        # 关键价格水平
+        high_20 = latest.high_20
+        low_20 = latest.low_20
+        current_price = latest.close
         
         # 计算在20日高低点之间的位置百分比
         if high_20 != low_20:
@@ -166,38 +328,23 @@ class TechnicalAnalyzer:
             position_percent = 50
         
         # 判断波段位置
-        if position_percent >= 80:
-            position = "波段顶部"
-            description = "价格接近20日高点，处于波段高位"
-            guidance = "注意获利了结，设置止盈位，警惕回调风险"
-        elif position_percent >= 60:
-            position = "波段中上"
-            description = "价格处于波段中上位置，仍有上涨空间"
-            guidance = "可继续持有，关注量能配合，设置移动止损"
-        elif position_percent >= 40:
-            position = "波段中部"
-            description = "价格处于波段中部，方向待确认"
-            guidance = "观望为主，等待明确信号，可小仓位试探"
-        elif position_percent >= 20:
-            position = "波段中下"
-            description = "价格处于波段中下位置，存在反弹机会"
-            guidance = "关注支撑位，可逢低建仓，设置严格止损"
-        else:
-            position = "波段底部"
-            description = "价格接近20日低点，处于波段低位"
-            guidance = "关注超跌反弹，可分批建仓，注意风险控制"
+        position, description, guidance = BAND_POSITIONS[-1][1:]
+        for threshold, *labels in BAND_POSITIONS[:-1]:
+            if position_percent >= threshold:
+                position, description, guidance = labels
+                break
         
         # 结合技术指标进一步判断
-        rsi = latest['RSI'] if not pd.isna(latest['RSI']) else 50
-        macd_signal = latest['MACD'] > latest['MACD_signal']
+        rsi = latest.rsi if not pd.isna(latest.rsi) else 50
+        macd_signal = latest.macd > latest.macd_signal
         
         # 调整指导建议
         if position in ["波段顶部", "波段中上"] and rsi > 70:
-            guidance += "，RSI超买，建议减仓"
+            guidance += GUIDANCE_SUFFIXES[0]
         elif position in ["波段底部", "波段中下"] and rsi < 30:
-            guidance += "，RSI超卖，可考虑抄底"
+            guidance += GUIDANCE_SUFFIXES[1]
         elif position == "波段中部" and macd_signal:
-            guidance += "，MACD金叉，可适当加仓"
+            guidance += GUIDANCE_SUFFIXES[2]
         
         return {
             'position': position,
@@ -208,54 +355,52 @@ class TechnicalAnalyzer:
             'low_20': low_20
         }
     
-    def _check_ma_alignment(self, latest_data) -> bool:
-        """检查均线多头排列"""
-        try:
-            return (latest_data['MA5'] > latest_data['MA10'] > 
-                   latest_data['MA20'] > latest_data['MA60'])
-        except:
-            return False
-    
-    def _check_bollinger_squeeze(self, recent_data) -> bool:
-        """检查布林带收口"""
-        try:
-            bb_width = (recent_data['BB_upper'] - recent_data['BB_lower']) / recent_data['BB_middle']
-            return bb_width.iloc[-1] < bb_width.mean() * 0.8
-        except:
-            return False
+    def _signal_thresholds(self, overrides: Dict = None) -> Dict:
+        """六维信号的判断阈值（SIGNAL_CONFIG），overrides可临时覆盖，用于参数扫描"""
+        thresholds = {
+            'rsi_range': SIGNAL_CONFIG['rsi_range'],
+            'volume_threshold': SIGNAL_CONFIG['volume_threshold'],
+            'fund_inflow_threshold': SIGNAL_CONFIG['fund_inflow_threshold'],
+            'adx_trend_threshold': TECHNICAL_CONFIG['adx_trend_threshold'],
+            'adx_market_threshold': SIGNAL_CONFIG['adx_market_threshold'],
+        }
+        thresholds.update(overrides or {})
+        return thresholds
     
-    def six_dimension_signal_check(self, data: pd.DataFrame, fund_flow: Dict = None) -> Dict:
+    def six_dimension_signal_check(self, data: pd.DataFrame, fund_flow: Dict = None,
+                                   latest: LatestBar = None) -> Dict:
         """六维信号验证 - 基于TA-Lib指标"""
-        latest = data.iloc[-1]
-        recent_3 = data.tail(3)
-        recent_5 = data.tail(5)
+        thresholds = self._signal_thresholds()
+        rsi_min, rsi_max = thresholds['rsi_range']
+        if latest is None:
+            latest = self.latest_bar(data)
         
         signals = {}
         signal_count = 0
         
         # 1. 趋势方向：均线多头排列 + TRIX确认
-        trend_signal = (self._check_ma_alignment(latest) and 
-                       latest['TRIX'] > 0 and
-                       latest['ADX'] > 25)
+        trend_signal = (latest.ma_alignment and 
+                       latest.trix > 0 and
+                       latest.adx > thresholds['adx_trend_threshold'])
         signals['trend_direction'] = {
             'status': trend_signal,
             'strength': 90 if trend_signal else 30,
             'description': '均线多头排列+TRIX确认' if trend_signal else '趋势不明确',
             'details': {
-                'ma_alignment': self._check_ma_alignment(latest),
-                'trix': latest['TRIX'],
-                'adx': latest['ADX']
+                'ma_alignment': latest.ma_alignment,
+                'trix': latest.trix,
+                'adx': latest.adx
             }
         }
         if trend_signal:
             signal_count += 1
         
         # 2. 动量强度：RSI + CCI + 威廉指标综合判断
-        rsi_value = latest['RSI'] if not pd.isna(latest['RSI']) else 50
-        cci_value = latest['CCI'] if not pd.isna(latest['CCI']) else 0
-        willr_value = latest['WILLR'] if not pd.isna(latest['WILLR']) else -50
+        rsi_value = latest.rsi if not pd.isna(latest.rsi) else 50
+        cci_value = latest.cci if not pd.isna(latest.cci) else 0
+        willr_value = latest.willr if not pd.isna(latest.willr) else -50
         
-        momentum_signal = (45 <= rsi_value <= 75 and
+        momentum_signal = (rsi_min <= rsi_value <= rsi_max and
                           -100 <= cci_value <= 100 and
                           -80 <= willr_value <= -20)
         
@@ -273,23 +418,27 @@ class TechnicalAnalyzer:
             signal_count += 1
         
         # 3. 量能配合：成交量 + ADOSC确认
-        volume_signal = (latest['Volume_Ratio'] > 1.2 and
-                        latest['ADOSC'] > 0)
+        volume_signal = (latest.volume_ratio > thresholds['volume_threshold'] and
+                        latest.adosc > 0)
         signals['volume_cooperation'] = {
             'status': volume_signal,
-            'ratio': latest['Volume_Ratio'],
-            'description': f'量能配合良好(量比:{latest["Volume_Ratio"]:.1f})' if volume_signal else '量能不足',
+            'ratio': latest.volume_ratio,
+            'description': f'量能配合良好(量比:{latest.volume_ratio:.1f})' if volume_signal else '量能不足',
             'details': {
-                'volume_ratio': latest['Volume_Ratio'],
-                'adosc': latest['ADOSC']
+                'volume_ratio': latest.volume_ratio,
+                'adosc': latest.adosc
             }
         }
         if volume_signal:
             signal_count += 1
         
         # 4. 资金验证：主力资金流入
+        # 未提供实时资金数据时，使用已对齐的资金流向历史列
+        if fund_flow is None and not pd.isna(latest.main_net_inflow):
+            fund_flow = {'main_net_inflow': latest.main_net_inflow}
+        
         fund_signal = False
-        if fund_flow and fund_flow['main_net_inflow'] > 0:
+        if fund_flow and fund_flow['main_net_inflow'] > thresholds['fund_inflow_threshold']:
             fund_signal = True
             signal_count += 1
         
@@ -303,29 +452,32 @@ class TechnicalAnalyzer:
         }
         
         # 5. 形态确认：突破或回踩 + SAR确认
-        pattern_signal = (self._check_pattern_breakthrough(data) and
-                         latest['close'] > latest['SAR'])
+        pattern_signal = (latest.pattern_breakthrough and
+                         latest.close > latest.sar)
         signals['pattern_confirmation'] = {
             'status': pattern_signal,
             'description': '形态突破+SAR确认' if pattern_signal else '无明显突破形态',
             'details': {
-                'sar_signal': latest['close'] > latest['SAR'],
-                'pattern_break': self._check_pattern_breakthrough(data)
+                'sar_signal': latest.close > latest.sar,
+                'pattern_break': latest.pattern_breakthrough
             }
         }
         if pattern_signal:
             signal_count += 1
         
-        # 6. 市场环境：ADX + 终极摆动指标
-        market_signal = (latest['ADX'] > 25 and
-                        latest['ULTOSC'] > 30 and latest['ULTOSC'] < 70)
+        # 6. 市场环境：ADX + 终极摆动指标，有基准指数时大盘不能处于空头状态
+        market_regime = latest.market_regime
+        market_signal = (latest.adx > thresholds['adx_market_threshold'] and
+                        latest.ultosc > 30 and latest.ultosc < 70 and
+                        not market_regime < 0)
         signals['market_environment'] = {
             'status': market_signal,
-            'adx_value': latest['ADX'] if not pd.isna(latest['ADX']) else 20,
+            'adx_value': latest.adx if not pd.isna(latest.adx) else 20,
             'description': '市场环境良好' if market_signal else '市场环境不佳',
             'details': {
-                'adx': latest['ADX'],
-                'ultosc': latest['ULTOSC']
+                'adx': latest.adx,
+                'ultosc': latest.ultosc,
+                'market_regime': market_regime
             }
         }
         if market_signal:
@@ -342,31 +494,153 @@ class TechnicalAnalyzer:
             'recommendation': self._get_recommendation(signal_count, overall_score)
         }
     
-    def _check_pattern_breakthrough(self, data: pd.DataFrame) -> bool:
-        """检查突破形态 - 基于TA-Lib指标"""
-        if len(data) < 20:
-            return False
-        
-        latest = data.iloc[-1]
-        recent_5 = data.tail(5)
-        
-        # 价格突破布林带上轨
-        bb_breakout = latest['close'] > latest['BB_upper']
-        
-        # MACD金叉
-        macd_cross = (latest['MACD'] > latest['MACD_signal'] and
-                     data.iloc[-2]['MACD'] <= data.iloc[-2]['MACD_signal'])
+    def six_dimension_signal_series(self, data: pd.DataFrame, fund_flow: Dict = None,
+                                    thresholds: Dict = None, config: Dict = None) -> pd.DataFrame:
+        """
+        六维信号历史 - 按列一次计算每根K线的六个信号、信号数量和综合评分
+        
+        判断条件与six_dimension_signal_check逐项一致，最后一行等于其结果；
+        实时资金数据fund_flow只作用于最后一根K线；thresholds覆盖SIGNAL_CONFIG中的判断阈值；
+        config为data中指标所用的参数（如均线周期），默认取TECHNICAL_CONFIG
+        """
+        config = TECHNICAL_CONFIG if config is None else config
+        thresholds = self._signal_thresholds(thresholds)
+        rsi_min, rsi_max = thresholds['rsi_range']
+        n = len(data)
+        
+        def column(name: str, fill: float = np.nan) -> np.ndarray:
+            if name not in data.columns:
+                return np.full(n, fill)
+            values = data[name].to_numpy(dtype=float)
+            return values if np.isnan(fill) else np.where(np.isnan(values), fill, values)
+        
+        close = column('close')
+        adx = column('ADX')
         
-        # 成交量突破
-        volume_breakout = latest['Volume_Ratio'] > 1.5
+        # 1. 趋势方向：均线多头排列 + TRIX确认
+        ma_alignment = np.ones(n, dtype=bool)
+        ma_values = [column(f'MA{period}') for period in sorted(config['ma_periods'])]
+        for short, long in zip(ma_values, ma_values[1:]):
+            ma_alignment &= short > long
+        trend = ma_alignment & (column('TRIX') > 0) & (adx > thresholds['adx_trend_threshold'])
+        
+        # 2. 动量强度：RSI + CCI + 威廉指标（缺失值按中性值处理）
+        rsi = column('RSI', 50)
+        cci = column('CCI', 0)
+        willr = column('WILLR', -50)
+        momentum = ((rsi >= rsi_min) & (rsi <= rsi_max) &
+                    (cci >= -100) & (cci <= 100) &
+                    (willr >= -80) & (willr <= -20))
         
-        # 至少满足两个条件
-        return sum([bb_breakout, macd_cross, volume_breakout]) >= 2
+        # 3. 量能配合：成交量 + ADOSC确认
+        volume_ratio = column('Volume_Ratio')
+        volume = (volume_ratio > thresholds['volume_threshold']) & (column('ADOSC') > 0)
+        
+        # 4. 资金验证：历史按资金流向列，实时数据覆盖最后一根K线
+        fund = column('main_net_inflow') > thresholds['fund_inflow_threshold']
+        if fund_flow is not None and n:
+            fund[-1] = bool(fund_flow and fund_flow['main_net_inflow'] > thresholds['fund_inflow_threshold'])
+        
+        # 5. 形态确认：突破条件（布林上轨/MACD金叉/放量）至少满足两个 + SAR确认
+        macd = column('MACD')
+        macd_signal = column('MACD_signal')
+        macd_cross = np.zeros(n, dtype=bool)
+        macd_cross[1:] = (macd[1:] > macd_signal[1:]) & (macd[:-1] <= macd_signal[:-1])
+        breakout_count = ((close > column('BB_upper')).astype(int) + macd_cross.astype(int) +
+                          (volume_ratio > 1.5).astype(int))
+        pattern = (breakout_count >= 2) & (np.arange(n) >= 19) & (close > column('SAR'))
+        
+        # 6. 市场环境：ADX + 终极摆动指标，大盘不能处于空头状态
+        ultosc = column('ULTOSC')
+        market = (adx > thresholds['adx_market_threshold']) & (ultosc > 30) & (ultosc < 70) & ~(column('Market_Regime') < 0)
+        
+        result = pd.DataFrame({
+            'trend_direction': trend,
+            'momentum_strength': momentum,
+            'volume_cooperation': volume,
+            'fund_verification': fund,
+            'pattern_confirmation': pattern,
+            'market_environment': market
+        }, index=data.index)
+        result['signal_count'] = result.sum(axis=1)
+        result['overall_score'] = result['signal_count'] / 6 * 100
+        return result
+    
+    def band_history(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        波段历史 - 按列一次计算每根K线的20日高低点、波段位置、波段类型与指导建议
+        
+        判断条件与identify_band_type逐项一致，最后一行等于其结果；20日高低点用O(n)的滚动极值，
+        波动率与ATR均值按截至各K线的全部历史（expanding）计算；位置、类型与指导建议为分类列
+        """
+        n = len(data)
+        
+        def column(name: str) -> np.ndarray:
+            return data[name].to_numpy(dtype=float) if name in data.columns else np.full(n, np.nan)
+        
+        close = column('close')
+        high_20 = numpy_ta._rolling_max(column('high'), 20)
+        low_20 = numpy_ta._rolling_min(column('low'), 20)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position_percent = np.where(high_20 != low_20, (close - low_20) / (high_20 - low_20) * 100, 50.0)
+        
+        # 波段位置：按BAND_POSITIONS的下限自上而下判断
+        thresholds = [threshold for threshold, *_ in BAND_POSITIONS[:-1]]
+        position = np.select([position_percent >= threshold for threshold in thresholds],
+                             range(len(thresholds)), default=len(thresholds))
+        
+        # 指导建议补充：RSI超买/超卖、MACD金叉（缺失RSI按50处理）
+        rsi = column('RSI')
+        rsi_filled = np.where(np.isnan(rsi), 50.0, rsi)
+        suffix = np.select([(position <= 1) & (rsi_filled > 70),
+                            (position >= 3) & (rsi_filled < 30),
+                            (position == 2) & (column('MACD') > column('MACD_signal'))],
+                           range(1, len(GUIDANCE_SUFFIXES) + 1), default=0)
+        guidance = [base + extra for *_, base in BAND_POSITIONS for extra in [''] + GUIDANCE_SUFFIXES]
+        
+        # 波段类型所需的近期统计，与LatestBar一致
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.r_[np.nan, close[1:] / close[:-1] - 1] if n else close
+            width = (column('BB_upper') - column('BB_lower')) / column('BB_middle')
+        volatility = pd.Series(returns).expanding(min_periods=2).std().to_numpy() * np.sqrt(252)
+        atr = column('ATR')
+        atr_mean = pd.Series(atr).expanding(min_periods=1).mean().to_numpy()
+        
+        # 布林带收口：带宽低于近5根（忽略缺失）均值的80%
+        windows = sliding_window_view(np.r_[np.full(4, np.nan), width], 5) if n else np.empty((0, 5))
+        valid = ~np.isnan(windows)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            width_mean = np.where(valid, windows, 0.0).sum(axis=1) / valid.sum(axis=1)
+        bb_squeeze = width < width_mean * 0.8
+        
+        ma_alignment = np.ones(n, dtype=bool)
+        ma_values = [column(f'MA{period}') for period in sorted(TECHNICAL_CONFIG['ma_periods'])]
+        for short, long in zip(ma_values, ma_values[1:]):
+            ma_alignment &= short > long
+        
+        adx = column('ADX')
+        band_type = np.select([
+            (volatility > 0.4) & (column('Volume_Ratio') > 1.5) & (atr > atr_mean * 1.2),
+            (adx > 30) & ma_alignment & (column('TRIX') > 0),
+            bb_squeeze & (volatility < 0.2),
+            (rsi >= 40) & (rsi <= 60) & (adx < 20),
+        ], range(1, len(BAND_TYPES)), default=0)
+        
+        return pd.DataFrame({
+            'high_20': high_20,
+            'low_20': low_20,
+            'position_percent': position_percent,
+            'volatility': volatility,
+            'position': pd.Categorical.from_codes(position, [label for _, label, *_ in BAND_POSITIONS]),
+            'band_type': pd.Categorical.from_codes(band_type, list(BAND_TYPES)),
+            'guidance': pd.Categorical.from_codes(position * (len(GUIDANCE_SUFFIXES) + 1) + suffix, guidance)
+        }, index=data.index)
     
     def analyze_position(self, current_price: float, cost_price: float, position_size: int, 
-                        signal_result: Dict, data: pd.DataFrame) -> Dict:
+                        signal_result: Dict, data: pd.DataFrame, latest: LatestBar = None) -> Dict:
         """持仓分析 - 基于TA-Lib指标"""
-        latest = data.iloc[-1]
+        if latest is None:
+            latest = self.latest_bar(data)
         
         # 计算盈亏
         profit_loss = (current_price - cost_price) * position_size
@@ -375,23 +649,23 @@ class TechnicalAnalyzer:
         
         # 基于技术指标的风险评估
         risk_level = '低'
-        if latest['RSI'] > 80 or latest['RSI'] < 20:
+        if latest.rsi > 80 or latest.rsi < 20:
             risk_level = '高'
-        elif latest['RSI'] > 70 or latest['RSI'] < 30:
+        elif latest.rsi > 70 or latest.rsi < 30:
             risk_level = '中'
         
         # 趋势强度评估
         trend_strength = '弱'
-        if latest['ADX'] > 30:
+        if latest.adx > 30:
             trend_strength = '强'
-        elif latest['ADX'] > 20:
+        elif latest.adx > 20:
             trend_strength = '中'
         
         # 建议操作
         recommendation = '持有'
-        if profit_loss_pct > 10 and latest['RSI'] > 75:
+        if profit_loss_pct > 10 and latest.rsi > 75:
             recommendation = '考虑减仓'
-        elif profit_loss_pct < -5 and latest['RSI'] < 25:
+        elif profit_loss_pct < -5 and latest.rsi < 25:
             recommendation = '考虑止损'
         elif signal_result['signal_count'] >= 4:
             recommendation = '可加仓'
@@ -414,17 +688,18 @@ class TechnicalAnalyzer:
             'recommendation': recommendation,
             'position_status': position_status,  # 添加position_status字段
             'technical_signals': {
-                'rsi': latest['RSI'],
-                'adx': latest['ADX'],
-                'macd_signal': latest['MACD'] > latest['MACD_signal'],
-                'bb_position': (current_price - latest['BB_lower']) / (latest['BB_upper'] - latest['BB_lower'])
+                'rsi': latest.rsi,
+                'adx': latest.adx,
+                'macd_signal': latest.macd > latest.macd_signal,
+                'bb_position': (current_price - latest.bb_lower) / (latest.bb_upper - latest.bb_lower)
             }
         }
     
     def generate_trading_decision(self, signal_result: Dict, data: pd.DataFrame, 
-                                 position_info: Dict = None) -> Dict:
+                                 position_info: Dict = None, latest: LatestBar = None) -> Dict:
         """生成交易决策 - 基于TA-Lib指标"""
-        latest = data.iloc[-1]
+        if latest is None:
+            latest = self.latest_bar(data)
         signal_count = signal_result['signal_count']
         overall_score = signal_result['overall_score']
         
@@ -447,8 +722,8 @@ class TechnicalAnalyzer:
         
         # 考虑持仓情况
         if position_info:
-            return self._generate_position_based_decision(signal_count, latest['close'], 
-                                                        latest['ATR'], position_info, signal_result)
+            return self._generate_position_based_decision(signal_count, latest.close, 
+                                                        latest.atr, position_info, signal_result)
         
         # 计算建议仓位
         position_suggestion = self._calculate_position_suggestion(signal_count, overall_score, latest)
@@ -457,25 +732,13 @@ class TechnicalAnalyzer:
         risk_warnings = self._generate_risk_warnings(latest)
         
         # 计算目标价位和止损价位
-        current_price = latest['close']
-        atr = latest['ATR'] if not pd.isna(latest['ATR']) else current_price * 0.02
+        current_price = latest.close
+        atr = latest.atr if not pd.isna(latest.atr) else current_price * 0.02
         
-        # 根据信号强度确定目标涨幅
-        if signal_count >= 5:
-            target_multiplier = 1.15  # 15%目标涨幅
-            holding_period = '5-15天'
-        elif signal_count >= 4:
-            target_multiplier = 1.10  # 10%目标涨幅
-            holding_period = '3-7天'
-        elif signal_count >= 3:
-            target_multiplier = 1.06  # 6%目标涨幅
-            holding_period = '1-3天'
-        elif signal_count >= 2:
-            target_multiplier = 1.03  # 3%目标涨幅
-            holding_period = '1-2天'
-        else:
-            target_multiplier = 1.00  # 无涨幅预期
-            holding_period = '观望'
+        # 根据信号强度确定目标涨幅（决策矩阵档位）
+        tier = decision_tier(signal_count)
+        target_multiplier = tier['target_multiplier']
+        holding_period = tier['holding_period']
         
         target_price = current_price * target_multiplier
         stop_loss = current_price * 0.95  # 5%止损
@@ -548,13 +811,15 @@ class TechnicalAnalyzer:
             holding_period = '观望等待'
         
         # 计算建议仓位
-        position_suggestion = self._calculate_position_suggestion(signal_count, (signal_count / 6) * 100, pd.Series({'ATR': atr, 'close': current_price, 'RSI': 50}))
+        position_suggestion = self._calculate_position_suggestion(signal_count, (signal_count / 6) * 100, LatestBar(atr=atr, close=current_price, rsi=50))
         
-        # 生成风险提示
-        risk_warnings = self._generate_risk_warnings(pd.Series({'RSI': 50, 'ADX': 25, 'Volume_Ratio': 1.0, 'close': current_price, 'BB_upper': current_price * 1.05, 'BB_lower': current_price * 0.95}))
+        # 生成风险提示（持仓决策使用中性指标值）
+        neutral = LatestBar(rsi=50, adx=25, volume_ratio=1.0, close=current_price,
+                            bb_upper=current_price * 1.05, bb_lower=current_price * 0.95)
+        risk_warnings = self._generate_risk_warnings(neutral)
         
         # 生成技术面理由，传递真实signal_result
-        technical_reasons = self._get_technical_reasons(signal_result, pd.Series({'RSI': 50, 'ADX': 25, 'Volume_Ratio': 1.0, 'close': current_price, 'BB_upper': current_price * 1.05, 'BB_lower': current_price * 0.95}))
+        technical_reasons = self._get_technical_reasons(signal_result, neutral)
         
         return {
             'decision': decision,
@@ -576,22 +841,22 @@ class TechnicalAnalyzer:
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
     
-    def _calculate_position_suggestion(self, signal_count: int, overall_score: float, latest: pd.Series) -> Dict:
+    def _calculate_position_suggestion(self, signal_count: int, overall_score: float, latest: LatestBar) -> Dict:
         """计算建议仓位"""
         # 基础仓位
         base_position = min(signal_count * 20, 100)  # 每个信号20%，最大100%
         
         # 根据ATR调整
-        atr_ratio = latest['ATR'] / latest['close']
+        atr_ratio = latest.atr / latest.close
         if atr_ratio > 0.05:  # 高波动
             base_position *= 0.8
         elif atr_ratio < 0.02:  # 低波动
             base_position *= 1.2
         
         # 根据RSI调整
-        if 40 <= latest['RSI'] <= 60:
+        if 40 <= latest.rsi <= 60:
             base_position *= 1.1  # 中性区间，可适当增加仓位
-        elif latest['RSI'] > 70 or latest['RSI'] < 30:
+        elif latest.rsi > 70 or latest.rsi < 30:
             base_position *= 0.7  # 极值区间，减少仓位
         
         return {
@@ -600,29 +865,29 @@ class TechnicalAnalyzer:
             'reasoning': f'基于{signal_count}个技术信号，建议仓位{round(base_position, 1)}%'
         }
     
-    def _generate_risk_warnings(self, latest: pd.Series) -> List[str]:
+    def _generate_risk_warnings(self, latest: LatestBar) -> List[str]:
         """生成风险提示"""
         warnings = []
         
-        if latest['RSI'] > 80:
+        if latest.rsi > 80:
             warnings.append('RSI超买，注意回调风险')
-        elif latest['RSI'] < 20:
+        elif latest.rsi < 20:
             warnings.append('RSI超卖，可能存在反弹机会')
         
-        if latest['ADX'] < 20:
+        if latest.adx < 20:
             warnings.append('趋势强度较弱，建议谨慎操作')
         
-        if latest['Volume_Ratio'] < 0.8:
+        if latest.volume_ratio < 0.8:
             warnings.append('成交量萎缩，市场活跃度不足')
         
-        if latest['close'] > latest['BB_upper']:
+        if latest.close > latest.bb_upper:
             warnings.append('价格突破布林带上轨，注意回调')
-        elif latest['close'] < latest['BB_lower']:
+        elif latest.close < latest.bb_lower:
             warnings.append('价格跌破布林带下轨，可能存在超跌反弹')
         
         return warnings
     
-    def _get_technical_reasons(self, signal_result: Dict, latest: pd.Series) -> List[str]:
+    def _get_technical_reasons(self, signal_result: Dict, latest: LatestBar) -> List[str]:
         """获取技术面理由"""
         reasons = []
         signals = signal_result['signals']
@@ -0,0 +1,184 @@
+"""
+多周期分析 - 由本地日线重采样为周线、月线，沿用同一套指标、波段识别与六维信号
+
+已收盘周期的K线、指标与增量引擎状态按股票缓存在进程内；追加日线时只把新收盘的周期
+送入增量引擎，当前未收盘的周期在引擎副本上试算，不联网也不重算历史。
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from .config import TIMEFRAME_CONFIG
+from .data_fetcher import StockDataFetcher
+from .data_store import LocalDataStore
+from .frame_cache import estimate_nbytes, get_frame_cache
+from .technical_analysis import TechnicalAnalyzer
+
+
+def resample_bars(daily: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """
+    日线重采样为周期K线，索引为该周期最后一个交易日
+
+    日线按日期升序，同一周期的K线相邻，按周期边界分段用reduceat聚合：开盘取首日、收盘取
+    末日，最高、最低与成交量忽略缺失值；资金流向净额（*_net_inflow）按周期求和，整段缺失
+    时为NaN，其余附加列不保留
+    """
+    codes = daily.index.to_period(rule).asi8
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)] - 1
+
+    def total(values: np.ndarray):
+        """分段求和（忽略缺失值）及各段有效值个数"""
+        missing = np.isnan(values)
+        return np.add.reduceat(np.where(missing, 0.0, values), starts), np.add.reduceat(~missing, starts)
+
+    field = {col: daily[col].to_numpy(dtype=float) for col in ['open', 'high', 'low', 'close', 'volume']}
+    with np.errstate(invalid='ignore'):
+        columns = {
+            'open': field['open'][starts],
+            'high': np.fmax.reduceat(field['high'], starts),
+            'low': np.fmin.reduceat(field['low'], starts),
+            'close': field['close'][ends],
+            'volume': total(field['volume'])[0],
+        }
+    for col in daily.columns.tolist():
+        if col.endswith('_net_inflow'):
+            sums, counts = total(daily[col].to_numpy(dtype=float))
+            columns[col] = np.where(counts > 0, sums, np.nan)
+
+    return pd.DataFrame(columns, index=daily.index[ends])
+
+
+def period_closed(date: pd.Timestamp, rule: str) -> bool:
+    """date所在周期在该日之后是否已没有工作日（不含节假日，周期末恰逢休市时要等下一周期开始）"""
+    end = date.to_period(rule).end_time.normalize()
+    return np.busday_count((date + pd.Timedelta(days=1)).date(), (end + pd.Timedelta(days=1)).date()) == 0
+
+
+class TimeframeSeries:
+    """
+    单只股票单一周期的增量指标序列
+
+    update传入（可能更长的）日线历史时，只有新收盘的周期进入增量引擎；日线历史被改写
+    （复权、回补）或基准指数变化时整体重建
+    """
+
+    def __init__(self, rule: str, indicators: str = None):
+        self.rule = rule
+        self.indicators = indicators or TIMEFRAME_CONFIG['indicators']
+        self.closed = None          # 已收盘周期的K线与指标
+        self.engine = None          # 已收盘周期之后的引擎状态
+        self.open_start = None      # 未收盘周期的起始时间
+        self.first_date = None
+        self.last_date = None
+        self.last_close = None
+        self.benchmark_key = None
+        self.result = None          # 已收盘周期 + 未收盘周期试算结果
+
+    def update(self, daily: pd.DataFrame, analyzer: TechnicalAnalyzer) -> pd.DataFrame:
+        """按最新日线返回周期K线与指标，最后一行为未收盘周期"""
+        if daily is None or daily.empty:
+            return pd.DataFrame()
+        if not self._extends(daily, analyzer):
+            self._rebuild(daily, analyzer)
+        elif daily.index[-1] != self.last_date:
+            bars = resample_bars(daily.loc[daily.index >= self.open_start], self.rule)
+            if len(bars) > 1:
+                self.closed = analyzer.append_bars(self.closed, bars.iloc[:-1], self.engine)
+            self._update_open(daily, bars, analyzer)
+        return self.result
+
+    def _extends(self, daily: pd.DataFrame, analyzer: TechnicalAnalyzer) -> bool:
+        """新日线是否只是在已处理历史之后追加"""
+        if self.closed is None or analyzer.benchmark_key != self.benchmark_key:
+            return False
+        index = daily.index
+        if index[0] != self.first_date:
+            return False
+        pos = index.searchsorted(self.last_date)
+        return pos < len(index) and index[pos] == self.last_date and daily['close'].iat[pos] == self.last_close
+
+    def _rebuild(self, daily: pd.DataFrame, analyzer: TechnicalAnalyzer):
+        bars = resample_bars(daily, self.rule)
+        if len(bars) < 2:
+            # 只有一个未收盘周期时直接计算，下次更新再建立增量状态
+            self.closed = None
+            self.result = analyzer.calculate_indicators(bars, self.indicators)
+            return
+        closed = bars.iloc[:-1]
+        self.closed = analyzer.calculate_indicators(closed, self.indicators)
+        self.engine = analyzer.create_streaming_engine(closed)
+        self._update_open(daily, bars, analyzer)
+
+    def _update_open(self, daily: pd.DataFrame, bars: pd.DataFrame, analyzer: TechnicalAnalyzer):
+        """在引擎副本上试算未收盘周期，并记录已处理的位置"""
+        self.result = analyzer.append_bars(self.closed, bars.iloc[-1:], self.engine.copy())
+        self.open_start = daily.index[-1:].to_period(self.rule)[0].start_time
+        self.first_date = daily.index[0]
+        self.last_date = daily.index[-1]
+        self.last_close = daily['close'].iat[-1]
+        self.benchmark_key = analyzer.benchmark_key
+
+
+def analyze_timeframe(analyzer: TechnicalAnalyzer, data: pd.DataFrame) -> Optional[Dict]:
+    """对一个周期的指标表做波段识别与六维信号验证，K线不足时返回None"""
+    if data is None or len(data) < TIMEFRAME_CONFIG['min_bars']:
+        return None
+    latest = analyzer.latest_bar(data)
+    return {
+        'band': analyzer.identify_band_type(data, latest),
+        'signals': analyzer.six_dimension_signal_check(data, latest=latest)
+    }
+
+
+class MultiTimeframeAnalyzer:
+    """按TIMEFRAME_CONFIG维护一只股票各周期的增量序列"""
+
+    def __init__(self, timeframes: Dict[str, Dict] = None):
+        self.timeframes = timeframes or TIMEFRAME_CONFIG['timeframes']
+        self.series = {name: TimeframeSeries(tf['rule']) for name, tf in self.timeframes.items()}
+
+    def update(self, daily: pd.DataFrame, analyzer: TechnicalAnalyzer) -> Dict[str, Dict]:
+        """
+        返回{周期名: {'label', 'data', 'analysis', 'closed'}}
+
+        analysis在K线不足时为None；closed表示最后一根周期K线是否已收盘
+        """
+        results = {}
+        for name, series in self.series.items():
+            data = series.update(daily, analyzer)
+            results[name] = {
+                'label': self.timeframes[name]['label'],
+                'data': data,
+                'analysis': analyze_timeframe(analyzer, data),
+                'closed': period_closed(daily.index[-1], series.rule)
+            }
+        return results
+
+    def __sizeof__(self) -> int:
+        # 供FrameCache按实际占用计入内存预算
+        frames = [frame for series in self.series.values() for frame in (series.closed, series.result)
+                  if frame is not None]
+        return object.__sizeof__(self) + sum(estimate_nbytes(frame) for frame in frames)
+
+
+def load_daily_history(symbol: str, store: LocalDataStore = None) -> Optional[pd.DataFrame]:
+    """读取本地仓库中的完整日线，并对齐已同步的资金流向历史（不联网）"""
+    store = store or LocalDataStore()
+    daily = store.load('price', symbol)
+    if daily is None or daily.empty:
+        return None
+    return StockDataFetcher(store).attach_fund_flow_history(daily, symbol, sync=False)
+
+
+def analyze_timeframes(symbol: str, analyzer: TechnicalAnalyzer, daily: pd.DataFrame = None) -> Dict[str, Dict]:
+    """多周期分析入口：各股票的增量状态缓存在进程内FrameCache中"""
+    daily = daily if daily is not None else load_daily_history(symbol)
+    if daily is None or daily.empty:
+        return {}
+    state = get_frame_cache().get_or_compute(('timeframes', symbol), MultiTimeframeAnalyzer)
+    results = state.update(daily, analyzer)
+    # 状态对象在原位更新，重新写入以刷新内存占用
+    get_frame_cache().put(('timeframes', symbol), state)
+    return results
@@ -0,0 +1,79 @@
+"""
+股票池过滤 - 按POSITION_CONFIG['blacklist_rules']一次性排除不可能入选的股票
+
+各股票最近BLACKLIST_WINDOW根K线拼成(K线×股票)面板，规则在整个面板上向量化判断，
+返回可交易股票的布尔掩码；筛选与批处理任务据此在计算指标之前跳过黑名单股票。
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable
+
+from .config import POSITION_CONFIG
+from .data_store import LocalDataStore
+
+BLACKLIST_WINDOW = 5            # 振幅与成交量按最近5根K线计算
+SHARES_PER_LOT = 100            # 本地日线volume列为akshare的成交量（手），1手=100股
+PANEL_FIELDS = ('high', 'low', 'volume')
+
+
+def build_panel(frames: Dict[str, pd.DataFrame], bars: int = BLACKLIST_WINDOW,
+                fields: Iterable[str] = PANEL_FIELDS) -> Dict[str, np.ndarray]:
+    """取各股票最近bars根K线拼成{字段: (bars×股票)矩阵}，K线不足的在前面补NaN"""
+    symbols = list(frames)
+    panel = {field: np.full((bars, len(symbols)), np.nan) for field in fields}
+    for j, symbol in enumerate(symbols):
+        tail = frames[symbol].tail(bars)
+        for field in fields:
+            if field in tail:
+                values = pd.to_numeric(tail[field], errors='coerce').to_numpy(dtype=float)
+                panel[field][bars - len(values):, j] = values
+    return panel
+
+
+def blacklist_mask(panel: Dict[str, np.ndarray], symbols: list, names: Dict[str, str] = None,
+                   rules: Dict = None) -> pd.Series:
+    """
+    在面板上判断黑名单规则，返回以股票代码为索引的布尔序列（True为可交易）
+
+    规则取值为假（False/0/None）时不启用；没有最近K线的股票视为不可交易
+    """
+    rules = POSITION_CONFIG['blacklist_rules'] if rules is None else rules
+    high, low, volume = panel['high'], panel['low'], panel['volume']
+    eligible = ~np.isnan(high).all(axis=0)
+
+    if rules.get('st_stocks') and names:
+        labels = pd.Series([names.get(symbol, '') for symbol in symbols], dtype=str)
+        eligible &= ~labels.str.upper().str.contains('ST', regex=False).to_numpy()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if rules.get('low_volatility'):
+            lowest = np.where(np.isnan(low), np.inf, low).min(axis=0)
+            highest = np.where(np.isnan(high), -np.inf, high).max(axis=0)
+            amplitude = (highest - lowest) / lowest
+            eligible &= amplitude >= rules['low_volatility']
+        if rules.get('min_volume'):
+            # volume列单位为手，min_volume单位为股
+            counts = (~np.isnan(volume)).sum(axis=0)
+            mean_volume = np.where(counts > 0, np.nansum(volume, axis=0) / np.maximum(counts, 1), 0.0)
+            eligible &= mean_volume * SHARES_PER_LOT >= rules['min_volume']
+
+    return pd.Series(eligible, index=pd.Index(symbols, name='symbol'))
+
+
+def eligible_symbols(frames: Dict[str, pd.DataFrame], names: Dict[str, str] = None,
+                     rules: Dict = None) -> list:
+    """返回通过黑名单规则的股票代码（保持原顺序）"""
+    if not frames:
+        return []
+    mask = blacklist_mask(build_panel(frames), list(frames), names, rules)
+    return mask.index[mask.to_numpy()].tolist()
+
+
+def load_names(store: LocalDataStore = None) -> Dict[str, str]:
+    """从本地行业成分表读取股票名称（ST判断用），没有成分表时返回空字典"""
+    store = store or LocalDataStore()
+    membership = store.load('meta', 'industry')
+    if membership is None or membership.empty:
+        return {}
+    return dict(zip(membership['symbol'].astype(str), membership['name'].astype(str)))
@@ -5,6 +5,8 @@ import numpy as np
 from datetime import datetime
 from typing import Dict
 
+from .config import TECHNICAL_CONFIG
+
 class StockVisualizer:
     """股票可视化模块"""
     
@@ -47,8 +49,8 @@ class StockVisualizer:
         
         # 添加移动平均线
         ma_colors = self.colors['ma']
-        ma_periods = [5, 10, 20, 60]
-        ma_names = ['MA5', 'MA10', 'MA20', 'MA60']
+        ma_periods = TECHNICAL_CONFIG['ma_periods']
+        ma_names = [f'MA{period}' for period in ma_periods]
         
         for i, (period, name) in enumerate(zip(ma_periods, ma_names)):
             if name in data.columns:
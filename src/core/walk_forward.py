@@ -0,0 +1,257 @@
+"""
+滚动样本外验证（Walk-forward）- 样本内窗口择优参数，紧随其后的样本外窗口检验
+
+指标与信号都只依赖当前及之前的K线，因此每只股票按每组指标参数只在完整历史上计算一次，
+得到全部阈值组合的信号数量矩阵；各窗口只做切片和回测，从不重算calculate_indicators。
+价格与信号数量矩阵放入共享内存，各窗口分发到多个进程并行计算。
+
+用法：
+    python -m src.core.walk_forward --symbols 600519 000001 --train 500 --test 120
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from .config import SWEEP_CONFIG, TECHNICAL_CONFIG, WALK_FORWARD_CONFIG
+from .indicators import compute_indicators
+from .technical_analysis import TechnicalAnalyzer
+from .backtest import backtest_params, run_backtest, summarize
+from .sweep import (PANEL_FIELDS, PRICE_FIELDS, SharedArray, SharedPanel, attach_array, expand_grid,
+                    format_param, load_frames, split_grid)
+
+
+def prepare_signal_counts(frames: Dict[str, pd.DataFrame], grid: Dict[str, list],
+                          analyzer: TechnicalAnalyzer = None) -> tuple:
+    """
+    计算全部组合在完整历史上的信号数量
+
+    返回(信号数量矩阵(指标参数×阈值组合, 总K线), 组合列表)；组合编号与sweep一致，
+    每个组合记录所用的矩阵行与回测参数。指标参数显式传入，不改动全局TECHNICAL_CONFIG
+    """
+    analyzer = analyzer or TechnicalAnalyzer()
+    indicator_group, signal_group, backtest_group = split_grid(grid)
+    indicators, signals, backtests = (expand_grid(group) for group in (indicator_group, signal_group, backtest_group))
+
+    symbols = list(frames)
+    offsets = np.concatenate([[0], np.cumsum([len(frames[symbol]) for symbol in symbols])]).astype(int)
+    counts = np.zeros((len(indicators) * len(signals), int(offsets[-1])), dtype=np.int8)
+
+    for i, indicator in enumerate(indicators):
+        config = {**TECHNICAL_CONFIG, **indicator}
+        for symbol, start, end in zip(symbols, offsets[:-1], offsets[1:]):
+            # 与sweep的共享面板一致：OHLCV加资金流向与市场状态，缺少的列为NaN
+            fields = {field: pd.to_numeric(frames[symbol][field], errors='coerce').to_numpy(dtype=float)
+                      if field in frames[symbol].columns else np.full(end - start, np.nan)
+                      for field in PANEL_FIELDS}
+            frame = pd.DataFrame({**fields, **compute_indicators(fields, 'signals', analyzer.ta, config=config)})
+            for j, signal in enumerate(signals):
+                series = analyzer.six_dimension_signal_series(frame, thresholds=signal, config=config)
+                counts[i * len(signals) + j, start:end] = series['signal_count'].to_numpy()
+
+    combos = []
+    for i, indicator in enumerate(indicators):
+        for j, signal in enumerate(signals):
+            for backtest in backtests:
+                combos.append({'combo': len(combos), 'row': i * len(signals) + j,
+                               'params': {**indicator, **signal, **backtest},
+                               'backtest': backtest_params(backtest)})
+    return counts, combos
+
+
+def make_folds(frames: Dict[str, pd.DataFrame], train_bars: int, test_bars: int) -> List[Dict]:
+    """
+    按全部股票的交易日历划分滚动窗口（步长为样本外长度），并换算为各股票在拼接数组中的位置
+
+    slices为{代码: (样本内起点, 样本外起点, 样本外终点)}，最后一个窗口的样本外可能不足test_bars
+    """
+    calendar = pd.DatetimeIndex(sorted(set().union(*(frame.index for frame in frames.values()))))
+    symbols = list(frames)
+    offsets = np.concatenate([[0], np.cumsum([len(frames[symbol]) for symbol in symbols])]).astype(int)
+
+    folds = []
+    start = 0
+    while start + train_bars < len(calendar):
+        test_start = start + train_bars
+        test_end = min(test_start + test_bars, len(calendar))
+        dates = (calendar[start], calendar[test_start], calendar[test_end - 1])
+        slices = {}
+        for symbol, offset in zip(symbols, offsets[:-1]):
+            index = frames[symbol].index
+            slices[symbol] = (int(offset + index.searchsorted(dates[0])),
+                              int(offset + index.searchsorted(dates[1])),
+                              int(offset + index.searchsorted(dates[2], side='right')))
+        folds.append({'fold': len(folds), 'train_start': dates[0], 'test_start': dates[1],
+                      'test_end': dates[2], 'slices': slices})
+        start += test_bars
+    return folds
+
+
+def _backtest_slice(prices: np.ndarray, counts: np.ndarray, combo: Dict, start: int, end: int) -> Dict:
+    """在拼接数组的[start, end)区间上回测一个组合"""
+    fields = {field: prices[i, start:end] for i, field in enumerate(PRICE_FIELDS[:4])}
+    return run_backtest(fields, counts[combo['row'], start:end], combo['backtest'])
+
+
+def evaluate_fold(fold: Dict, prices: np.ndarray, counts: np.ndarray, combos: List[Dict],
+                  objective: str, min_trades: float) -> Dict:
+    """样本内按各股票目标指标均值择优，再在样本外回测选中的组合（窗口开始时空仓）"""
+    best, best_score = None, -np.inf
+    for combo in combos:
+        metrics = [_backtest_slice(prices, counts, combo, train, test)['metrics']
+                   for train, test, _ in fold['slices'].values() if test - train > 1]
+        if not metrics or np.mean([m['trades'] for m in metrics]) < min_trades:
+            continue
+        score = np.mean([m[objective] for m in metrics])
+        if score > best_score:
+            best, best_score = combo, score
+
+    result = {'fold': fold['fold'], 'combo': None if best is None else best['combo'],
+              'in_sample': None if best is None else float(best_score), 'symbols': {}}
+    for symbol, (_, test, end) in fold['slices'].items():
+        if end <= test:
+            continue
+        if best is None:
+            # 没有满足交易笔数要求的组合时样本外保持空仓
+            result['symbols'][symbol] = {'returns': np.zeros(end - test), 'weights': np.zeros(end - test),
+                                         'trade_return': np.empty(0), 'holding_days': np.empty(0, dtype=int)}
+            continue
+        backtest = _backtest_slice(prices, counts, best, test, end)
+        trades = backtest['trades']
+        result['symbols'][symbol] = {'returns': backtest['returns'], 'weights': backtest['weights'],
+                                     'trade_return': trades['trade_return'],
+                                     'holding_days': trades['exit_bar'] - trades['entry_bar'] + 1}
+    return result
+
+
+_worker = {}
+
+
+def _init_worker(price_spec: Dict, count_spec: Dict, combos: List[Dict], objective: str, min_trades: float):
+    """子进程初始化：挂载价格与信号数量矩阵"""
+    _worker['price_shm'], _worker['prices'] = attach_array(price_spec)
+    _worker['count_shm'], _worker['counts'] = attach_array(count_spec)
+    _worker['args'] = (combos, objective, min_trades)
+
+
+def _run_fold(fold: Dict) -> Dict:
+    return evaluate_fold(fold, _worker['prices'], _worker['counts'], *_worker['args'])
+
+
+def walk_forward(frames: Dict[str, pd.DataFrame], grid: Dict[str, list] = None, train_bars: int = None,
+                 test_bars: int = None, workers: int = None) -> Dict:
+    """
+    执行滚动样本外验证
+
+    返回folds（每个窗口选中的参数、样本内得分与样本外指标均值）、returns（拼接后的样本外
+    逐日收益，日期×股票）和metrics（各股票样本外整体指标）
+    """
+    grid = grid or SWEEP_CONFIG['grid']
+    train_bars = train_bars or WALK_FORWARD_CONFIG['train_bars']
+    test_bars = test_bars or WALK_FORWARD_CONFIG['test_bars']
+    workers = workers or WALK_FORWARD_CONFIG['workers'] or os.cpu_count() or 1
+    objective = WALK_FORWARD_CONFIG['objective']
+    min_trades = WALK_FORWARD_CONFIG['min_trades']
+
+    folds = make_folds(frames, train_bars, test_bars)
+    if not folds:
+        print(f"数据不足: 需要超过{train_bars}个交易日")
+        return {'folds': pd.DataFrame(), 'returns': pd.DataFrame(), 'metrics': pd.DataFrame()}
+
+    counts, combos = prepare_signal_counts(frames, grid)
+    print(f"滚动验证: {len(frames)}只股票, {len(combos)}个组合, {len(folds)}个窗口")
+
+    panel = SharedPanel(frames)
+    shared_counts = SharedArray(counts)
+    init_args = (panel.spec, shared_counts.spec, combos, objective, min_trades)
+    try:
+        if workers <= 1 or len(folds) <= 1:
+            _init_worker(*init_args)
+            try:
+                results = [_run_fold(fold) for fold in folds]
+            finally:
+                shms = (_worker['price_shm'], _worker['count_shm'])
+                _worker.clear()
+                for shm in shms:
+                    shm.close()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+                results = list(pool.map(_run_fold, folds))
+    finally:
+        panel.close()
+        shared_counts.close()
+
+    return _assemble(frames, folds, results, combos)
+
+
+def _assemble(frames: Dict[str, pd.DataFrame], folds: List[Dict], results: List[Dict], combos: List[Dict]) -> Dict:
+    """汇总各窗口结果，并按股票拼接样本外收益"""
+    params = backtest_params()
+    offsets = dict(zip(frames, np.concatenate([[0], np.cumsum([len(frame) for frame in frames.values()])])))
+
+    rows = []
+    pieces = {symbol: [] for symbol in frames}
+    for fold, result in zip(folds, results):
+        row = {'fold': fold['fold'], 'train_start': fold['train_start'], 'test_start': fold['test_start'],
+               'test_end': fold['test_end'], 'combo': result['combo'], 'in_sample': result['in_sample']}
+        if result['combo'] is not None:
+            row.update({key: format_param(value) for key, value in combos[result['combo']]['params'].items()})
+        fold_metrics = []
+        for symbol, piece in result['symbols'].items():
+            _, test, end = fold['slices'][symbol]
+            index = frames[symbol].index[test - offsets[symbol]:end - offsets[symbol]]
+            pieces[symbol].append((index, piece))
+            trades = {'trade_return': piece['trade_return'], 'entry_bar': np.zeros_like(piece['holding_days']),
+                      'exit_bar': piece['holding_days'] - 1}
+            fold_metrics.append(summarize(piece['returns'], piece['weights'], trades, params))
+        if fold_metrics:
+            row.update({f'oos_{key}': np.mean([m[key] for m in fold_metrics]) for key in fold_metrics[0]})
+        rows.append(row)
+
+    returns = {}
+    metrics = {}
+    for symbol, items in pieces.items():
+        if not items:
+            continue
+        index = items[0][0].append([item[0] for item in items[1:]])
+        piece_returns = np.concatenate([item[1]['returns'] for item in items])
+        weights = np.concatenate([item[1]['weights'] for item in items])
+        holding_days = np.concatenate([item[1]['holding_days'] for item in items])
+        trades = {'trade_return': np.concatenate([item[1]['trade_return'] for item in items]),
+                  'entry_bar': np.zeros_like(holding_days), 'exit_bar': holding_days - 1}
+        returns[symbol] = pd.Series(piece_returns, index=index)
+        metrics[symbol] = summarize(piece_returns, weights, trades, params)
+
+    return {
+        'folds': pd.DataFrame(rows),
+        'returns': pd.DataFrame(returns),
+        'metrics': pd.DataFrame(metrics).T
+    }
+
+
+def main(argv=None):
+    """命令行入口：从本地数据仓库读取日线后执行滚动验证"""
+    parser = argparse.ArgumentParser(description='决策矩阵滚动样本外验证')
+    parser.add_argument('--symbols', nargs='+', required=True, help='股票代码')
+    parser.add_argument('--train', type=int, default=WALK_FORWARD_CONFIG['train_bars'], help='样本内交易日数')
+    parser.add_argument('--test', type=int, default=WALK_FORWARD_CONFIG['test_bars'], help='样本外交易日数')
+    parser.add_argument('--workers', type=int, default=None, help='进程数')
+    parser.add_argument('--blacklist', action='store_true', help='按黑名单规则排除股票')
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.symbols, args.blacklist)
+    if not frames:
+        return 1
+
+    result = walk_forward(frames, train_bars=args.train, test_bars=args.test, workers=args.workers)
+    print(result['folds'].to_string())
+    print(result['metrics'].to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+对比TA-Lib与NumPy指标后端在不同序列长度下的耗时
+
+用法：
+    python src/utils/benchmark_backends.py
+    python src/utils/benchmark_backends.py --lengths 100 1000 10000 --repeat 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core import numpy_ta
+from src.core.indicators import compute_indicators, talib
+from src.core.technical_analysis import TechnicalAnalyzer
+from src.utils.test_numpy_backend import make_test_data
+
+
+def best_time(func, repeat: int) -> float:
+    """多次运行取最短耗时（秒）"""
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_lengths(lengths, repeat: int):
+    """单只股票：不同K线数量下全部指标的计算耗时"""
+    print(f"{'K线数':>8} | {'TA-Lib(ms)':>11} | {'NumPy(ms)':>10} | {'NumPy/TA-Lib':>12}")
+    print("-" * 52)
+    for n in lengths:
+        data = make_test_data(n, n)
+        numpy_ms = best_time(lambda: compute_indicators(data, None, numpy_ta), repeat) * 1000
+        if talib is None:
+            print(f"{n:>8} | {'-':>11} | {numpy_ms:>10.2f} | {'-':>12}")
+            continue
+        talib_ms = best_time(lambda: compute_indicators(data, None, talib), repeat) * 1000
+        print(f"{n:>8} | {talib_ms:>11.2f} | {numpy_ms:>10.2f} | {numpy_ms / talib_ms:>11.1f}x")
+
+
+def benchmark_panel(symbols: int, bars: int, repeat: int):
+    """自选股池：NumPy面板一次计算 vs TA-Lib逐只计算"""
+    frames = [make_test_data(bars, seed) for seed in range(symbols)]
+    panel = {field: np.vstack([frame[field].to_numpy() for frame in frames])
+             for field in ('open', 'high', 'low', 'close', 'volume')}
+    analyzer = TechnicalAnalyzer(backend='numpy')
+
+    print(f"\n面板：{symbols}只标的 × {bars}根K线")
+    panel_s = best_time(lambda: analyzer.calculate_indicators_panel(panel), repeat)
+    print(f"   NumPy面板一次计算: {panel_s * 1000:.1f}ms")
+    if talib is not None:
+        loop_s = best_time(lambda: [compute_indicators(frame, None, talib) for frame in frames], repeat)
+        print(f"   TA-Lib逐只计算:    {loop_s * 1000:.1f}ms ({loop_s / panel_s:.1f}x)")
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='指标计算后端性能对比')
+    parser.add_argument('--lengths', nargs='*', type=int, default=[100, 250, 1000, 5000, 20000],
+                        help='单只股票的K线数量')
+    parser.add_argument('--symbols', type=int, default=500, help='面板测试的标的数量')
+    parser.add_argument('--bars', type=int, default=250, help='面板测试的K线数量')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    args = parser.parse_args(argv)
+
+    print("🚀 指标计算后端性能对比\n")
+    benchmark_lengths(args.lengths, args.repeat)
+    benchmark_panel(args.symbols, args.bars, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+测试组合相关性与行业暴露
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.config import POSITION_CONFIG
+from src.core.exposure import WatchlistExposure, cap_weights, log_returns
+from src.core.industry import IndustryTable
+
+
+def make_closes(n=200, symbols=6, seed=0):
+    """生成带共同因子的(日期×股票)收盘价，第1只股票晚上市"""
+    rng = np.random.default_rng(seed)
+    factor = rng.normal(0, 0.01, (n, 1))
+    returns = rng.normal(0, 0.01, (n, symbols)) + factor * np.linspace(0, 2, symbols)
+    closes = pd.DataFrame(10 * np.exp(np.cumsum(returns, axis=0)),
+                          index=pd.bdate_range('2023-01-02', periods=n),
+                          columns=[f"{600000 + i}" for i in range(symbols)])
+    closes.iloc[:50, 1] = np.nan
+    return closes
+
+
+def reference_correlation(closes, window, min_periods):
+    """整体重算的滚动窗口相关矩阵"""
+    returns = pd.DataFrame(log_returns(closes.to_numpy()), index=closes.index, columns=closes.columns)
+    return returns.tail(window).corr(min_periods=min_periods)
+
+
+def test_report_without_industry_table():
+    """没有行业成分表时全部股票按未知行业处理，报告正常生成"""
+    print("🔍 测试无行业成分表的报告...")
+    closes = make_closes()
+    exposure = WatchlistExposure()
+    exposure.update(closes)
+    weights = pd.Series([0.4, 0.2, 0.1, 0.1, 0.1, 0.1], index=closes.columns)
+
+    report = exposure.report(weights)
+    assert report['breaches']['stock'] == {'600000': 0.4}
+    assert report['breaches']['sector'] == {}
+    assert list(report['sector_exposure'].index) == ['未知']
+    np.testing.assert_allclose(report['capped_weights'].to_numpy(),
+                               np.minimum(weights.to_numpy(), POSITION_CONFIG['single_stock_limit']))
+    print("✅ 无行业成分表时报告正常")
+
+
+def test_incremental_matches_full():
+    """逐根追加K线的相关矩阵与整体重算一致，窗口内历史被改写时重建"""
+    print("🔍 测试增量相关矩阵...")
+    closes = make_closes(300)
+    exposure = WatchlistExposure(window=60)
+    exposure.update(closes.iloc[:120])
+    for end in range(121, len(closes) + 1):
+        matrix = exposure.update(closes.iloc[:end])
+    expected = reference_correlation(closes, 60, exposure.correlation.min_periods)
+    np.testing.assert_allclose(matrix.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-12)
+
+    rewritten = closes.copy()
+    rewritten.iloc[-5, 0] *= 1.1
+    expected = reference_correlation(rewritten, 60, exposure.correlation.min_periods)
+    np.testing.assert_allclose(exposure.update(rewritten).to_numpy(), expected.to_numpy(), rtol=0, atol=1e-12)
+    print("✅ 增量相关矩阵与整体重算一致")
+
+
+def test_cap_weights_sector_limit():
+    """超限行业的成分按比例压到sector_limit"""
+    print("🔍 测试仓位限额...")
+    industry = IndustryTable(pd.DataFrame({
+        'symbol': ['600519', '000858', '000001'],
+        'name': ['贵州茅台', '五粮液', '平安银行'],
+        'industry': ['白酒', '白酒', '银行']
+    }))
+    weights = pd.Series([0.4, 0.2, 0.2], index=['600519', '000858', '000001'])
+    capped = cap_weights(weights, industry, stock_limit=0.3, sector_limit=0.25)
+    np.testing.assert_allclose(capped.to_numpy(), [0.15, 0.10, 0.20])
+    assert industry.check_sector_limit(capped, 0.25 + 1e-12) == {}
+    print("✅ 仓位限额正确")
+
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试组合相关性与行业暴露...\n")
+
+    tests = [
+        test_report_without_industry_table,
+        test_incremental_matches_full,
+        test_cap_weights_sector_limit
+    ]
+    passed = True
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            passed = False
+            print(f"❌ {test.__name__}失败: {e}")
+
+    if passed:
+        print("\n🎉 组合相关性与行业暴露测试通过！")
+        return True
+    print("\n❌ 组合相关性与行业暴露测试失败")
+    return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
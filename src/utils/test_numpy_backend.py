@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+测试NumPy指标后端与TA-Lib的一致性
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core import numpy_ta
+from src.core.config import TECHNICAL_CONFIG
+from src.core.indicators import compute_indicators, talib
+from src.core.technical_analysis import TechnicalAnalyzer
+
+# TA-Lib开启了快速数学优化，逐位相同无法保证，按相对误差比较
+TOLERANCE = 1e-8
+
+
+def make_test_data(n=300, seed=0):
+    """生成随机游走的模拟K线"""
+    rng = np.random.default_rng(seed)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    volume = rng.integers(1_000_000, 10_000_000, n).astype(float)
+    index = pd.bdate_range('2020-01-01', periods=n, name='date')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=index)
+
+
+def make_edge_data(n=300, seed=0):
+    """构造边界情况：横盘一字线、零成交量、连续一字涨停"""
+    data = make_test_data(n, seed)
+    prices = ['open', 'high', 'low', 'close']
+    data.iloc[50:80, data.columns.get_indexer(prices)] = 10.0
+    data.iloc[120:140, data.columns.get_loc('volume')] = 0.0
+    data.iloc[200:210, data.columns.get_indexer(prices)] = np.repeat(np.linspace(11, 13, 10)[:, None], 4, axis=1)
+    return data
+
+
+def compare_backends(data):
+    """逐列比较两个后端的结果（预热期NaN位置与数值），返回不一致的列说明"""
+    expected = compute_indicators(data, None, talib)
+    actual = compute_indicators(data, None, numpy_ta)
+    problems = []
+    for col, values in expected.items():
+        try:
+            np.testing.assert_allclose(np.asarray(actual[col], dtype=float), np.asarray(values, dtype=float),
+                                       rtol=TOLERANCE, atol=TOLERANCE, equal_nan=True)
+        except AssertionError as e:
+            problems.append(f"{col}: {str(e).strip().splitlines()[0]}")
+    return problems
+
+
+def test_indicator_parity():
+    """随机数据与边界数据上全部指标一致"""
+    print("🔍 测试全部指标一致性...")
+    if talib is None:
+        print("⚠️ 未安装TA-Lib，跳过")
+        return
+
+    datasets = {f'随机游走#{seed}': make_test_data(1000, seed) for seed in range(5)}
+    datasets['边界情况'] = make_edge_data()
+    flat = make_test_data(300, 9)
+    flat[['open', 'high', 'low', 'close']] = 7.0
+    datasets['价格恒定'] = flat
+
+    failures = {}
+    for name, data in datasets.items():
+        problems = compare_backends(data)
+        if problems:
+            failures[name] = problems
+            print(f"❌ {name}:")
+            for problem in problems:
+                print(f"   - {problem}")
+        else:
+            print(f"✅ {name}")
+    assert not failures, f"NumPy后端与TA-Lib不一致: {failures}"
+
+
+def test_short_series():
+    """长度不足指标回看期时两者一致（全部或部分为NaN）"""
+    print("🔍 测试短序列...")
+    if talib is None:
+        print("⚠️ 未安装TA-Lib，跳过")
+        return
+
+    failures = {}
+    for n in (1, 2, 5, 14, 26, 33, 34, 60, 90):
+        problems = compare_backends(make_test_data(n, n))
+        if problems:
+            failures[n] = problems
+            print(f"❌ 长度{n}: {problems}")
+    assert not failures, f"短序列不一致: {failures}"
+    print("✅ 短序列一致")
+
+
+def test_analyzer_backend():
+    """分析器切换后端后信号与决策不变"""
+    print("🔍 测试分析器后端切换...")
+    data = make_test_data(250, 3)
+    numpy_analyzer = TechnicalAnalyzer(backend='numpy')
+    numpy_result = numpy_analyzer.calculate_indicators(data)
+    numpy_signal = numpy_analyzer.six_dimension_signal_check(numpy_result)
+    assert numpy_analyzer.ta is numpy_ta, "未使用NumPy后端"
+
+    if talib is None:
+        print("✅ NumPy后端可独立完成分析")
+        return
+
+    talib_analyzer = TechnicalAnalyzer(backend='talib')
+    talib_result = talib_analyzer.calculate_indicators(data)
+    talib_signal = talib_analyzer.six_dimension_signal_check(talib_result)
+
+    assert list(numpy_result.columns) == list(talib_result.columns), "两个后端的指标列不一致"
+    for key in talib_signal['signals']:
+        assert numpy_signal['signals'][key]['status'] == talib_signal['signals'][key]['status'], \
+            f"两个后端的{key}信号不一致"
+    print("✅ 两个后端的信号一致")
+
+
+def test_panel_matches_single():
+    """面板批量计算与逐只计算一致"""
+    print("🔍 测试面板批量计算...")
+    frames = [make_test_data(200, seed) for seed in range(8)]
+    panel = {field: np.vstack([frame[field].to_numpy() for frame in frames])
+             for field in ('open', 'high', 'low', 'close', 'volume')}
+    analyzer = TechnicalAnalyzer(backend='numpy')
+    tensor, columns = analyzer.calculate_indicators_panel(panel)
+
+    for i, frame in enumerate(frames):
+        single = analyzer.calculate_indicators(frame)[columns].to_numpy()
+        np.testing.assert_allclose(tensor[i], single, rtol=1e-12, atol=1e-9, equal_nan=True,
+                                   err_msg=f"第{i}只标的结果不一致")
+    print(f"✅ {tensor.shape[0]}只标的 × {tensor.shape[1]}根K线 × {tensor.shape[2]}个指标一致")
+
+
+def test_jit_matches_numpy():
+    """Numba编译内核与NumPy逐根循环结果一致（一维与面板）"""
+    print("🔍 测试Numba编译内核...")
+    if not numpy_ta.ta_kernels.NUMBA_AVAILABLE:
+        print("⚠️ 未安装Numba，跳过")
+        return
+
+    frames = [make_test_data(300, seed) for seed in range(4)] + [make_edge_data()]
+    panel = {field: np.vstack([frame[field].to_numpy() for frame in frames])
+             for field in ('open', 'high', 'low', 'close', 'volume')}
+    original = TECHNICAL_CONFIG.get('numba_jit', True)
+    try:
+        results = {}
+        for jit in (True, False):
+            TECHNICAL_CONFIG['numba_jit'] = jit
+            results[jit] = (compute_indicators(panel, None, numpy_ta),
+                            compute_indicators(frames[-1], None, numpy_ta))
+    finally:
+        TECHNICAL_CONFIG['numba_jit'] = original
+
+    for compiled, looped in zip(results[True], results[False]):
+        for col in compiled:
+            np.testing.assert_allclose(np.asarray(compiled[col], dtype=float), np.asarray(looped[col], dtype=float),
+                                       rtol=1e-12, atol=1e-10, equal_nan=True,
+                                       err_msg=f"{col}: 编译内核与NumPy实现不一致")
+    print("✅ 编译内核与NumPy实现一致")
+
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试NumPy指标后端...\n")
+
+    tests = [
+        test_indicator_parity,
+        test_short_series,
+        test_analyzer_backend,
+        test_panel_matches_single,
+        test_jit_matches_numpy
+    ]
+    passed = True
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            passed = False
+            print(f"❌ {test.__name__}失败: {e}")
+
+    if passed:
+        print("\n🎉 NumPy后端测试通过！")
+        return True
+    print("\n❌ NumPy后端测试失败")
+    return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)